@@ -0,0 +1,355 @@
+# differential.py
+# Różnicowy test poprawności: referencyjna (skalarna) implementacja GEM vs szybkie silniki.
+# Odpowiada za:
+# - generowanie losowych syntetycznych uniwersów (remisy, braki notowań, krótkie historie)
+# - uruchomienie backtest_gem i GEM.evaluate obok silników wektorowych na tych samych danych
+# - raport rozbieżności per data (wybór roli) i przekroczeń tolerancji (zwroty) oraz przyspieszeń
+#
+# Działa offline (tylko dane syntetyczne w pamięci).
+# Uruchomienie (z katalogu głównego projektu):
+#   python -m benchmarks.differential --seeds 20 --months 96
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import MOMENTUM_PERIODS
+from strategy.backtest import MOMENTUM_HORIZONS, backtest_gem
+from strategy.decision_log import DecisionLog
+from strategy.ensemble import backtest_ensemble
+from strategy.gem import GEM
+from strategy.signals import GemSignal, backtest_signal
+from strategy.vectorized import ROLE_CODES, ROLES, gem_select, momentum_asof, role_returns
+
+SCENARIOS = ("random", "ties", "nan", "short", "staggered", "gaps")
+
+# Miesiące lookback per horyzont backtestu ("3M" -> 3)
+HORIZON_MONTHS = {period.upper(): months for period, months in MOMENTUM_PERIODS.items()}
+
+
+# ==========================
+# DANE SYNTETYCZNE
+# ==========================
+
+def synthetic_universe(seed: int, scenario: str = "random", months: int = 60) -> tuple:
+    """
+    Losowe miesięczne notowania ról (DatetimeIndex, kolumny Close i Adj Close).
+
+    Scenariusze:
+    - random: niezależne losowe ścieżki
+    - ties: equity_exus = kopia equity_us (dokładne remisy) + płaski odcinek (momentum 0)
+    - nan: brakujące notowania zapisane jako NaN (Close i/lub Adj Close)
+    - short: historia krótsza niż najdłuższy lookback
+    - staggered: equity_exus i defensive notowane od późniejszej daty
+    - gaps: brakujące wiersze (miesiące) w środku historii equity_exus
+
+    Returns:
+        (assets, start_date)
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Nieznany scenariusz: {scenario} (dostępne: {SCENARIOS})")
+
+    rng = np.random.default_rng(seed)
+    if scenario == "short":
+        months = int(rng.integers(4, max(HORIZON_MONTHS.values()) + 3))
+    dates = pd.date_range("2010-01-31", periods=months, freq="M")
+
+    assets = {}
+    for role in ROLES:
+        close = 100 * np.cumprod(1 + rng.normal(0.004, 0.05, months))
+        # Adj Close różni się od Close (dywidendy), więc źle wybrana kolumna da rozbieżność
+        adjusted = close * np.cumprod(np.full(months, 1.0015))
+        assets[role] = pd.DataFrame({"Close": close, "Adj Close": adjusted}, index=dates)
+
+    if scenario == "ties":
+        assets["equity_exus"] = assets["equity_us"].copy()
+        flat = slice(months // 3, months // 3 + max(HORIZON_MONTHS.values()) + 2)
+        for role in ROLES[:2]:
+            assets[role].iloc[flat] = assets[role].iloc[flat.start].to_numpy()
+    elif scenario == "nan":
+        for role in ROLES:
+            rows = rng.choice(months, size=max(1, months // 15), replace=False)
+            columns = ["Adj Close"] if rng.random() < 0.5 else ["Close", "Adj Close"]
+            assets[role].iloc[rows, [assets[role].columns.get_loc(c) for c in columns]] = np.nan
+    elif scenario == "staggered":
+        for role in ROLES[1:]:
+            assets[role] = assets[role].iloc[int(rng.integers(1, months // 2)):]
+    elif scenario == "gaps":
+        df = assets["equity_exus"]
+        rows = rng.choice(np.arange(1, months - 1), size=max(1, months // 20), replace=False)
+        assets["equity_exus"] = df.drop(df.index[rows])
+
+    for role, df in assets.items():
+        df.attrs["ticker"] = role
+
+    start = int(rng.integers(0, max(1, months // 3)))
+    return assets, str(dates[start].date())
+
+
+# ==========================
+# SILNIKI BACKTESTU
+# ==========================
+# Silnik: fn(assets, start_date) -> {"codes": int8 (H, T), "returns": float (H, T)}
+# H = MOMENTUM_HORIZONS, T = daty equity_us od start_date (jak w backtest_gem)
+
+def reference_engine(assets: dict, start_date: str) -> dict:
+    result = backtest_gem(assets, start_date)
+    return {
+        "codes": result["decision_log"].codes,
+        "returns": np.array([result["monthly_returns"][h].to_numpy() for h in MOMENTUM_HORIZONS]),
+    }
+
+
+def vectorized_engine(assets: dict, start_date: str) -> dict:
+    log = DecisionLog.from_assets(assets, start_date)
+    returns = role_returns(assets, log.index).T  # (role, T)
+    return {"codes": log.codes, "returns": np.take_along_axis(returns, log.codes.astype(np.intp), axis=0)}
+
+
+def ensemble_engine(assets: dict, start_date: str) -> dict:
+    codes, returns = [], []
+    for h in MOMENTUM_HORIZONS:
+        result = backtest_ensemble(assets, start_date, weights={h: 1})
+        codes.append(result["selections"][h].map(ROLE_CODES).to_numpy())
+        returns.append(result["monthly_returns"].to_numpy())
+    return {"codes": np.array(codes, dtype=np.int8), "returns": np.array(returns)}
+
+
+def signal_engine(assets: dict, start_date: str) -> dict:
+    codes, returns = [], []
+    for h in MOMENTUM_HORIZONS:
+        result = backtest_signal(assets, start_date, GemSignal(HORIZON_MONTHS[h]))
+        codes.append(result["selections"].map(ROLE_CODES).to_numpy())
+        returns.append(result["monthly_returns"].to_numpy())
+    return {"codes": np.array(codes, dtype=np.int8), "returns": np.array(returns)}
+
+
+ENGINES = {
+    "vectorized": vectorized_engine,
+    "ensemble": ensemble_engine,
+    "signals": signal_engine,
+}
+
+
+# ==========================
+# SILNIKI SYGNAŁU BIEŻĄCEGO (GEM.evaluate)
+# ==========================
+# Silnik: fn(frames, decision_dates, period) -> int8 kody ról zwycięzcy per data decyzji
+# frames: {rola: DataFrame z kolumną 'Date'} (format data_service.get_monthly_data)
+
+class _FramesDataService:
+    def __init__(self, frames: dict):
+        self.frames = frames
+
+    def get_monthly_data(self, ticker: str):
+        return self.frames[ticker]
+
+
+def reference_live_engine(frames: dict, decision_dates, period: str) -> np.ndarray:
+    gem = GEM(_FramesDataService(frames))
+    codes = []
+    for date in decision_dates:
+        try:
+            winner = gem.evaluate(*ROLES, period, date)["winner"]
+        except ValueError:
+            # Za krótka historia / NaN: evaluate przerywa, szybkie silniki wybierają defensive
+            winner = "defensive"
+        codes.append(ROLE_CODES[winner])
+    return np.array(codes, dtype=np.int8)
+
+
+def _cutoffs(decision_dates) -> pd.DatetimeIndex:
+    # Jak w GEM.evaluate: koniec miesiąca poprzedzającego datę decyzji
+    decision = pd.DatetimeIndex(pd.to_datetime(list(decision_dates)))
+    return decision.to_period("M").to_timestamp() - pd.Timedelta(days=1)
+
+
+def vectorized_live_engine(frames: dict, decision_dates, period: str) -> np.ndarray:
+    cutoffs = _cutoffs(decision_dates)
+    momentum = []
+    for role in ROLES[:2]:
+        df = frames[role].set_index("Date")
+        momentum.append(momentum_asof(df.index, df["Adj Close"].to_numpy(), cutoffs, MOMENTUM_PERIODS[period]))
+    return gem_select(*momentum)
+
+
+def signal_live_engine(frames: dict, decision_dates, period: str) -> np.ndarray:
+    gem = GEM(_FramesDataService(frames))
+    signal = GemSignal(MOMENTUM_PERIODS[period])
+    winners = [gem.evaluate_signal(*ROLES, signal, date)["winner"] for date in decision_dates]
+    return np.array([ROLE_CODES[w] for w in winners], dtype=np.int8)
+
+
+LIVE_ENGINES = {
+    "vectorized": vectorized_live_engine,
+    "signals": signal_live_engine,
+}
+
+
+# ==========================
+# PORÓWNANIE
+# ==========================
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def compare_backtest(assets: dict, start_date: str, engines: dict = None,
+                     rtol: float = 1e-12, atol: float = 1e-12) -> dict:
+    """
+    Porównuje backtest_gem z silnikami na jednym uniwersum.
+
+    Returns:
+        dict:
+            {
+                "mismatches": lista {Engine, Date, Horizon, Reference, Fast} – inny wybór roli,
+                "breaches": lista {Engine, Date, Horizon, Reference, Fast, Error} – zwrot poza tolerancją,
+                "timing": dict {silnik: czas [s]} (klucz "reference" dla backtest_gem)
+            }
+    """
+    engines = ENGINES if engines is None else engines
+    dates = assets["equity_us"].loc[start_date:].index
+
+    reference, elapsed = _timed(reference_engine, assets, start_date)
+    report = {"mismatches": [], "breaches": [], "timing": {"reference": elapsed}}
+
+    for name, engine in engines.items():
+        fast, elapsed = _timed(engine, assets, start_date)
+        report["timing"][name] = elapsed
+
+        for h, t in zip(*np.nonzero(fast["codes"] != reference["codes"])):
+            report["mismatches"].append({
+                "Engine": name, "Date": dates[t], "Horizon": MOMENTUM_HORIZONS[h],
+                "Reference": ROLES[reference["codes"][h, t]], "Fast": ROLES[fast["codes"][h, t]],
+            })
+
+        ok = np.isclose(fast["returns"], reference["returns"], rtol=rtol, atol=atol, equal_nan=True)
+        for h, t in zip(*np.nonzero(~ok)):
+            report["breaches"].append({
+                "Engine": name, "Date": dates[t], "Horizon": MOMENTUM_HORIZONS[h],
+                "Reference": reference["returns"][h, t], "Fast": fast["returns"][h, t],
+                "Error": abs(fast["returns"][h, t] - reference["returns"][h, t]),
+            })
+
+    return report
+
+
+def compare_live(assets: dict, engines: dict = None) -> dict:
+    """
+    Porównuje GEM.evaluate (wszystkie okresy, każda data decyzji z historii) z silnikami.
+
+    Daty decyzji: pierwszy dzień każdego miesiąca z notowaniami equity_us
+    oraz miesiąca następnego – sprawdza logikę daty odcięcia.
+
+    Returns:
+        dict w formacie compare_backtest (bez "breaches"); Horizon = klucz okresu, np. "12m".
+    """
+    engines = LIVE_ENGINES if engines is None else engines
+    frames = {role: df.rename_axis("Date").reset_index() for role, df in assets.items()}
+    index = assets["equity_us"].index
+    decision_dates = [
+        str(d.date()) for d in (index.to_period("M").to_timestamp().union([index[-1] + pd.offsets.MonthBegin(1)]))
+    ]
+
+    report = {"mismatches": [], "timing": {"reference": 0.0}}
+    reference = {}
+    for period in MOMENTUM_PERIODS:
+        reference[period], elapsed = _timed(reference_live_engine, frames, decision_dates, period)
+        report["timing"]["reference"] += elapsed
+
+    for name, engine in engines.items():
+        report["timing"][name] = 0.0
+        for period in MOMENTUM_PERIODS:
+            fast, elapsed = _timed(engine, frames, decision_dates, period)
+            report["timing"][name] += elapsed
+
+            for i in np.flatnonzero(fast != reference[period]):
+                report["mismatches"].append({
+                    "Engine": name, "Date": decision_dates[i], "Horizon": period,
+                    "Reference": ROLES[reference[period][i]], "Fast": ROLES[fast[i]],
+                })
+
+    return report
+
+
+def run(seeds=range(10), scenarios=SCENARIOS, months: int = 60, engines: dict = None,
+        live_engines: dict = None, rtol: float = 1e-12, atol: float = 1e-12) -> dict:
+    """
+    Pełny przebieg: każdy scenariusz × ziarno, backtest i sygnał bieżący.
+
+    Returns:
+        dict:
+            {
+                "mismatches": DataFrame (Check, Scenario, Seed, Engine, Date, Horizon, Reference, Fast),
+                "breaches": DataFrame (Scenario, Seed, Engine, Date, Horizon, Reference, Fast, Error),
+                "timing": DataFrame (Check, Engine, Reference [s], Fast [s], Speedup),
+                "cases": liczba uniwersów
+            }
+    """
+    mismatches, breaches = [], []
+    timing = {}
+    cases = 0
+
+    for scenario in scenarios:
+        for seed in seeds:
+            assets, start_date = synthetic_universe(seed, scenario, months)
+            cases += 1
+            tag = {"Scenario": scenario, "Seed": seed}
+
+            for check, report in (
+                ("backtest", compare_backtest(assets, start_date, engines, rtol, atol)),
+                ("live", compare_live(assets, live_engines)),
+            ):
+                mismatches += [{"Check": check, **tag, **row} for row in report["mismatches"]]
+                breaches += [{**tag, **row} for row in report.get("breaches", [])]
+                for engine, elapsed in report["timing"].items():
+                    timing[(check, engine)] = timing.get((check, engine), 0.0) + elapsed
+
+    rows = [
+        {
+            "Check": check,
+            "Engine": engine,
+            "Reference [s]": round(timing[(check, "reference")], 4),
+            "Fast [s]": round(elapsed, 4),
+            "Speedup": round(timing[(check, "reference")] / elapsed, 1) if elapsed > 0 else np.inf,
+        }
+        for (check, engine), elapsed in timing.items() if engine != "reference"
+    ]
+
+    return {
+        "mismatches": pd.DataFrame(
+            mismatches, columns=["Check", "Scenario", "Seed", "Engine", "Date", "Horizon", "Reference", "Fast"]
+        ),
+        "breaches": pd.DataFrame(
+            breaches, columns=["Scenario", "Seed", "Engine", "Date", "Horizon", "Reference", "Fast", "Error"]
+        ),
+        "timing": pd.DataFrame(rows),
+        "cases": cases,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Różnicowy test poprawności GEM: referencja vs szybkie silniki")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    args = parser.parse_args()
+
+    report = run(range(args.seeds), args.scenarios.split(","), args.months)
+
+    print(f"Uniwersa: {report['cases']}")
+    print(report["timing"].to_string(index=False))
+    for name in ("mismatches", "breaches"):
+        table = report[name]
+        print(f"\n{name}: {len(table)}")
+        if len(table):
+            summary = table.groupby(["Scenario", "Engine"]).size().rename("Rows").reset_index()
+            print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# load_universe.py
+# Benchmark ładowania całego uniwersum tickerów z cache:
+# pełne dane (wszystkie kolumny, float64) vs tryb z projekcją kolumn i float32.
+# Mierzona jest domyślna ścieżka fetch_yahoo_data (bez argumentu storage): dla "csv"
+# pliki roczne czytane przez _read_year, dla "sqlite" / "memmap" backend podany tak,
+# jak przy config.STORAGE_BACKEND – precyzja nadawana przy odczycie w obu przypadkach.
+# Raportuje czas oraz szczytowe zużycie pamięci (tracemalloc).
+#
+# Uruchomienie (z katalogu głównego projektu):
+#   python -m benchmarks.load_universe --tickers 200 --years 20 [--backend memmap]
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from services.storage import PRICE_COLUMNS, get_storage
+from services.yahoo_client import data_source, fetch_yahoo_data
+
+MODES = {
+    "full float64": {"columns": None, "dtype": None},
+    "Adj Close float64": {"columns": ["Adj Close"], "dtype": None},
+    "Adj Close float32": {"columns": ["Adj Close"], "dtype": "float32"},
+}
+
+
+def build_universe(storage, n_tickers: int, years: int) -> list:
+    """
+    Zapisuje syntetyczne notowania (dni kalendarzowe aż do dziś, więc bez pobierania z sieci).
+    """
+    today = pd.Timestamp.now().normalize()
+    dates = pd.date_range(today - pd.DateOffset(years=years), today, freq="D", name="Date")
+    rng = np.random.default_rng(0)
+
+    tickers = []
+    for i in range(n_tickers):
+        close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.01, len(dates)))
+        df = pd.DataFrame({column: close for column in PRICE_COLUMNS}, index=dates)
+        df["Volume"] = rng.integers(1_000, 1_000_000, len(dates)).astype(float)
+        ticker = f"B{i:04d}"
+        storage.upsert(ticker, df)
+        tickers.append(ticker)
+
+    return tickers
+
+
+def load_universe(tickers, start_date, columns=None, dtype=None) -> dict:
+    # Domyślna ścieżka użytkownika: bez argumentu storage (źródło z data_source)
+    return {
+        ticker: fetch_yahoo_data(ticker, start_date, resample_interval="M", columns=columns, dtype=dtype)
+        for ticker in tickers
+    }
+
+
+def run(n_tickers: int = 100, years: int = 20, backend: str = "csv") -> pd.DataFrame:
+    with tempfile.TemporaryDirectory() as path:
+        storage = get_storage(backend, f"{path}/prices.sqlite" if backend == "sqlite" else path)
+        tickers = build_universe(storage, n_tickers, years)
+        start_date = str((pd.Timestamp.now() - pd.DateOffset(years=years)).date())
+        for ticker in tickers:
+            storage.set_covered_from(ticker, start_date)
+        # Pliki CSV: katalog cache zamiast DATA_RAW_PATH; pozostałe backendy: podany backend
+        if backend == "csv":
+            source = data_source(path, offline=True)
+        else:
+            source = data_source(offline=True, storage=storage)
+
+        rows = []
+        with source:
+            for mode, options in MODES.items():
+                tracemalloc.start()
+                start = time.perf_counter()
+                result = load_universe(tickers, start_date, **options)
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                rows.append({
+                    "Mode": mode,
+                    "Time [s]": round(elapsed, 3),
+                    "Peak [MiB]": round(peak / 2**20, 2),
+                    "Result [MiB]": round(sum(df.memory_usage(deep=True).sum() for df in result.values()) / 2**20, 3),
+                })
+
+        if hasattr(storage, "close"):
+            storage.close()
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ładowania uniwersum z cache")
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--backend", default="csv", choices=["csv", "sqlite", "memmap"])
+    args = parser.parse_args()
+
+    print(run(args.tickers, args.years, args.backend).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
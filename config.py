@@ -31,6 +31,60 @@ BASE_DIR = Path(__file__).resolve().parent
 DATA_RAW_PATH = BASE_DIR / "data" / "raw"
 DATA_PROCESSED_PATH = BASE_DIR / "data" / "processed"
 
+# Snapshoty cache notowań (services.snapshots): obiekty adresowane treścią + manifesty
+SNAPSHOT_PATH = BASE_DIR / "data" / "snapshots"
+
+# Kontrola jakości danych przy zapisie do cache
+QUALITY_REPORT_PATH = DATA_PROCESSED_PATH / "quality"
+QUALITY_MAX_GAP_DAYS = 7  # przerwa w notowaniach (dni kalendarzowe) raportowana jako luka
+QUALITY_SPIKE_THRESHOLD = 0.5  # dzienny ruch Adj Close (50%) traktowany jako podejrzany skok
+
+# Prefetch po zamknięciu ostatniej sesji miesiąca (services.prefetch)
+PREFETCH_UNIVERSE = list(TICKERS.values())  # tickery rozgrzewane przez scheduler
+PREFETCH_PATH = DATA_PROCESSED_PATH / "prefetch"  # znaczniki gotowości + świece miesięczne
+PREFETCH_CLOSE_HOUR = 22  # godzina (zegar aplikacji), od której sesja dnia jest uznana za zamkniętą
+
+# API asynchroniczne data_service: limit równoległych pobrań i czas życia cache (sekundy)
+ASYNC_MAX_CONCURRENCY = 8
+ASYNC_CACHE_TTL = 300
+
+# Serwis sygnałów (services.signal_server): liczba wyników GEM trzymanych w pamięci (LRU)
+SIGNAL_CACHE_SIZE = 1024
+
+# Backend cache notowań dziennych: "csv" (pliki roczne), "sqlite" (jedna tabela)
+# lub "memmap" (binarne kolumny per ticker, odczyt przez numpy.memmap)
+STORAGE_BACKEND = "csv"
+SQLITE_PATH = DATA_RAW_PATH / "prices.sqlite"
+MEMMAP_PATH = DATA_RAW_PATH / "memmap"
+# Po pobraniu historii bez notowań (np. zakres sprzed debiutu) kolejna próba dla tego
+# zakresu dopiero po tym czasie (sekundy) – chwilowa awaria Yahoo nie blokuje danych na długo
+EMPTY_DOWNLOAD_RETRY = 6 * 3600
+
+# Eksport wyników backtestu (services.export): Arrow IPC lub Parquet, wymaga pyarrow
+EXPORT_PATH = DATA_PROCESSED_PATH / "exports"
+EXPORT_FORMAT = "arrow"  # "arrow" (IPC, mapowanie pamięci bez kopiowania) lub "parquet"
+
+# Tryb profilowania (utils.profiling, main.py --profile, GEM_PROFILE w testach):
+# statystyki cProfile per etap, stosy w formacie "collapsed" i podsumowanie
+PROFILE_PATH = DATA_PROCESSED_PATH / "profile"
+
+# Cache wyników (backtest, sygnały) – wspólny dla procesów i kolejnych uruchomień
+RESULT_CACHE_PATH = BASE_DIR / "data" / "cache" / "results"
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # limit rozmiaru, po przekroczeniu LRU
+
+# Stan wznawianego backtestu (backtest_gem_incremental) – osobny katalog bez limitu
+# rozmiaru: wpisy nie są wypierane przez inne wyniki (jeden wpis na zestaw tickerów i datę startu)
+BACKTEST_STATE_PATH = BASE_DIR / "data" / "cache" / "backtest_state"
+
+# Waluty notowań (services.fx): ticker -> waluta, pozostałe tickery w DEFAULT_ASSET_CURRENCY
+ASSET_CURRENCIES = {}
+DEFAULT_ASSET_CURRENCY = "USD"
+
+# Koszty transakcyjne (strategy.costs): kapitał początkowy dla prowizji stałej
+# i stawka podatku od zysków kapitałowych
+INITIAL_CAPITAL = 10_000
+CAPITAL_GAINS_TAX_RATE = 0.19
+
 # Rebalancing (ostatni dzień miesiąca)
 REBALANCE_DAY = "last"  # 'last' lub 'first'
 
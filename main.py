@@ -1,16 +1,102 @@
-# This is a sample Python script.
+# main.py
+# Punkt wejścia CLI.
+#
+#   python main.py prefetch [--tickers SPY,VEU,BND] [--workers 4] [--start-date 2020-01-01]
+#   python main.py schedule [--tickers ...] [--workers 4]
+#   python main.py signal [--date 2025-03-01] [--period 12m]
+#   python main.py backtest [--start-date 2020-01-01]
+#
+# --profile [--profile-dir KATALOG] (przed komendą): cProfile i tracemalloc per etap
+# potoku, stosy dla flame graph i podsumowanie (utils.profiling, domyślnie config.PROFILE_PATH)
 
-# Press Shift+F10 to execute it or replace it with your code.
-# Press Double Shift to search everywhere for classes, files, tool windows, actions, and settings.
+import argparse
 
+from config import MOMENTUM_PERIODS, PREFETCH_UNIVERSE, START_DATE, TICKERS
+from utils import clock
 
-def print_hi(name):
-    # Use a breakpoint in the code line below to debug your script.
-    print(f'Hi, {name}')  # Press Ctrl+F8 to toggle the breakpoint.
 
+def _tickers(value: str) -> list:
+    return [t.strip() for t in value.split(",") if t.strip()]
 
-# Press the green button in the gutter to run the script.
-if __name__ == '__main__':
-    print_hi('PyCharm')
 
-# See PyCharm help at https://www.jetbrains.com/help/pycharm/
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Global Equity Momentum")
+    parser.add_argument("--profile", action="store_true", help="profilowanie etapów potoku")
+    parser.add_argument("--profile-dir", default=None, help="katalog wyników profilowania (domyślnie config.PROFILE_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prefetch = commands.add_parser("prefetch", help="jednorazowe rozgrzanie cache dla uniwersum")
+    prefetch.add_argument("--start-date", default=None, help="początek backtestu (domyślnie config.START_DATE)")
+
+    schedule = commands.add_parser("schedule", help="rozgrzewanie cache po ostatniej sesji każdego miesiąca")
+
+    for command in (prefetch, schedule):
+        command.add_argument("--tickers", type=_tickers, default=PREFETCH_UNIVERSE,
+                             help="tickery rozdzielone przecinkami (domyślnie config.PREFETCH_UNIVERSE)")
+        command.add_argument("--workers", type=int, default=4, help="liczba wątków pobierających")
+
+    signal = commands.add_parser("signal", help="bieżący sygnał GEM dla domyślnych tickerów")
+    signal.add_argument("--date", default=None, help="data decyzji (domyślnie dziś)")
+    signal.add_argument("--period", default="12m", choices=list(MOMENTUM_PERIODS))
+
+    backtest = commands.add_parser("backtest", help="backtest GEM dla domyślnych tickerów")
+    backtest.add_argument("--start-date", default=START_DATE)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if not args.profile:
+        return _run(args)
+
+    from utils.profiling import profiling
+
+    with profiling(args.profile_dir) as profiler:
+        code = _run(args)
+    print(profiler.summary())
+    return code
+
+
+def _run(args) -> int:
+    if args.command == "signal":
+        from services import data_service
+        from strategy.gem import GEM
+
+        result = GEM(data_service).evaluate(
+            TICKERS["US_equity"], TICKERS["exUS_equity"], TICKERS["bonds"],
+            args.period, args.date or str(clock.today()),
+        )
+        for key, value in result.items():
+            print(f"{key}: {value}")
+        return 0
+
+    if args.command == "backtest":
+        from services.data_service import get_monthly_data
+        from strategy.backtest import backtest_gem
+
+        roles = {"equity_us": "US_equity", "equity_exus": "exUS_equity", "defensive": "bonds"}
+        assets = {role: get_monthly_data(TICKERS[key]).set_index("Date") for role, key in roles.items()}
+        result = backtest_gem(assets, args.start_date)
+        for horizon, statistics in result["statistics"].items():
+            print(horizon, {name: round(float(value), 4) for name, value in statistics.items()})
+        return 0
+
+    from services import prefetch
+
+    if args.command == "prefetch":
+        report = prefetch.warm(args.tickers, start_date=args.start_date, workers=args.workers)
+        print(report.to_string(index=False))
+        return int((report["Status"] != "ready").any())
+
+    try:
+        prefetch.run_scheduler(args.tickers, workers=args.workers,
+                               on_report=lambda report: print(report.to_string(index=False)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
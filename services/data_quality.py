@@ -0,0 +1,171 @@
+# data_quality.py
+# Walidacja i czyszczenie notowań dziennych w momencie zapisu do cache.
+# Odpowiada za:
+# - wektorowe wykrywanie duplikatów dat, cen niedodatnich, luk w notowaniach
+#   oraz skoków Adj Close (jednodniowe "szpilki" i niepowrócone skoki typu split)
+# - usunięcie błędnych wierszy i posortowanie danych przed zapisem
+# - zapis raportu z wynikami kontroli (JSON per ticker)
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from config import QUALITY_REPORT_PATH, QUALITY_MAX_GAP_DAYS, QUALITY_SPIKE_THRESHOLD
+from utils import clock
+
+# Kolumny cenowe (Volume może być równe 0)
+PRICE_FIELDS = ["Price", "Open", "Close", "Adj Close", "Low", "High"]
+
+# Rodzaje kontroli w raporcie (listy dat)
+CHECKS = ("duplicates", "non_positive", "gaps", "spikes", "jumps")
+
+
+def check_prices(
+    df: pd.DataFrame,
+    max_gap_days: int = None,
+    spike_threshold: float = None,
+) -> dict:
+    """
+    Wektorowa kontrola jakości notowań dziennych (indeks: daty).
+
+    Zwraca dict z listami dat:
+    - duplicates: powtórzone daty
+    - non_positive: wiersze z ceną <= 0
+    - gaps: daty, przed którymi przerwa w notowaniach przekracza max_gap_days dni kalendarzowych
+    - spikes: jednodniowe skoki Adj Close, które następnego dnia wracają (błąd danych)
+    - jumps: skoki Adj Close bez powrotu (np. nieskorygowany split) – tylko raportowane
+    """
+    max_gap_days = QUALITY_MAX_GAP_DAYS if max_gap_days is None else max_gap_days
+    spike_threshold = QUALITY_SPIKE_THRESHOLD if spike_threshold is None else spike_threshold
+
+    index = df.index
+    dates = index.values.astype("datetime64[D]")
+
+    duplicates = index.duplicated(keep="last")
+
+    columns = [c for c in PRICE_FIELDS if c in df.columns]
+    prices = df[columns].to_numpy(dtype=np.float64)
+    non_positive = (prices <= 0).any(axis=1)
+
+    # Luki liczone na posortowanych, unikalnych datach
+    unique_dates = np.unique(dates)
+    gap_mask = np.diff(unique_dates).astype(np.int64) > max_gap_days
+    gaps = unique_dates[1:][gap_mask]
+
+    spikes = np.zeros(len(df), dtype=bool)
+    jumps = np.zeros(len(df), dtype=bool)
+    if "Adj Close" in df.columns and len(df) > 1:
+        adj = df["Adj Close"].to_numpy(dtype=np.float64)
+        valid = ~duplicates & ~non_positive & np.isfinite(adj)
+        positions = np.flatnonzero(valid)
+        if len(positions) > 1:
+            order = positions[np.argsort(dates[positions], kind="stable")]
+            log_returns = np.diff(np.log(adj[order]))
+            big = np.abs(log_returns) > np.log1p(spike_threshold)
+            # Szpilka: duży ruch, po którym następny ruch prawie go znosi
+            reverts = np.zeros_like(big)
+            reverts[:-1] = big[:-1] & big[1:] & (np.abs(log_returns[:-1] + log_returns[1:]) < np.log1p(spike_threshold) / 2)
+            spikes[order[1:][reverts]] = True
+            jumps[order[1:][big & ~reverts & ~np.roll(reverts, 1)]] = True
+
+    def to_dates(mask):
+        return [str(d) for d in np.unique(dates[mask])]
+
+    return {
+        "rows": int(len(df)),
+        "duplicates": to_dates(duplicates),
+        "non_positive": to_dates(non_positive),
+        "gaps": [str(d) for d in gaps],
+        "spikes": to_dates(spikes),
+        "jumps": to_dates(jumps),
+    }
+
+
+def clean_prices(
+    df: pd.DataFrame,
+    max_gap_days: int = None,
+    spike_threshold: float = None,
+) -> tuple:
+    """
+    Czyści notowania przed zapisem do cache.
+
+    Usuwa powtórzone daty (zostaje ostatnie notowanie), wiersze z ceną <= 0
+    i jednodniowe szpilki Adj Close, po czym sortuje po dacie.
+    Luki i skoki bez powrotu są tylko raportowane.
+
+    Zwraca (oczyszczony DataFrame, raport z check_prices + liczba usuniętych wierszy).
+    """
+    if df.empty:
+        return df, check_prices(df, max_gap_days, spike_threshold) | {"dropped": 0}
+
+    report = check_prices(df, max_gap_days, spike_threshold)
+
+    drop = df.index.duplicated(keep="last")
+    bad_dates = pd.to_datetime(report["non_positive"] + report["spikes"])
+    if len(bad_dates):
+        drop |= df.index.normalize().isin(bad_dates)
+
+    cleaned = df[~drop]
+    if not cleaned.index.is_monotonic_increasing:
+        cleaned = cleaned.sort_index()
+
+    report["dropped"] = int(drop.sum())
+    return cleaned, report
+
+
+def has_findings(report: dict) -> bool:
+    return any(report.get(key) for key in CHECKS)
+
+
+def save_report(ticker: str, report: dict, path=None) -> str:
+    """
+    Zapisuje wyniki kontroli do <QUALITY_REPORT_PATH>/<ticker>.json.
+
+    Plik zawiera listę wpisów (data kontroli + raport). Wykrycia są kluczowane
+    (ticker, data, kontrola): wpis zawiera tylko wykrycia nieobecne we wcześniejszych
+    wpisach, a ponowna kontrola tych samych danych (np. całego roku po dopisaniu
+    nowych notowań) nie dopisuje nic.
+    """
+    path = path or QUALITY_REPORT_PATH
+    file_path = os.path.join(path, f"{ticker}.json")
+
+    entries = load_report(ticker, path)
+    seen = {(check, date) for entry in entries for check in CHECKS for date in entry.get(check, [])}
+    new = {check: [date for date in report.get(check, []) if (check, date) not in seen] for check in CHECKS}
+    if not has_findings(new):
+        return file_path
+
+    entries.append({"checked_at": clock.now().isoformat(timespec="seconds"), **report, **new})
+
+    os.makedirs(path, exist_ok=True)
+
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def load_report(ticker: str, path=None) -> list:
+    """
+    Zwraca zapisane wyniki kontroli dla tickera (pusta lista, gdy brak).
+    """
+    file_path = os.path.join(path or QUALITY_REPORT_PATH, f"{ticker}.json")
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def ingest(ticker: str, df: pd.DataFrame, report_path=None) -> pd.DataFrame:
+    """
+    Etap zapisu do cache: czyszczenie + zapis raportu, gdy kontrola coś wykryła.
+    """
+    cleaned, report = clean_prices(df)
+    if has_findings(report):
+        print(f"[DataQuality] {ticker}: usunięto {report['dropped']} wierszy, "
+              f"luki: {len(report['gaps'])}, skoki: {len(report['jumps'])}")
+        save_report(ticker, report, report_path)
+    return cleaned
@@ -4,20 +4,46 @@
 # - wybór źródła danych (Yahoo / Stooq)
 # - fallback w przypadku błędu
 # - ujednolicenie formatu danych
+# - resampling do świec tygodniowych / miesięcznych (z cache per granulacja)
+# - świece miesięczne z prefetchu (services.prefetch), dopóki znacznik tickera jest ważny
+# - łączenie równoległych żądań o ten sam ticker (single flight)
+# - API asynchroniczne (get_data_async, gather_universe) z limitem równoległości
+
+import asyncio
+import weakref
 
 import pandas as pd
-from services.yahoo_client import fetch_yahoo_data
+from services.prefetch import load_bars
+from services.yahoo_client import fetch_yahoo_data, is_default_source
+from services.fx import asset_currency, convert_frame, load_fx_rates
+from services.resampling import BarCache, resolve_granularity
 from utils.dates import calculate_required_start_date
-from config import START_DATE, MOMENTUM_PERIODS
+from utils.profiling import profiled
+from utils.singleflight import SingleFlight
+from config import START_DATE, MOMENTUM_PERIODS, ASYNC_MAX_CONCURRENCY, ASYNC_CACHE_TTL
 # stooq_client dodamy w kolejnym kroku
 # from services.stooq_client import fetch_stooq_data
 
+# Cache świec: kolejne żądania o tę samą granulację nie powtarzają resamplingu
+_bar_cache = BarCache()
+
+# Łączenie równoległych żądań o te same dane (jedno pobranie na klucz)
+_inflight = SingleFlight()
+
+# Stan API async per pętla zdarzeń: cache zadań i domyślny semafor
+_async_state = weakref.WeakKeyDictionary()
 
+
+@profiled("get_data")
 def get_data(
     ticker: str,
     source: str = "yahoo",
     start_date: str = None,
     interval: str = None,
+    anchor: str = None,
+    columns: list = None,
+    dtype=None,
+    currency: str = None,
 ) -> pd.DataFrame:
     """
     Główna funkcja do pobierania danych historycznych.
@@ -25,73 +51,292 @@ def get_data(
     :param ticker: symbol instrumentu (np. SPY)
     :param source: źródło danych ("yahoo" lub "stooq")
     :param start_date: data początkowa (jeśli None → użyje config.START_DATE)
-    :param interval: interwał resamplingu (np. "M", "W"), domyślnie None (dzienne)
+    :param interval: interwał / typ świecy (np. "M", "W", "1mo", "monthly");
+                     domyślnie None → config.INTERVAL
+    :param anchor: kotwica świecy: "last" lub "first" (domyślnie config.REBALANCE_DAY)
+    :param columns: ładowane kolumny (np. ["Adj Close"]); None → wszystkie
+    :param dtype: precyzja kolumn (np. "float32"); None → float64
+    :param currency: waluta inwestora (np. "PLN"); ceny przeliczane po dziennym kursie
+                     z services.fx (pobranym tą samą ścieżką); None → waluta notowań
     :return: DataFrame z kolumną 'Date' oraz kolumnami cenowymi (Price, Open, Close, Adj Close, Low, High, Volume)
     """
 
     try:
-        # ==========================
-        # WYBÓR ŹRÓDŁA DANYCH
-        # ==========================
+        # Przeliczenie walutowe na danych dziennych (przed resamplingiem): Open/High/Low
+        # świecy liczone są po kursach z dni notowań, a nie po kursie z końca okresu
+        if currency is not None and asset_currency(ticker) != currency.upper():
+            return _load_converted(ticker, source, start_date, interval, anchor, columns, dtype, currency.upper())
+
+        # Równoległe wywołania z tym samym kluczem czekają na jedno ładowanie
+        projection = (tuple(columns) if columns else None, str(dtype) if dtype else None)
+        key = (ticker, source.lower(), start_date, resolve_granularity(interval), anchor, projection)
+        df, shared = _inflight.do(key, _load_data, ticker, source, start_date, interval, anchor, columns, dtype)
+
+        # Współdzielony wynik: każdy wywołujący dostaje własną kopię
+        return df.copy() if shared else df
+
+    except Exception as e:
+        print(f"[DataService] Błąd pobierania danych dla {ticker}: {e}")
+        raise
+
+
+def _load_converted(ticker, source, start_date, interval, anchor, columns, dtype, currency) -> pd.DataFrame:
+    """
+    Dane w walucie inwestora: dzienne notowania przeliczone po kursie z dnia (kurs z cache,
+    jedno mnożenie dla wszystkich kolumn cenowych), a dopiero potem resampling.
+    """
+    projection = (tuple(columns) if columns else None, str(dtype) if dtype else None)
+    key = (ticker, source.lower(), start_date, "daily", None, projection)
+    daily, _ = _inflight.do(key, _load_data, ticker, source, start_date, "daily", None, columns, dtype)
+
+    rates = load_fx_rates(asset_currency(ticker), currency, start_date, loader=get_data)
+    daily = convert_frame(daily, rates)
+    if resolve_granularity(interval) == "daily":
+        return daily
+
+    required_start = calculate_required_start_date(start_date or START_DATE, max(MOMENTUM_PERIODS.values()))
+    bars = _bar_cache.get(
+        (ticker, source.lower(), required_start, projection[0], projection[1], currency),
+        daily.set_index("Date"),
+        bar_type=interval,
+        anchor=anchor,
+    )
+    return bars.reset_index()
+
+
+def _load_data(ticker, source, start_date, interval, anchor, columns=None, dtype=None) -> pd.DataFrame:
+    """
+    Ładowanie danych dla get_data (wykonywane raz dla równoległych wywołań).
+    """
+    # ==========================
+    # WYBÓR ŹRÓDŁA DANYCH
+    # ==========================
+
+    decision_start = start_date or START_DATE
+    momentum_window = max(MOMENTUM_PERIODS.values())
 
-        decision_start = start_date or START_DATE
-        momentum_window = max(MOMENTUM_PERIODS.values())
+    required_start = calculate_required_start_date(
+        decision_start,
+        momentum_window
+    )
 
-        required_start = calculate_required_start_date(
-            decision_start,
-            momentum_window
+    # Świece rozgrzane przez prefetch (także w innym procesie): bez odczytu danych dziennych
+    if (source.lower() == "yahoo" and resolve_granularity(interval) == "monthly"
+            and columns is None and dtype is None and is_default_source()):
+        bars = load_bars(ticker, required_start, anchor)
+        if bars is not None:
+            return bars
+
+    if source.lower() == "yahoo":
+        df = fetch_yahoo_data(
+            ticker=ticker,
+            start_date=required_start.date(),
+            columns=columns,
+            dtype=dtype,
         )
 
-        if source.lower() == "yahoo":
-            df = fetch_yahoo_data(
-                ticker=ticker,
-                start_date=required_start.date(),
-                resample_interval=interval
-            )
+    # W przyszłości dodamy Stooq
+    # elif source.lower() == "stooq":
+    #     df = fetch_stooq_data(...)
 
-        # W przyszłości dodamy Stooq
-        # elif source.lower() == "stooq":
-        #     df = fetch_stooq_data(...)
+    else:
+        raise ValueError(f"Nieznane źródło danych: {source}")
 
-        else:
-            raise ValueError(f"Nieznane źródło danych: {source}")
+    # ==========================
+    # RESAMPLING (cache per granulacja)
+    # ==========================
 
-        # ==========================
-        # UJEDNOLICENIE FORMATU
-        # ==========================
+    df = _bar_cache.get(
+        (ticker, source.lower(), required_start, tuple(columns) if columns else None, str(dtype) if dtype else None),
+        df,
+        bar_type=interval,
+        anchor=anchor,
+    )
 
-        # Upewnij się, że mamy kolumnę 'Date' (źródła często zwracają ją jako indeks)
-        if "Date" not in df.columns:
-            # Jeśli index to DatetimeIndex lub nazywa się 'Date', przenieś go do kolumny
-            if isinstance(df.index, pd.DatetimeIndex) or df.index.name in (None, "Date"):
-                df = df.reset_index()
-                # Gdy indeks był nienazwany, pandas tworzy kolumnę 'index' → zmień na 'Date'
-                if "index" in df.columns:
-                    df = df.rename(columns={"index": "Date"})
+    # ==========================
+    # UJEDNOLICENIE FORMATU
+    # ==========================
 
-        # Sortowanie po dacie (bezpiecznik)
-        df = df.sort_values("Date")
+    # Upewnij się, że mamy kolumnę 'Date' (źródła często zwracają ją jako indeks)
+    if "Date" not in df.columns:
+        # Jeśli index to DatetimeIndex lub nazywa się 'Date', przenieś go do kolumny
+        if isinstance(df.index, pd.DatetimeIndex) or df.index.name in (None, "Date"):
+            df = df.reset_index()
+            # Gdy indeks był nienazwany, pandas tworzy kolumnę 'index' → zmień na 'Date'
+            if "index" in df.columns:
+                df = df.rename(columns={"index": "Date"})
 
-        # Usunięcie ewentualnych duplikatów po dacie
-        df = df.drop_duplicates(subset=["Date"])
+    # Dane w cache są posortowane i bez duplikatów (services.data_quality przy zapisie);
+    # sortowanie i deduplikacja tylko jako bezpiecznik dla danych spoza cache
+    dates = df["Date"]
+    if not (dates.is_monotonic_increasing and dates.is_unique):
+        df = df.sort_values("Date").drop_duplicates(subset=["Date"]).reset_index(drop=True)
 
-        # Reset indeksu po sortowaniu
-        df = df.reset_index(drop=True)
+    return df
 
-        return df
 
-    except Exception as e:
-        print(f"[DataService] Błąd pobierania danych dla {ticker}: {e}")
-        raise
+def get_bars(
+    ticker: str,
+    bar_type="monthly",
+    source: str = "yahoo",
+    start_date: str = None,
+    anchor: str = None,
+    columns: list = None,
+    dtype=None,
+    currency: str = None,
+) -> pd.DataFrame:
+    """
+    Zwraca świece zadeklarowanego typu.
+
+    bar_type: "daily" / "weekly" / "monthly", interwał ("1wk", "1mo", ...)
+    albo obiekt deklarujący atrybut bar_type (np. strategia GEM).
+    """
+    return get_data(
+        ticker, source, start_date, interval=bar_type, anchor=anchor,
+        columns=columns, dtype=dtype, currency=currency,
+    )
 
 
 def get_monthly_data(
     ticker: str,
     source: str = "yahoo",
     start_date: str = None,
+    currency: str = None,
 ) -> pd.DataFrame:
     """
     Pobiera dane dzienne i wykonuje resampling do interwału miesięcznego.
-    Zwraca ostatnią cenę z każdego miesiąca.
+    Zwraca ostatnią cenę z każdego miesiąca (lub pierwszą, gdy REBALANCE_DAY = "first").
+    Po prefetchu (services.prefetch) – świece zapisane przez scheduler, do wygaśnięcia znacznika.
+    currency: opcjonalne przeliczenie na walutę inwestora (np. "PLN").
     """
-    return get_data(ticker, source, start_date, interval="M")
+    return get_bars(ticker, "monthly", source, start_date, currency=currency)
+
+
+
+# ==========================
+# API ASYNCHRONICZNE
+# ==========================
+
+class _AsyncLoopState:
+    # Zadania ładowania (także zakończone – cache z TTL) i semafor dla jednej pętli zdarzeń
+    def __init__(self):
+        self.tasks = {}
+        self.semaphore = asyncio.Semaphore(ASYNC_MAX_CONCURRENCY)
+
+
+def _loop_state() -> _AsyncLoopState:
+    loop = asyncio.get_running_loop()
+    state = _async_state.get(loop)
+    if state is None:
+        state = _async_state[loop] = _AsyncLoopState()
+    return state
+
+
+async def _load_in_thread(semaphore, ticker, source, start_date, interval, anchor):
+    async with semaphore:
+        return await asyncio.to_thread(get_data, ticker, source, start_date, interval, anchor)
+
+
+def clear_async_cache() -> None:
+    """
+    Czyści cache API async w bieżącej pętli zdarzeń.
+    """
+    _loop_state().tasks.clear()
+
+
+def clear_caches() -> None:
+    """
+    Czyści cache w pamięci procesu: świece (resampling) i zadania API async we wszystkich
+    pętlach zdarzeń – np. przy zmianie źródła danych (services.snapshots.replay).
+    """
+    _bar_cache.clear()
+    for state in list(_async_state.values()):
+        state.tasks.clear()
+
+
+async def get_data_async(
+    ticker: str,
+    source: str = "yahoo",
+    start_date: str = None,
+    interval: str = None,
+    anchor: str = None,
+    timeout: float = None,
+    semaphore: asyncio.Semaphore = None,
+) -> pd.DataFrame:
+    """
+    Asynchroniczny odpowiednik get_data – nie blokuje pętli zdarzeń.
+
+    - Odczyt plików i pobieranie z Yahoo wykonywane są w wątku roboczym.
+    - Równoległe wywołania z tym samym kluczem czekają na jedno zadanie, a wynik
+      jest cache'owany w pętli przez config.ASYNC_CACHE_TTL sekund.
+    - timeout: limit czasu w sekundach (asyncio.TimeoutError po przekroczeniu).
+    - Anulowanie lub timeout dotyczą tylko wywołującego; wspólne ładowanie
+      kończy się w tle i zasila cache dla kolejnych żądań.
+    - semaphore: limit równoległych ładowań (domyślnie config.ASYNC_MAX_CONCURRENCY).
+    """
+    state = _loop_state()
+    loop = asyncio.get_running_loop()
+    key = (ticker, source.lower(), start_date, resolve_granularity(interval), anchor)
+
+    entry = state.tasks.get(key)
+    if entry is None or loop.time() - entry[0] > ASYNC_CACHE_TTL:
+        task = loop.create_task(
+            _load_in_thread(semaphore or state.semaphore, ticker, source, start_date, interval, anchor)
+        )
+        entry = state.tasks[key] = (loop.time(), task)
+
+        def _forget_failed(done, key=key, entry=entry):
+            # Błąd nie zostaje w cache; odczyt wyjątku wycisza ostrzeżenie asyncio
+            if done.cancelled() or done.exception() is not None:
+                if state.tasks.get(key) is entry:
+                    del state.tasks[key]
+
+        task.add_done_callback(_forget_failed)
+
+    # shield: anulowanie jednego wywołującego nie przerywa ładowania dla pozostałych
+    df = await asyncio.wait_for(asyncio.shield(entry[1]), timeout)
+    return df.copy()
+
+
+async def get_monthly_data_async(
+    ticker: str,
+    source: str = "yahoo",
+    start_date: str = None,
+    timeout: float = None,
+) -> pd.DataFrame:
+    """
+    Asynchroniczny odpowiednik get_monthly_data.
+    """
+    return await get_data_async(ticker, source, start_date, interval="monthly", timeout=timeout)
+
+
+async def gather_universe(
+    tickers,
+    source: str = "yahoo",
+    start_date: str = None,
+    interval: str = None,
+    concurrency: int = ASYNC_MAX_CONCURRENCY,
+    timeout: float = None,
+    return_exceptions: bool = False,
+) -> dict:
+    """
+    Pobiera dane wielu tickerów równolegle (najwyżej `concurrency` ładowań naraz).
+
+    - timeout: limit czasu dla każdego tickera osobno (łącznie z oczekiwaniem
+      na wolne miejsce w limicie) – jeden wolny ticker nie wstrzymuje pozostałych.
+    - return_exceptions=True: błędy i timeouty trafiają do wyniku jako wyjątki
+      zamiast przerywać całość (jak w asyncio.gather).
+
+    Zwraca dict {ticker: DataFrame lub wyjątek}.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    results = await asyncio.gather(
+        *(
+            get_data_async(ticker, source, start_date, interval, timeout=timeout, semaphore=semaphore)
+            for ticker in tickers
+        ),
+        return_exceptions=return_exceptions,
+    )
+    return dict(zip(tickers, results))
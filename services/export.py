@@ -0,0 +1,241 @@
+# export.py
+# Eksport wyników backtestu do Arrow IPC lub Parquet (zamiast pickle zagnieżdżonych dict).
+# Odpowiada za:
+# - stały schemat tabel: krzywe kapitału, zwroty miesięczne, decyzje, statystyki
+# - zapis wielu backtestów (np. sweep) do jednego zbioru – kolumna Run
+# - odczyt wybranych kolumn; pliki Arrow mapowane w pamięci bez kopiowania
+#
+# pyarrow jest zależnością opcjonalną – importowany dopiero przy eksporcie/odczycie.
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from config import EXPORT_FORMAT, EXPORT_PATH
+from strategy.vectorized import ROLES
+from utils.metrics import STATISTICS
+
+# Wersja schematu – zmiana kolumn lub typów wymaga jej podbicia
+SCHEMA_VERSION = 2
+
+TABLES = ("equity_curves", "monthly_returns", "decisions", "statistics")
+
+EXTENSIONS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Eksport wyników wymaga pakietu pyarrow (pip install pyarrow)") from e
+    return pa
+
+
+def table_schemas() -> dict:
+    """
+    Schematy eksportowanych tabel {nazwa: pa.Schema}.
+
+    Kolumny tekstowe o małej liczbie wartości (Run, Horizon, Ticker) są słownikowe,
+    decyzje zapisywane są jak w strategy.decision_log.DecisionLog: Role to kod roli
+    int8 (strategy.vectorized.ROLES), momentum float32.
+    """
+    pa = _pyarrow()
+    text = pa.dictionary(pa.int32(), pa.string())
+    date = pa.field("Date", pa.timestamp("ns"), nullable=False)
+    metadata = {"gem.schema_version": str(SCHEMA_VERSION), "gem.roles": json.dumps(ROLES)}
+
+    schemas = {
+        "equity_curves": [pa.field("Run", text), date, pa.field("Horizon", text), pa.field("Equity", pa.float64())],
+        "monthly_returns": [pa.field("Run", text), date, pa.field("Horizon", text), pa.field("Return", pa.float64())],
+        "decisions": [
+            pa.field("Run", text), date, pa.field("Horizon", text),
+            pa.field("Role", pa.int8()), pa.field("Ticker", text),
+            pa.field("Momentum US", pa.float32()), pa.field("Momentum exUS", pa.float32()),
+            pa.field("Risk On", pa.bool_()),
+        ],
+        "statistics": [
+            pa.field("Run", text), pa.field("Horizon", text), pa.field("Net", pa.bool_()),
+            *(pa.field(name, pa.float64()) for name in STATISTICS),
+        ],
+    }
+    return {name: pa.schema(fields, metadata={**metadata, "gem.table": name}) for name, fields in schemas.items()}
+
+
+def _dictionary(pa, indices: np.ndarray, values: list):
+    return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()), pa.array(values, type=pa.string()))
+
+
+def _concat(parts, dtype) -> np.ndarray:
+    return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+
+def _series_table(pa, schema, results: dict, key: str, value_column: str):
+    # Serie {horyzont: pd.Series} wszystkich backtestów sklejone w jedną tabelę (format długi)
+    runs, dates, horizons, values = [], [], [], []
+    labels = []
+
+    for r, result in enumerate(results.values()):
+        for h, series in result[key].items():
+            if h not in labels:
+                labels.append(h)
+            n = len(series)
+            runs.append(np.full(n, r, dtype=np.int32))
+            horizons.append(np.full(n, labels.index(h), dtype=np.int32))
+            dates.append(series.index.values.astype("datetime64[ns]"))
+            values.append(series.to_numpy(dtype=np.float64))
+
+    return pa.table({
+        "Run": _dictionary(pa, _concat(runs, np.int32), [str(run) for run in results]),
+        "Date": pa.array(_concat(dates, "datetime64[ns]"), type=pa.timestamp("ns")),
+        "Horizon": _dictionary(pa, _concat(horizons, np.int32), labels),
+        value_column: pa.array(_concat(values, np.float64), type=pa.float64()),
+    }, schema=schema)
+
+
+def _decision_table(pa, schema, results: dict):
+    # Logi decyzji (DecisionLog) kopiowane blokami: horyzont × miesiące, bez dekodowania wierszy
+    runs, dates, horizons, codes, tickers, momentum, risk_on = [], [], [], [], [], [], []
+    labels, names = [], []
+
+    for r, result in enumerate(results.values()):
+        log = result["decision_log"]
+        n_horizons, n_dates = log.codes.shape
+        for h in log.horizons:
+            if h not in labels:
+                labels.append(h)
+
+        # Ticker jako indeks słownika: kod roli → pozycja tickera tego uruchomienia
+        run_names = [log.tickers.get(role, role) for role in ROLES]
+        for name in run_names:
+            if name not in names:
+                names.append(name)
+        ticker_pos = np.array([names.index(name) for name in run_names], dtype=np.int32)
+
+        runs.append(np.full(log.codes.size, r, dtype=np.int32))
+        dates.append(np.tile(log.dates, n_horizons))
+        horizons.append(np.repeat([labels.index(h) for h in log.horizons], n_dates).astype(np.int32))
+        codes.append(log.codes.reshape(-1))
+        tickers.append(ticker_pos[log.codes.reshape(-1)])
+        momentum.append(log.momentum.transpose(0, 2, 1).reshape(-1, 2))
+        risk_on.append(log.risk_on.reshape(-1))
+
+    momentum = np.concatenate(momentum) if momentum else np.empty((0, 2), dtype=np.float32)
+    return pa.table({
+        "Run": _dictionary(pa, _concat(runs, np.int32), [str(run) for run in results]),
+        "Date": pa.array(_concat(dates, "datetime64[ns]"), type=pa.timestamp("ns")),
+        "Horizon": _dictionary(pa, _concat(horizons, np.int32), labels),
+        "Role": pa.array(_concat(codes, np.int8), type=pa.int8()),
+        "Ticker": _dictionary(pa, _concat(tickers, np.int32), names),
+        "Momentum US": pa.array(np.ascontiguousarray(momentum[:, 0]), type=pa.float32()),
+        "Momentum exUS": pa.array(np.ascontiguousarray(momentum[:, 1]), type=pa.float32()),
+        "Risk On": pa.array(_concat(risk_on, bool), type=pa.bool_()),
+    }, schema=schema)
+
+
+def _tables(results: dict) -> dict:
+    pa = _pyarrow()
+    schemas = table_schemas()
+
+    tables = {
+        "equity_curves": _series_table(pa, schemas["equity_curves"], results, "equity_curves", "Equity"),
+        "monthly_returns": _series_table(pa, schemas["monthly_returns"], results, "monthly_returns", "Return"),
+        "decisions": _decision_table(pa, schemas["decisions"], results),
+    }
+
+    rows = {"Run": [], "Horizon": [], "Net": [], **{stat: [] for stat in STATISTICS}}
+    for run, result in results.items():
+        for net, key in ((False, "statistics"), (True, "net_statistics")):
+            for h, stats in result.get(key, {}).items():
+                rows["Run"].append(str(run))
+                rows["Horizon"].append(h)
+                rows["Net"].append(net)
+                for stat in STATISTICS:
+                    rows[stat].append(float(stats[stat]))
+
+    columns = dict(rows)
+    columns["Run"] = pa.array(rows["Run"], type=pa.string()).dictionary_encode()
+    columns["Horizon"] = pa.array(rows["Horizon"], type=pa.string()).dictionary_encode()
+    tables["statistics"] = pa.table(columns, schema=schemas["statistics"])
+
+    return tables
+
+
+def _file_path(path: Path, table: str, fmt: str) -> Path:
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Nieznany format eksportu: {fmt} (dostępne: {tuple(EXTENSIONS)})")
+    return path / f"{table}{EXTENSIONS[fmt]}"
+
+
+def _write(table, file_path: Path, fmt: str) -> None:
+    pa = _pyarrow()
+    tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+
+    if fmt == "arrow":
+        # Plik IPC bez kompresji – czytelnik mapuje bufory bez kopiowania
+        with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp_path)
+
+    os.replace(tmp_path, file_path)
+
+
+def export_backtests(results: dict, path=None, fmt: str = None) -> dict:
+    """
+    Zapisuje wiele wyników backtest_gem (np. sweep) jako zbiór tabel Arrow/Parquet.
+
+    Args:
+        results: dict {nazwa uruchomienia: wynik backtest_gem}
+        path: katalog zbioru (domyślnie EXPORT_PATH)
+        fmt: "arrow" (IPC) lub "parquet" (domyślnie EXPORT_FORMAT)
+
+    Returns:
+        dict {tabela: ścieżka pliku}
+    """
+    fmt = fmt or EXPORT_FORMAT
+    path = Path(path or EXPORT_PATH)
+
+    missing = [run for run, result in results.items() if "decision_log" not in result]
+    if missing:
+        raise ValueError(f"Wyniki bez logu decyzji (decision_log): {missing}")
+
+    paths = {table: _file_path(path, table, fmt) for table in TABLES}
+    tables = _tables(results)
+
+    path.mkdir(parents=True, exist_ok=True)
+    for name, table in tables.items():
+        _write(table, paths[name], fmt)
+
+    return paths
+
+
+def export_backtest(result: dict, path=None, fmt: str = None, run: str = "backtest") -> dict:
+    """
+    Zapisuje jeden wynik backtest_gem (jak export_backtests z jednym uruchomieniem).
+    """
+    return export_backtests({run: result}, path, fmt)
+
+
+def read_table(path, table: str, columns=None, fmt: str = None):
+    """
+    Czyta tabelę zbioru jako pa.Table, opcjonalnie tylko wybrane kolumny.
+
+    Format Arrow jest mapowany w pamięci: kolumny wskazują na bufory pliku
+    (bez kopiowania, czytane są tylko strony użytych kolumn).
+    Parquet czyta z dysku jedynie wybrane kolumny.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Nieznana tabela: {table} (dostępne: {TABLES})")
+
+    pa = _pyarrow()
+    file_path = _file_path(Path(path or EXPORT_PATH), table, fmt or EXPORT_FORMAT)
+
+    if file_path.suffix == EXTENSIONS["arrow"]:
+        result = pa.ipc.open_file(pa.memory_map(str(file_path), "r")).read_all()
+        return result.select(list(columns)) if columns is not None else result
+
+    import pyarrow.parquet as pq
+    return pq.read_table(file_path, columns=list(columns) if columns is not None else None, memory_map=True)
@@ -0,0 +1,125 @@
+# fx.py
+# Przeliczanie notowań na walutę inwestora (np. USD → PLN).
+# Odpowiada za:
+# - pobieranie kursów walut (np. USDPLN=X) tą samą ścieżką co notowania (data_service, cache)
+# - jednorazowe wyrównanie kursu do dat notowań (ostatni kurs z dnia lub sprzed dnia)
+# - przeliczenie wszystkich kolumn cenowych jednym mnożeniem z broadcastem
+
+import numpy as np
+import pandas as pd
+
+from config import ASSET_CURRENCIES, DEFAULT_ASSET_CURRENCY
+from utils.panel import PricePanel
+
+# Kolumny przeliczane na walutę bazową (Volume pozostaje bez zmian)
+PRICE_FIELDS = ["Price", "Open", "Close", "Adj Close", "Low", "High"]
+
+
+def fx_ticker(from_currency: str, to_currency: str) -> str:
+    """
+    Ticker Yahoo dla kursu walutowego, np. ("USD", "PLN") → "USDPLN=X".
+    """
+    return f"{from_currency.upper()}{to_currency.upper()}=X"
+
+
+def asset_currency(ticker: str) -> str:
+    """
+    Waluta notowań tickera (config.ASSET_CURRENCIES, domyślnie DEFAULT_ASSET_CURRENCY).
+    """
+    return ASSET_CURRENCIES.get(ticker, DEFAULT_ASSET_CURRENCY).upper()
+
+
+def load_fx_rates(from_currency: str, to_currency: str, start_date: str = None, loader=None) -> pd.Series:
+    """
+    Dzienny kurs from_currency → to_currency (Series z DatetimeIndex).
+
+    loader: funkcja jak data_service.get_data (domyślnie ona – kurs trafia do tego samego
+    cache i podlega łączeniu równoległych żądań).
+    """
+    if loader is None:
+        from services.data_service import get_data as loader
+
+    df = loader(fx_ticker(from_currency, to_currency), start_date=start_date,
+                interval="daily", columns=["Close"])
+    if df.empty:
+        raise ValueError(f"Brak kursu {fx_ticker(from_currency, to_currency)}")
+
+    dates = df["Date"] if "Date" in df.columns else df.index
+    return pd.Series(df["Close"].to_numpy(dtype=np.float64), index=pd.DatetimeIndex(dates), name="FX")
+
+
+def align_rates(rates: pd.Series, dates) -> np.ndarray:
+    """
+    Kurs obowiązujący na każdą z dat: ostatnie notowanie kursu z tego dnia lub wcześniejsze.
+    Daty sprzed pierwszego notowania kursu dostają NaN.
+    """
+    positions = rates.index.searchsorted(pd.DatetimeIndex(dates), side="right") - 1
+    values = rates.to_numpy(dtype=np.float64)
+    return np.where(positions >= 0, values[np.maximum(positions, 0)], np.nan)
+
+
+def convert_frame(df: pd.DataFrame, rates: pd.Series) -> pd.DataFrame:
+    """
+    Przelicza kolumny cenowe DataFrame (indeks dat albo kolumna 'Date') po kursie rates.
+    Zwraca nowy DataFrame (attrs zachowane).
+    """
+    dates = df["Date"] if "Date" in df.columns else df.index
+    factor = align_rates(rates, dates)
+
+    columns = [c for c in PRICE_FIELDS if c in df.columns]
+    converted = df.copy()
+    values = df[columns].to_numpy()
+    converted[columns] = (values * factor[:, None]).astype(values.dtype, copy=False)
+    converted.attrs = dict(df.attrs)
+    return converted
+
+
+def convert_panel(panel: PricePanel, rates) -> PricePanel:
+    """
+    Przelicza PricePanel: jeden kurs dla wszystkich kolumn (Series) albo dict {kolumna: Series}
+    dla kolumn w różnych walutach. Kursy wyrównywane są raz, przeliczenie to jedno mnożenie.
+    """
+    if isinstance(rates, pd.Series):
+        factor = align_rates(rates, panel.dates)[:, None]
+    else:
+        factor = np.ones(panel.values.shape)
+        for name, series in rates.items():
+            factor[:, panel.column_index(name)] = align_rates(series, panel.dates)
+
+    return PricePanel(
+        dates=panel.dates,
+        values=panel.values * factor,
+        columns=panel.columns,
+        column=panel.column,
+        tickers=panel.tickers,
+    )
+
+
+def convert_assets(assets: dict, currency: str, start_date: str = None, loader=None) -> dict:
+    """
+    Przelicza dict {rola: DataFrame} (wejście backtest_gem) na walutę currency.
+
+    Waluta każdego aktywa wynika z attrs["ticker"] (asset_currency); każdy kurs
+    pobierany jest raz, niezależnie od liczby aktywów w tej walucie.
+    start_date: początek kursów (domyślnie najwcześniejsza data wśród aktywów).
+    """
+    currency = currency.upper()
+    if start_date is None:
+        first_dates = [
+            (df["Date"] if "Date" in df.columns else df.index).min() for df in assets.values() if len(df)
+        ]
+        start_date = str(min(first_dates).date()) if first_dates else None
+
+    rates = {}
+    converted = {}
+
+    for role, df in assets.items():
+        source = asset_currency(df.attrs.get("ticker", role))
+        if source == currency:
+            converted[role] = df
+            continue
+        if source not in rates:
+            rates[source] = load_fx_rates(source, currency, start_date, loader)
+        converted[role] = convert_frame(df, rates[source])
+
+    return converted
@@ -0,0 +1,225 @@
+# prefetch.py
+# Rozgrzewanie cache po zamknięciu ostatniej sesji miesiąca.
+# Odpowiada za:
+# - wyznaczenie okna prefetchu (ostatni dzień roboczy miesiąca, po PREFETCH_CLOSE_HOUR)
+# - pobranie notowań dziennych do cache (raw) i zapis świec miesięcznych (processed)
+# - znaczniki gotowości: do zamknięcia następnej sesji yahoo_client nie pobiera
+#   aktualizacji, a data_service zwraca zapisane świece miesięczne (load_bars), więc
+#   żądania pierwszego dnia miesiąca – także w innych procesach – obsługuje wyłącznie cache
+# - raport czasów per ticker
+#
+# Uruchomienie: python main.py prefetch [--tickers SPY,VEU,BND]   (jednorazowo)
+#               python main.py schedule                          (pętla: co miesiąc)
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from config import (
+    MOMENTUM_PERIODS, PREFETCH_CLOSE_HOUR, PREFETCH_PATH, PREFETCH_UNIVERSE, REBALANCE_DAY, START_DATE,
+)
+from utils import clock
+from utils.dates import calculate_required_start_date
+
+REPORT_COLUMNS = ["Ticker", "Status", "Last Date", "Rows", "Raw [s]", "Processed [s]", "Total [s]", "Error"]
+
+
+def last_trading_day(day=None) -> pd.Timestamp:
+    """
+    Ostatni dzień roboczy (pon–pt) miesiąca, w którym wypada day (domyślnie dziś).
+    """
+    day = pd.Timestamp(day if day is not None else clock.today()).normalize()
+    return pd.offsets.BMonthEnd().rollforward(day)
+
+
+def next_run(now: datetime = None) -> datetime:
+    """
+    Najbliższa chwila prefetchu: zamknięcie ostatniej sesji bieżącego miesiąca
+    (albo następnego, gdy ta chwila już minęła).
+    """
+    now = now or clock.now()
+    moment = last_trading_day(now).to_pydatetime().replace(hour=PREFETCH_CLOSE_HOUR)
+    if moment <= now:
+        moment = last_trading_day(pd.Timestamp(now) + pd.offsets.MonthBegin(1)).to_pydatetime()
+        moment = moment.replace(hour=PREFETCH_CLOSE_HOUR)
+    return moment
+
+
+def _valid_until(last_date) -> datetime:
+    # Dane są kompletne do zamknięcia następnej sesji po ostatnim notowaniu w cache
+    next_session = pd.Timestamp(last_date).normalize() + pd.offsets.BDay(1)
+    return next_session.to_pydatetime().replace(hour=PREFETCH_CLOSE_HOUR)
+
+
+def _marker_path(ticker: str, path=None) -> Path:
+    return Path(path or PREFETCH_PATH) / "markers" / f"{ticker}.json"
+
+
+def load_marker(ticker: str, path=None):
+    """
+    Znacznik gotowości tickera (dict) albo None, gdy nie istnieje.
+    """
+    file_path = _marker_path(ticker, path)
+    if not file_path.exists():
+        return None
+    with open(file_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_ready(ticker: str, now: datetime = None, path=None) -> bool:
+    """
+    True, gdy cache tickera został rozgrzany i od tego czasu nie było zamknięcia
+    nowej sesji – aktualizacja z Yahoo nie przyniosłaby nowych danych.
+    """
+    marker = load_marker(ticker, path)
+    if marker is None:
+        return False
+    return (now or clock.now()) < datetime.fromisoformat(marker["valid_until"])
+
+
+def _bars_path(ticker: str, path=None) -> Path:
+    return Path(path or PREFETCH_PATH) / "bars" / f"{ticker}.csv"
+
+
+def load_bars(ticker: str, required_start, anchor: str = None, now: datetime = None, path=None):
+    """
+    Świece miesięczne zapisane przez warm_ticker (DataFrame z kolumną 'Date') albo None,
+    gdy znacznik wygasł lub świece policzono dla innego zakresu danych albo kotwicy.
+    """
+    marker = load_marker(ticker, path)
+    if marker is None or (now or clock.now()) >= datetime.fromisoformat(marker["valid_until"]):
+        return None
+
+    bars = marker.get("bars")
+    if bars is None or bars != {"start": str(pd.Timestamp(required_start).date()), "anchor": anchor or REBALANCE_DAY}:
+        return None
+
+    file_path = _bars_path(ticker, path)
+    if not file_path.exists():
+        return None
+    return pd.read_csv(file_path, parse_dates=["Date"])
+
+
+def _write_marker(ticker: str, marker: dict, path=None) -> None:
+    file_path = _marker_path(ticker, path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(marker, f, indent=2)
+    os.replace(tmp_path, file_path)
+
+
+def clear_markers(tickers=None, path=None) -> None:
+    directory = Path(path or PREFETCH_PATH) / "markers"
+    files = [directory / f"{t}.json" for t in tickers] if tickers else directory.glob("*.json")
+    for file_path in files:
+        Path(file_path).unlink(missing_ok=True)
+
+
+def warm_ticker(ticker: str, start_date: str = None, path=None, fetch=None, bars=None) -> dict:
+    """
+    Rozgrzewa cache jednego tickera i zapisuje znacznik gotowości.
+
+    fetch / bars: funkcje pobierające dane dzienne (domyślnie yahoo_client.fetch_yahoo_data)
+    i świece miesięczne (domyślnie data_service.get_monthly_data).
+
+    Returns:
+        wiersz raportu (REPORT_COLUMNS)
+    """
+    if fetch is None:
+        from services.yahoo_client import fetch_yahoo_data as fetch
+    if bars is None:
+        from services.data_service import get_monthly_data as bars
+
+    path = Path(path or PREFETCH_PATH)
+    # Ten sam zakres co data_service.get_data, więc świece liczone są wyłącznie z cache
+    required_start = calculate_required_start_date(start_date or START_DATE, max(MOMENTUM_PERIODS.values()))
+    row = dict.fromkeys(REPORT_COLUMNS)
+    row["Ticker"] = ticker
+
+    try:
+        # Wcześniejszy znacznik nie może blokować aktualizacji w trakcie rozgrzewania
+        clear_markers([ticker], path)
+
+        start = time.perf_counter()
+        daily = fetch(ticker, str(required_start.date()))
+        row["Raw [s]"] = round(time.perf_counter() - start, 3)
+        if daily.empty:
+            raise ValueError(f"Brak notowań dla {ticker}")
+
+        last_date = daily.index.max()
+        marker = {
+            "ticker": ticker,
+            "last_date": str(last_date.date()),
+            "valid_until": _valid_until(last_date).isoformat(),
+            "warmed_at": clock.now().isoformat(timespec="seconds"),
+            "rows": int(len(daily)),
+        }
+        # Znacznik przed budową świec: ich odczyt korzysta już tylko z cache
+        _write_marker(ticker, marker, path)
+
+        start = time.perf_counter()
+        monthly = bars(ticker, start_date=start_date)
+        marker["monthly_rows"] = int(len(monthly))
+        if not monthly.empty:
+            file_path = _bars_path(ticker, path)
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = file_path.with_suffix(".csv.tmp")
+            monthly.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, file_path)
+            # Zakres i kotwica świec – load_bars zwraca je tylko dla takiego samego żądania
+            marker["bars"] = {"start": str(required_start.date()), "anchor": REBALANCE_DAY}
+        row["Processed [s]"] = round(time.perf_counter() - start, 3)
+
+        _write_marker(ticker, marker, path)
+
+        row.update({"Status": "ready", "Last Date": str(last_date.date()), "Rows": int(len(daily))})
+    except Exception as e:
+        row.update({"Status": "error", "Error": str(e)})
+
+    row["Total [s]"] = round((row["Raw [s]"] or 0) + (row["Processed [s]"] or 0), 3)
+    return row
+
+
+def warm(tickers=None, start_date: str = None, workers: int = 4, path=None, fetch=None, bars=None) -> pd.DataFrame:
+    """
+    Rozgrzewa cache dla uniwersum (domyślnie PREFETCH_UNIVERSE); pobieranie w wątkach.
+
+    Returns:
+        DataFrame z raportem czasów per ticker (REPORT_COLUMNS)
+    """
+    tickers = list(tickers or PREFETCH_UNIVERSE)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        rows = list(executor.map(lambda t: warm_ticker(t, start_date, path, fetch, bars), tickers))
+
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+
+def run_scheduler(tickers=None, workers: int = 4, path=None, stop: threading.Event = None, on_report=print) -> None:
+    """
+    Pętla schedulera: czeka do zamknięcia ostatniej sesji miesiąca, rozgrzewa cache
+    i przekazuje raport do on_report. Kończy się po ustawieniu stop.
+    """
+    stop = stop or threading.Event()
+
+    while not stop.is_set():
+        moment = next_run()
+        print(f"[Prefetch] Następne uruchomienie: {moment:%Y-%m-%d %H:%M}")
+
+        # Oczekiwanie w krótkich odcinkach – zegar aplikacji może być podmieniony
+        while not stop.is_set() and clock.now() < moment:
+            stop.wait(min(60.0, max(0.0, (moment - clock.now()).total_seconds())))
+        if stop.is_set():
+            break
+
+        on_report(warm(tickers, workers=workers, path=path))
+        # Ochrona przed ponownym uruchomieniem w tym samym oknie
+        if clock.now() < moment + timedelta(seconds=1):
+            stop.wait(1.0)
@@ -0,0 +1,207 @@
+# resampling.py
+# Etap resamplingu danych dziennych do świec tygodniowych i miesięcznych.
+# Odpowiada za:
+# - wyznaczenie okresów (tydzień / miesiąc) w jednym przejściu po danych dziennych
+# - kotwiczenie świec na pierwszym lub ostatnim dniu sesyjnym okresu (REBALANCE_DAY)
+# - cache wyników osobno dla każdej granulacji
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import INTERVAL, REBALANCE_DAY
+
+GRANULARITIES = ("daily", "weekly", "monthly")
+ANCHORS = ("first", "last")
+
+# Aliasy interwałów (config.INTERVAL, yfinance, pandas) → granulacja
+_INTERVAL_ALIASES = {
+    "1d": "daily", "D": "daily", "daily": "daily",
+    "1wk": "weekly", "W": "weekly", "weekly": "weekly",
+    "1mo": "monthly", "M": "monthly", "ME": "monthly", "monthly": "monthly",
+}
+
+# Agregacja kolumn dla kotwicy "last" (świeca OHLCV okresu)
+AGGREGATIONS = {
+    "Price": "last",
+    "Open": "first",
+    "Close": "last",
+    "Adj Close": "last",
+    "Low": "min",
+    "High": "max",
+    "Volume": "sum",
+}
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def resolve_granularity(bar_type=None) -> str:
+    """
+    Zamienia deklarację typu świecy na granulację ("daily", "weekly", "monthly").
+
+    Akceptuje: nazwę granulacji, interwał ("1d", "1wk", "1mo", "M", "W"),
+    obiekt z atrybutem bar_type (np. strategię) albo None (→ config.INTERVAL).
+    """
+    bar_type = getattr(bar_type, "bar_type", bar_type)
+    if bar_type is None:
+        bar_type = INTERVAL
+
+    try:
+        return _INTERVAL_ALIASES[bar_type]
+    except KeyError:
+        raise ValueError(f"Nieznany typ świecy: {bar_type}") from None
+
+
+def _resolve_anchor(anchor) -> str:
+    anchor = anchor or REBALANCE_DAY
+    if anchor not in ANCHORS:
+        raise ValueError(f"Nieznana kotwica świecy: {anchor} (dozwolone: {ANCHORS})")
+    return anchor
+
+
+def _period_codes(index: pd.DatetimeIndex, granularities) -> dict:
+    """
+    Numer okresu dla każdego dnia: miesiąc = rok*12 + miesiąc, tydzień = tydzień od poniedziałku.
+    """
+    days = index.asi8 // _NS_PER_DAY
+    codes = {}
+
+    if "weekly" in granularities:
+        # 1970-01-01 to czwartek: +3 dni przesuwa początek tygodnia na poniedziałek
+        codes["weekly"] = (days + 3) // 7
+    if "monthly" in granularities:
+        codes["monthly"] = index.year.to_numpy() * 12 + index.month.to_numpy() - 1
+
+    return codes
+
+
+def _first_valid(values: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    # Pierwsza wartość różna od NaN w każdym okresie (NaN, gdy okres nie ma żadnej)
+    n = len(values)
+    positions = np.where(pd.isna(values), n, np.arange(n))
+    positions = np.minimum.accumulate(positions[::-1])[::-1][starts]
+    return _take_valid(values, positions, positions <= ends)
+
+
+def _last_valid(values: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    # Ostatnia wartość różna od NaN w każdym okresie (NaN, gdy okres nie ma żadnej)
+    positions = np.where(pd.isna(values), -1, np.arange(len(values)))
+    positions = np.maximum.accumulate(positions)[ends]
+    return _take_valid(values, positions, positions >= starts)
+
+
+def _take_valid(values: np.ndarray, positions: np.ndarray, found: np.ndarray) -> np.ndarray:
+    if found.all():
+        return values[positions]
+    result = values[np.clip(positions, 0, len(values) - 1)].astype(np.float64)
+    result[~found] = np.nan
+    return result
+
+
+def _aggregate(df: pd.DataFrame, codes: np.ndarray, anchor: str) -> pd.DataFrame:
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)] - 1
+
+    if anchor == "first":
+        # Stan z pierwszego dnia sesyjnego okresu (dzień rebalancingu);
+        # brakująca wartość uzupełniana pierwszą dostępną w okresie
+        columns = {column: _first_valid(df[column].to_numpy(), starts, ends) for column in df.columns}
+        return pd.DataFrame(columns, index=df.index[starts])
+
+    columns = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        how = AGGREGATIONS.get(column, "last")
+
+        # Brak notowania (NaN) na skraju okresu nie usuwa całej świecy
+        if how == "first":
+            columns[column] = _first_valid(values, starts, ends)
+        elif how == "last":
+            columns[column] = _last_valid(values, starts, ends)
+        elif how == "max":
+            columns[column] = np.fmax.reduceat(values, starts)
+        elif how == "min":
+            columns[column] = np.fmin.reduceat(values, starts)
+        else:
+            columns[column] = np.add.reduceat(np.nan_to_num(values), starts)
+
+    return pd.DataFrame(columns, index=df.index[ends])
+
+
+def resample_bars(df: pd.DataFrame, granularities=("weekly", "monthly"), anchor: str = None) -> dict:
+    """
+    Resampling danych dziennych do kilku granulacji w jednym przejściu.
+
+    - df: dane dzienne z DatetimeIndex (format fetch_yahoo_data), posortowane rosnąco
+    - anchor "last": świeca OHLCV okresu, data = ostatni dzień sesyjny okresu
+    - anchor "first": wiersz z pierwszego dnia sesyjnego okresu, data = ten dzień
+    - zwraca dict {granulacja: DataFrame} (dla "daily" – dane wejściowe)
+    """
+    anchor = _resolve_anchor(anchor)
+    result = {}
+
+    if "daily" in granularities:
+        result["daily"] = df
+
+    if df.empty:
+        return {g: df for g in granularities}
+
+    codes = _period_codes(df.index, granularities)
+    for granularity, period_codes in codes.items():
+        result[granularity] = _aggregate(df, period_codes, anchor).dropna()
+
+    return result
+
+
+def resample(df: pd.DataFrame, bar_type=None, anchor: str = None) -> pd.DataFrame:
+    """
+    Resampling do jednej granulacji (skrót dla resample_bars).
+    """
+    granularity = resolve_granularity(bar_type)
+    return resample_bars(df, (granularity,), anchor)[granularity]
+
+
+def _data_version(df: pd.DataFrame) -> tuple:
+    # Tania sygnatura danych dziennych: rozmiar, zakres dat i suma kontrolna wartości
+    if df.empty:
+        return (0,)
+    return (len(df), df.index[0], df.index[-1], float(np.nansum(df.to_numpy(dtype=np.float64))))
+
+
+class BarCache:
+    """
+    Cache świec per (klucz danych, granulacja, kotwica).
+
+    Przy pierwszym żądaniu wszystkie granulacje dla danej kotwicy liczone są
+    w jednym przejściu po danych dziennych; kolejne żądania (także o inną
+    granulację) nie wykonują resamplingu, dopóki dane dzienne się nie zmienią.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, daily: pd.DataFrame, bar_type=None, anchor: str = None) -> pd.DataFrame:
+        granularity = resolve_granularity(bar_type)
+        if granularity == "daily":
+            return daily
+
+        anchor = _resolve_anchor(anchor)
+        version = _data_version(daily)
+
+        with self._lock:
+            entry = self._entries.get((key, anchor))
+            if entry is not None and entry[0] == version:
+                return entry[1][granularity]
+
+        bars = resample_bars(daily, ("weekly", "monthly"), anchor)
+
+        with self._lock:
+            self._entries[(key, anchor)] = (version, bars)
+
+        return bars[granularity]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,135 @@
+# result_cache.py
+# Dyskowy cache wyników (backtest, sygnały GEM) adresowany treścią.
+# Odpowiada za:
+# - zapis wyników pod kluczem = skrót(wersja danych, parametry, wersja kodu)
+# - kompaktowy format binarny (pickle + zlib)
+# - limit rozmiaru z usuwaniem najdawniej używanych wpisów (LRU wg mtime)
+# - bezpieczne współdzielenie katalogu między procesami (atomowy zapis)
+
+import math
+import os
+import pickle
+import tempfile
+import zlib
+from pathlib import Path
+
+from config import RESULT_CACHE_PATH, RESULT_CACHE_MAX_BYTES
+
+_SUFFIX = ".bin"
+
+
+class ResultCache:
+    """
+    Cache wyników w katalogu: <path>/<2 znaki klucza>/<klucz>.bin
+
+    - Odczyt aktualizuje mtime pliku, więc mtime = czas ostatniego użycia.
+    - Po zapisie, gdy łączny rozmiar przekracza max_bytes, usuwane są wpisy
+      z najstarszym mtime; max_bytes=math.inf wyłącza usuwanie (trwały magazyn, np. stanu).
+    - Zapis przez plik tymczasowy + os.replace: inne procesy nigdy nie widzą
+      niepełnego wpisu.
+    """
+
+    def __init__(self, path=None, max_bytes: int = None):
+        self.path = Path(path or RESULT_CACHE_PATH)
+        self.max_bytes = RESULT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}{_SUFFIX}"
+
+    def get(self, key: str, default=None):
+        entry = self._entry_path(key)
+
+        try:
+            with open(entry, "rb") as f:
+                payload = f.read()
+            os.utime(entry)
+        except FileNotFoundError:
+            return default
+
+        try:
+            return pickle.loads(zlib.decompress(payload))
+        except (zlib.error, pickle.UnpicklingError, EOFError):
+            # Uszkodzony wpis traktujemy jak brak wpisu
+            self._remove(entry)
+            return default
+
+    def put(self, key: str, value) -> None:
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+        fd, tmp_path = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, entry)
+        except BaseException:
+            self._remove(Path(tmp_path))
+            raise
+
+        self.evict()
+
+    def __contains__(self, key: str) -> bool:
+        return self._entry_path(key).exists()
+
+    def get_or_compute(self, key: str, compute):
+        """
+        Zwraca wynik z cache albo wywołuje compute() i zapisuje jego wynik.
+        """
+        missing = object()
+        value = self.get(key, missing)
+
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+
+        return value
+
+    def entries(self) -> list:
+        """
+        Lista (mtime, rozmiar, ścieżka) dla wszystkich wpisów.
+        """
+        result = []
+
+        for entry in self.path.glob(f"*/*{_SUFFIX}"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            result.append((stat.st_mtime, stat.st_size, entry))
+
+        return result
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> None:
+        """
+        Usuwa najdawniej używane wpisy, aż łączny rozmiar zmieści się w max_bytes.
+        """
+        if self.max_bytes == math.inf:
+            return
+
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            self._remove(entry)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        for _, _, entry in self.entries():
+            self._remove(entry)
+
+    @staticmethod
+    def _remove(entry: Path) -> None:
+        try:
+            entry.unlink()
+        except FileNotFoundError:
+            pass
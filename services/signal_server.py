@@ -0,0 +1,316 @@
+# signal_server.py
+# Lokalny serwis HTTP/JSON z bieżącymi sygnałami GEM.
+# Odpowiada za:
+# - trzymanie świec miesięcznych i wyników GEM w pamięci (bez importów i CSV na każde żądanie)
+# - odpowiedź na pytanie "aktualny sygnał dla (asset_a, asset_b, defensive)"
+# - przyrostowe odświeżanie: przeliczane są tylko tickery, których dane się zmieniły
+# - obsługę równoległych żądań (wątek na żądanie, odczyt świec bez blokad,
+#   ładowanie każdego tickera raz i niezależnie od pozostałych)
+#
+# Uruchomienie: python -m services.signal_server --port 8765
+# Zapytanie:    GET /signal?asset_a=SPY&asset_b=VEU&defensive=BND[&date=2025-03-01][&signal=accelerating]
+
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from config import SIGNAL_CACHE_SIZE
+from strategy.gem import GEM
+from utils import clock
+from utils.hashing import data_fingerprint
+from utils.singleflight import SingleFlight
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def _default_loader(ticker: str):
+    # Import leniwy: serwer z własnym loaderem (np. w testach) nie potrzebuje yfinance
+    from services.data_service import get_monthly_data
+    return get_monthly_data(ticker)
+
+
+def _bars_version(df) -> str:
+    # Sygnatura świec: skrót całej ramki – wykrywa nową świecę, korektę ostatniej
+    # i rewizję historycznych notowań (np. Adj Close po dywidendzie)
+    return data_fingerprint(df)
+
+
+class _SnapshotDataService:
+    """
+    Adapter data_service dla GEM, czytający świece z migawki w pamięci.
+    Cała ewaluacja widzi jedną spójną wersję danych, nawet gdy w tle trwa odświeżanie.
+    """
+
+    def __init__(self, snapshot: dict):
+        self.snapshot = snapshot
+
+    def get_monthly_data(self, ticker: str):
+        return self.snapshot[ticker][1]
+
+
+class SignalState:
+    """
+    Stan serwisu: świece miesięczne per ticker + cache wyników GEM.
+
+    Świece przechowywane są w niemutowalnej migawce (dict podmieniany w całości),
+    więc odczyty nie wymagają blokady. Brakujący ticker ładowany jest raz (single
+    flight per ticker) poza blokadą – wolne ładowanie jednego tickera nie wstrzymuje
+    pozostałych; blokada chroni tylko podmianę migawki i cache wyników.
+    Cache wyników (klucz zawiera datę decyzji) ograniczony jest do max_signals
+    ostatnio używanych wpisów.
+    """
+
+    def __init__(self, loader=None, max_signals: int = None):
+        self.loader = loader or _default_loader
+        self.max_signals = SIGNAL_CACHE_SIZE if max_signals is None else max_signals
+        self._bars = {}                 # ticker -> (wersja, DataFrame)
+        self._signals = OrderedDict()   # (asset_a, asset_b, defensive, data, wersje, wtyczka) -> wynik
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def bars(self, ticker: str):
+        entry = self._bars.get(ticker)
+        if entry is None:
+            entry = self._load(ticker)
+        return entry[1]
+
+    def _load(self, ticker: str):
+        entry, _ = self._flight.do(ticker, self._load_once, ticker)
+        return entry
+
+    def _load_once(self, ticker: str):
+        entry = self._bars.get(ticker)
+        if entry is not None:
+            return entry
+
+        df = self.loader(ticker)
+        with self._lock:
+            # W międzyczasie ticker mógł zostać załadowany przez refresh
+            entry = self._bars.get(ticker)
+            if entry is None:
+                entry = (_bars_version(df), df)
+                self._bars = {**self._bars, ticker: entry}
+            return entry
+
+    def refresh(self, tickers=None) -> list:
+        """
+        Ponownie ładuje świece i podmienia tylko te, które się zmieniły.
+        Zwraca listę zaktualizowanych tickerów.
+        """
+        updated = []
+
+        for ticker in list(tickers or self._bars):
+            df = self.loader(ticker)
+            version = _bars_version(df)
+
+            with self._lock:
+                entry = self._bars.get(ticker)
+                if entry is None or entry[0] != version:
+                    self._bars = {**self._bars, ticker: (version, df)}
+                    updated.append(ticker)
+
+        if updated:
+            with self._lock:
+                # Wyniki zależne od zmienionych tickerów mają inną wersję w kluczu;
+                # usuwamy je, żeby cache nie rósł z każdą nową świecą
+                self._signals = OrderedDict(
+                    (key, value) for key, value in self._signals.items()
+                    if not set(key[:3]) & set(updated)
+                )
+
+        return updated
+
+    def signal(self, asset_a: str, asset_b: str, defensive_asset: str, decision_date: str = None,
+               signal: str = None) -> dict:
+        """
+        Wynik GEM.evaluate_all dla wszystkich horyzontów (z cache w pamięci).
+        Z parametrem signal: wynik GEM.evaluate_signal dla wskazanej wtyczki (strategy.signals).
+        Domyślna data decyzji: dzisiaj.
+        """
+        decision_date = decision_date or clock.today().strftime("%Y-%m-%d")
+
+        # Wtyczki korzystają też z cen aktywa defensywnego
+        tickers = (asset_a, asset_b) if signal is None else (asset_a, asset_b, defensive_asset)
+        snapshot = self._snapshot(tickers)
+        versions = tuple(snapshot[t][0] for t in tickers)
+        key = (asset_a, asset_b, defensive_asset, decision_date, versions, signal)
+
+        with self._lock:
+            result = self._signals.get(key)
+            if result is not None:
+                self._signals.move_to_end(key)
+                return result
+
+        gem = GEM(_SnapshotDataService(snapshot))
+        if signal is None:
+            result = gem.evaluate_all(asset_a, asset_b, defensive_asset, decision_date)
+        else:
+            result = gem.evaluate_signal(asset_a, asset_b, defensive_asset, signal, decision_date)
+
+        with self._lock:
+            self._signals[key] = result
+            while len(self._signals) > self.max_signals:
+                self._signals.popitem(last=False)
+
+        return result
+
+    def _snapshot(self, tickers) -> dict:
+        # Migawka zawierająca wszystkie potrzebne tickery (brakujące są doładowywane)
+        snapshot = self._bars
+        for ticker in tickers:
+            if ticker not in snapshot:
+                self._load(ticker)
+                snapshot = self._bars
+        return snapshot
+
+
+class _SignalRequestHandler(BaseHTTPRequestHandler):
+    state: SignalState = None
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/health":
+            self._send_json(200, {"status": "ok", "tickers": sorted(self.state._bars)})
+            return
+
+        if url.path != "/signal":
+            self._send_json(404, {"error": f"Nieznana ścieżka: {url.path}"})
+            return
+
+        missing = [name for name in ("asset_a", "asset_b", "defensive") if name not in params]
+        if missing:
+            self._send_json(400, {"error": f"Brak parametrów: {', '.join(missing)}"})
+            return
+
+        try:
+            result = self.state.signal(
+                params["asset_a"], params["asset_b"], params["defensive"], params.get("date"),
+                params.get("signal"),
+            )
+        except ValueError as e:
+            self._send_json(422, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        self._send_json(200, result)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/refresh":
+            self._send_json(404, {"error": f"Nieznana ścieżka: {url.path}"})
+            return
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        tickers = params["tickers"].split(",") if "tickers" in params else None
+
+        try:
+            updated = self.state.refresh(tickers)
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        self._send_json(200, {"updated": updated})
+
+    def log_message(self, format, *args):
+        # Bez logowania każdego żądania na stderr
+        pass
+
+
+class SignalServer:
+    """
+    Serwer HTTP z sygnałami GEM, opcjonalnie z cyklicznym odświeżaniem w tle.
+
+    Przykład:
+        with SignalServer(port=0) as server:   # port 0 = wolny port
+            print(server.url)
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 state: SignalState = None, refresh_interval: float = None):
+        self.state = state or SignalState()
+        handler = type("SignalRequestHandler", (_SignalRequestHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.refresh_interval = refresh_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                updated = self.state.refresh()
+                if updated:
+                    print(f"[SignalServer] Odświeżono: {', '.join(updated)}")
+            except Exception as e:
+                print(f"[SignalServer] Błąd odświeżania: {e}")
+
+    def start(self) -> "SignalServer":
+        self._threads.append(threading.Thread(target=self.httpd.serve_forever, daemon=True))
+        if self.refresh_interval:
+            self._threads.append(threading.Thread(target=self._refresh_loop, daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lokalny serwis sygnałów GEM (HTTP/JSON)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--refresh", type=float, default=3600.0,
+                        help="Interwał odświeżania danych w sekundach (0 = wyłączone)")
+    parser.add_argument("--preload", default="",
+                        help="Tickery do załadowania przy starcie, np. SPY,VEU,BND")
+    args = parser.parse_args(argv)
+
+    server = SignalServer(args.host, args.port, refresh_interval=args.refresh or None)
+    for ticker in filter(None, args.preload.split(",")):
+        server.state.bars(ticker)
+
+    server.start()
+    print(f"[SignalServer] Nasłuchuje na {server.url}")
+    try:
+        server._stop.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
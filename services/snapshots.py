@@ -0,0 +1,248 @@
+# snapshots.py
+# Wersjonowane snapshoty cache notowań do powtarzalnych uruchomień "na dzień"
+# (pliki roczne CSV, baza SQLite albo katalog memmap – wg config.STORAGE_BACKEND).
+# Odpowiada za:
+# - zapis plików cache jako obiektów adresowanych treścią (ten sam plik = jeden obiekt)
+# - manifesty snapshotów: data utworzenia (utils.clock), etykieta, mapowanie plik -> skrót
+# - odtwarzanie snapshotu do katalogu (hardlinki do obiektów, bez kopiowania danych)
+# - replay: zegar zatrzymany na chwili snapshotu + odczyt cache w trybie offline
+#   (bez cache w pamięci procesu: świece data_service i zadania API async)
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import stat
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import DATA_RAW_PATH, MEMMAP_PATH, SNAPSHOT_PATH, SQLITE_PATH, STORAGE_BACKEND
+from utils import clock
+
+DEFAULT_PATTERNS = ("*.csv",)
+
+# Pliki snapshotu per backend: wzorce w katalogu źródłowym (SQLite – jeden plik bazy)
+BACKEND_PATTERNS = {
+    "csv": DEFAULT_PATTERNS,
+    "memmap": ("*/date.i4", "*/*.f8", "*/meta.json"),
+}
+SQLITE_FILE = "prices.sqlite"
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class SnapshotStore:
+    """
+    Magazyn snapshotów: <path>/objects/<2 znaki>/<skrót> oraz <path>/manifests/<id>.json
+
+    Obiekty są wspólne dla wszystkich snapshotów – plik, który nie zmienił się
+    między snapshotami (np. roczniki historyczne), zajmuje miejsce tylko raz.
+
+    backend (domyślnie config.STORAGE_BACKEND) wyznacza źródło: katalog plików
+    rocznych CSV, katalog memmap albo plik bazy SQLite (kopiowany przez API backup,
+    więc snapshot jest spójny także w trakcie zapisu w trybie WAL).
+    """
+
+    def __init__(self, path=None, source=None, backend: str = None):
+        self.path = Path(path or SNAPSHOT_PATH)
+        self.backend = (backend or STORAGE_BACKEND).lower()
+        if self.backend not in (*BACKEND_PATTERNS, "sqlite"):
+            raise ValueError(f"Nieznany backend danych: {self.backend}")
+        default_source = {"csv": DATA_RAW_PATH, "sqlite": SQLITE_PATH, "memmap": MEMMAP_PATH}[self.backend]
+        self.source = Path(source or default_source)
+        self.objects = self.path / "objects"
+        self.manifests = self.path / "manifests"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def _store_object(self, file_path: Path) -> str:
+        digest = _file_hash(file_path)
+        target = self._object_path(digest)
+
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(file_path, tmp)
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)  # obiekty tylko do odczytu
+            os.replace(tmp, target)
+
+        return digest
+
+    def _sqlite_object(self) -> str:
+        # Spójna kopia bazy (z uwzględnieniem WAL) w pliku tymczasowym → obiekt
+        self.objects.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.objects, suffix=".sqlite.tmp")
+        os.close(fd)
+        try:
+            source, target = sqlite3.connect(self.source), sqlite3.connect(tmp)
+            try:
+                source.backup(target)
+            finally:
+                source.close()
+                target.close()
+            return self._store_object(Path(tmp))
+        finally:
+            os.unlink(tmp)
+
+    def create(self, label: str = None, patterns=None) -> str:
+        """
+        Zapisuje bieżący stan cache jako snapshot; zwraca jego identyfikator.
+
+        patterns: wzorce plików w katalogu źródłowym (domyślnie BACKEND_PATTERNS backendu).
+        """
+        files = {}
+        if self.backend == "sqlite":
+            if self.source.exists():
+                files[SQLITE_FILE] = self._sqlite_object()
+        else:
+            for pattern in patterns or BACKEND_PATTERNS[self.backend]:
+                for file_path in sorted(self.source.rglob(pattern)):
+                    if file_path.is_file():
+                        files[file_path.relative_to(self.source).as_posix()] = self._store_object(file_path)
+
+        created_at = clock.now()
+        content = json.dumps(files, sort_keys=True).encode()
+        snapshot_id = f"{created_at:%Y%m%dT%H%M%S}-{hashlib.blake2b(content, digest_size=4).hexdigest()}"
+
+        manifest = {
+            "id": snapshot_id,
+            "created_at": created_at.isoformat(),
+            "label": label,
+            "backend": self.backend,
+            "files": files,
+        }
+
+        self.manifests.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifests / f"{snapshot_id}.json.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.manifests / f"{snapshot_id}.json")
+        return snapshot_id
+
+    def manifest(self, snapshot_id: str) -> dict:
+        path = self.manifests / f"{snapshot_id}.json"
+        if not path.exists():
+            raise ValueError(f"Nieznany snapshot: {snapshot_id}")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def snapshots(self) -> list:
+        """
+        Manifesty wszystkich snapshotów, od najstarszego.
+        """
+        if not self.manifests.is_dir():
+            return []
+        manifests = [json.loads(p.read_text(encoding="utf-8")) for p in self.manifests.glob("*.json")]
+        return sorted(manifests, key=lambda m: (m["created_at"], m["id"]))
+
+    def latest(self, as_of=None) -> dict:
+        """
+        Najnowszy snapshot utworzony nie później niż as_of (domyślnie: najnowszy w ogóle).
+        """
+        manifests = self.snapshots()
+        if as_of is not None:
+            as_of = clock.FixedClock(as_of).now().isoformat()
+            manifests = [m for m in manifests if m["created_at"] <= as_of]
+        if not manifests:
+            raise ValueError(f"Brak snapshotu na dzień {as_of}")
+        return manifests[-1]
+
+    def restore(self, snapshot_id: str, target, link: bool = True) -> Path:
+        """
+        Odtwarza pliki snapshotu w katalogu target.
+
+        link=True: hardlinki do obiektów (bez kopiowania; pliki tylko do odczytu),
+        link=False lub inny system plików: kopie, które można modyfikować.
+        """
+        target = Path(target)
+        for relative, digest in self.manifest(snapshot_id)["files"].items():
+            destination = target / relative
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            if destination.exists():
+                destination.unlink()
+
+            source = self._object_path(digest)
+            if link:
+                try:
+                    os.link(source, destination)
+                    continue
+                except OSError:
+                    pass
+            shutil.copyfile(source, destination)
+        return target
+
+    def delete(self, snapshot_id: str) -> None:
+        (self.manifests / f"{snapshot_id}.json").unlink(missing_ok=True)
+
+    def gc(self) -> int:
+        """
+        Usuwa obiekty, do których nie odwołuje się żaden manifest; zwraca ich liczbę.
+        """
+        referenced = {digest for m in self.snapshots() for digest in m["files"].values()}
+        removed = 0
+        if self.objects.is_dir():
+            for path in self.objects.glob("*/*"):
+                if path.name not in referenced:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+    def disk_usage(self) -> dict:
+        """
+        Rozmiar obiektów na dysku vs łączny rozmiar plików we wszystkich snapshotach.
+        """
+        sizes = {p.name: p.stat().st_size for p in self.objects.glob("*/*")} if self.objects.is_dir() else {}
+        logical = sum(sizes.get(d, 0) for m in self.snapshots() for d in m["files"].values())
+        return {"stored_bytes": sum(sizes.values()), "logical_bytes": logical, "objects": len(sizes)}
+
+
+@contextmanager
+def replay(snapshot_id: str = None, as_of=None, store: SnapshotStore = None, offline: bool = True):
+    """
+    Uruchomienie "na dzień" z danych snapshotu, bez pobierania z sieci.
+
+    Wybierany jest snapshot snapshot_id albo najnowszy nie późniejszy niż as_of.
+    Na czas bloku zegar (utils.clock) wskazuje as_of (domyślnie chwilę snapshotu),
+    a services.yahoo_client czyta cache z odtworzonego katalogu (CSV) albo
+    z odtworzonego backendu (SQLite / memmap) – niezależnie od config.STORAGE_BACKEND.
+    Cache w pamięci procesu (świece, zadania API async) są czyszczone na wejściu
+    i na wyjściu, więc wynik nie miesza danych bieżących z danymi snapshotu.
+
+    Yields:
+        manifest snapshotu
+    """
+    from services.data_service import clear_caches
+    from services.storage import get_storage
+    from services.yahoo_client import data_source
+
+    store = store or SnapshotStore()
+    manifest = store.manifest(snapshot_id) if snapshot_id else store.latest(as_of)
+    moment = as_of or manifest["created_at"]
+    backend = manifest.get("backend", "csv")
+
+    with tempfile.TemporaryDirectory(prefix="gem-replay-") as directory:
+        # Hardlinki tylko w trybie offline – zapis do pliku zmieniłby współdzielony obiekt;
+        # SQLite zawsze na kopii (otwarcie bazy w trybie WAL zapisuje do pliku)
+        restored = store.restore(manifest["id"], directory, link=offline and backend != "sqlite")
+
+        storage = None
+        if backend != "csv":
+            storage = get_storage(backend, restored / SQLITE_FILE if backend == "sqlite" else restored)
+
+        clear_caches()
+        try:
+            with clock.use_clock(clock.FixedClock(moment)), \
+                    data_source(restored if storage is None else None, offline=offline, storage=storage):
+                yield manifest
+        finally:
+            clear_caches()
+            if hasattr(storage, "close"):
+                storage.close()
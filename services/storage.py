@@ -0,0 +1,567 @@
+# storage.py
+# Wymienne backendy przechowywania dziennych notowań (cache danych surowych).
+# Odpowiada za:
+# - wspólny interfejs: odczyt zakresu dat, odczyt wielu tickerów, zapis (upsert)
+# - backend CSV (pliki roczne {ticker}_{rok}.csv – format fetch_yahoo_data)
+# - backend SQLite (jedna tabela indeksowana po (ticker, date), tryb WAL)
+# - backend memmap (binarne kolumny o stałej szerokości per ticker, odczyt bez kopiowania)
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_RAW_PATH, MEMMAP_PATH, SQLITE_PATH, STORAGE_BACKEND
+
+# Kolumny cenowe w kolejności CSV_COLUMNS (bez Date)
+PRICE_COLUMNS = ["Price", "Open", "Close", "Adj Close", "Low", "High", "Volume"]
+
+# Nazwy kolumn w SQLite (bez spacji)
+_SQL_COLUMNS = {
+    "Price": "price",
+    "Open": "open",
+    "Close": "close",
+    "Adj Close": "adj_close",
+    "Low": "low",
+    "High": "high",
+    "Volume": "volume",
+}
+
+
+# Zapis prób pobrania historii bez notowań (backendy plikowe)
+_EMPTY_DOWNLOADS_FILE = "empty_downloads.json"
+
+
+def _format_empty_download(start, attempted_at) -> dict:
+    return {
+        "start": pd.to_datetime(start).strftime("%Y-%m-%d"),
+        "attempted_at": pd.Timestamp(attempted_at).isoformat(),
+    }
+
+
+def _parse_empty_download(entry):
+    if not entry:
+        return None
+    return pd.Timestamp(entry["start"]), pd.Timestamp(entry["attempted_at"])
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+
+class PriceStorage(ABC):
+    """
+    Interfejs backendu notowań dziennych.
+
+    Ramki mają DatetimeIndex 'Date' i kolumny PRICE_COLUMNS (jak fetch_yahoo_data).
+    """
+
+    def read(self, ticker: str, start=None, end=None, columns=None, dtype=None) -> pd.DataFrame:
+        result = self.read_many([ticker], start, end, columns, dtype).get(ticker)
+        if result is not None:
+            return result
+        empty = _empty_frame()[columns or PRICE_COLUMNS]
+        return empty.astype(dtype) if dtype is not None else empty
+
+    @abstractmethod
+    def read_many(self, tickers, start=None, end=None, columns=None, dtype=None) -> dict:
+        """
+        Notowania wielu tickerów; columns ogranicza odczyt do wybranych kolumn cenowych,
+        dtype (np. "float32") to precyzja nadawana już przy odczycie (None → float64).
+        """
+
+    @abstractmethod
+    def upsert(self, ticker: str, df: pd.DataFrame) -> None:
+        ...
+
+    @abstractmethod
+    def date_range(self, ticker: str) -> tuple:
+        """
+        (pierwsza data, ostatnia data) dla tickera lub (None, None), gdy brak danych.
+        """
+
+    @abstractmethod
+    def covered_from(self, ticker: str):
+        """
+        Najwcześniejsza data, od której historia tickera została już pobrana
+        (także gdy notowania zaczynają się później, np. po debiucie).
+        """
+
+    @abstractmethod
+    def set_covered_from(self, ticker: str, date) -> None:
+        ...
+
+    @abstractmethod
+    def empty_download(self, ticker: str):
+        """
+        (początek zakresu, czas próby) ostatniego pobrania historii, które nie zwróciło
+        notowań (np. zakres sprzed debiutu), albo None.
+        """
+
+    @abstractmethod
+    def set_empty_download(self, ticker: str, start, attempted_at) -> None:
+        ...
+
+    @abstractmethod
+    def tickers(self) -> list:
+        ...
+
+
+class CsvYearStorage(PriceStorage):
+    """
+    Backend plików rocznych {ticker}_{rok}.csv w DATA_RAW_PATH.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DATA_RAW_PATH
+        self._index = (None, {})  # (mtime katalogu, {ticker: [(rok, ścieżka)]})
+
+    def _scan(self) -> dict:
+        """
+        Indeks {ticker: [(rok, ścieżka)]} z jednego przejścia po katalogu;
+        budowany ponownie dopiero po zmianie katalogu (nowy lub usunięty plik).
+        """
+        if not os.path.isdir(self.path):
+            return {}
+        mtime = os.stat(self.path).st_mtime_ns
+
+        cached_mtime, index = self._index
+        if cached_mtime == mtime:
+            return index
+
+        index = {}
+        for name in os.listdir(self.path):
+            ticker, _, year = name[:-4].rpartition("_")
+            if name.endswith(".csv") and ticker and year.isdigit():
+                index.setdefault(ticker, []).append((int(year), os.path.join(self.path, name)))
+        for files in index.values():
+            files.sort()
+
+        self._index = (mtime, index)
+        return index
+
+    def _files(self, ticker: str) -> list:
+        return [file_path for _, file_path in self._scan().get(ticker, [])]
+
+    def read_many(self, tickers, start=None, end=None, columns=None, dtype=None) -> dict:
+        start = pd.to_datetime(start) if start is not None else None
+        end = pd.to_datetime(end) if end is not None else None
+        usecols = ["Date", *columns] if columns else None
+        # Kolumny parsowane od razu w zadanej precyzji (bez pośredniego float64)
+        dtypes = {column: dtype for column in columns or PRICE_COLUMNS} if dtype is not None else None
+        result = {}
+
+        for ticker in tickers:
+            frames = []
+            for year, file_path in self._scan().get(ticker, []):
+                if (start is not None and year < start.year) or (end is not None and year > end.year):
+                    continue
+                frames.append(pd.read_csv(
+                    file_path, usecols=usecols, parse_dates=["Date"], index_col="Date", dtype=dtypes
+                ))
+
+            if not frames:
+                continue
+
+            df = pd.concat(frames).sort_index()
+            result[ticker] = df.loc[start:end, columns or df.columns]
+
+        return result
+
+    def upsert(self, ticker: str, df: pd.DataFrame) -> None:
+        os.makedirs(self.path, exist_ok=True)
+
+        for year, df_year in df.groupby(df.index.year):
+            file_path = os.path.join(self.path, f"{ticker}_{year}.csv")
+            if os.path.exists(file_path):
+                existing = pd.read_csv(file_path, parse_dates=["Date"], index_col="Date")
+                df_year = pd.concat([existing, df_year])
+                df_year = df_year[~df_year.index.duplicated(keep="last")].sort_index()
+            else:
+                # Nowy plik – indeks budowany ponownie także przy zgrubnym mtime katalogu
+                self._index = (None, {})
+            df_year.to_csv(file_path, columns=PRICE_COLUMNS, index=True, index_label="Date")
+
+    def date_range(self, ticker: str) -> tuple:
+        files = self._files(ticker)
+        if not files:
+            return None, None
+        first = pd.read_csv(files[0], parse_dates=["Date"], usecols=["Date"])["Date"]
+        last = pd.read_csv(files[-1], parse_dates=["Date"], usecols=["Date"])["Date"]
+        return first.min(), last.max()
+
+    def covered_from(self, ticker: str):
+        # Pliki obejmują pełne lata: pokrycie zaczyna się 1 stycznia najstarszego roku
+        files = self._scan().get(ticker)
+        if not files:
+            return None
+        return pd.Timestamp(year=files[0][0], month=1, day=1)
+
+    def set_covered_from(self, ticker: str, date) -> None:
+        # Wynika z nazw plików rocznych – nic do zapisania
+        pass
+
+    def _empty_downloads(self) -> dict:
+        file_path = os.path.join(self.path, _EMPTY_DOWNLOADS_FILE)
+        if not os.path.exists(file_path):
+            return {}
+        with open(file_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def empty_download(self, ticker: str):
+        entry = self._empty_downloads().get(ticker)
+        return _parse_empty_download(entry)
+
+    def set_empty_download(self, ticker: str, start, attempted_at) -> None:
+        entries = {**self._empty_downloads(), ticker: _format_empty_download(start, attempted_at)}
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, _EMPTY_DOWNLOADS_FILE), "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+
+    def tickers(self) -> list:
+        return sorted(self._scan())
+
+
+class SQLitePriceStorage(PriceStorage):
+    """
+    Backend SQLite: tabela bars z kluczem głównym (ticker, date).
+
+    - Klucz główny WITHOUT ROWID = indeks klastrowany po (ticker, date),
+      więc zapytania zakresowe czytają ciągły fragment B-drzewa.
+    - Zapis wielu wierszy w jednej transakcji (INSERT ... ON CONFLICT DO UPDATE).
+    - Tryb WAL: czytelnicy z innych procesów nie blokują się z zapisem.
+    - Połączenie per wątek (sqlite3 nie współdzieli połączeń między wątkami).
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or SQLITE_PATH)
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bars ("
+                " ticker TEXT NOT NULL,"
+                " date TEXT NOT NULL,"
+                + "".join(f" {name} REAL," for name in _SQL_COLUMNS.values())
+                + " PRIMARY KEY (ticker, date)"
+                ") WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS coverage (ticker TEXT PRIMARY KEY, start TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS empty_downloads"
+                " (ticker TEXT PRIMARY KEY, start TEXT NOT NULL, attempted_at TEXT NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def read_many(self, tickers, start=None, end=None, columns=None, dtype=None) -> dict:
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+
+        query = (
+            "SELECT ticker, date, " + ", ".join(_SQL_COLUMNS[c] for c in (columns or PRICE_COLUMNS))
+            + f" FROM bars WHERE ticker IN ({', '.join('?' * len(tickers))})"
+        )
+        params = list(tickers)
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(pd.to_datetime(start).strftime("%Y-%m-%d"))
+        if end is not None:
+            query += " AND date <= ?"
+            params.append(pd.to_datetime(end).strftime("%Y-%m-%d"))
+        query += " ORDER BY ticker, date"
+
+        dtypes = {_SQL_COLUMNS[c]: dtype for c in columns or PRICE_COLUMNS} if dtype is not None else None
+        rows = pd.read_sql_query(query, self._connection(), params=params, dtype=dtypes)
+        if rows.empty:
+            return {}
+
+        rows["date"] = pd.to_datetime(rows["date"])
+        rows = rows.rename(columns={v: k for k, v in _SQL_COLUMNS.items()})
+
+        return {
+            ticker: group.drop(columns="ticker").set_index("date").rename_axis("Date")
+            for ticker, group in rows.groupby("ticker", sort=False)
+        }
+
+    def upsert(self, ticker: str, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+
+        values = df.reindex(columns=PRICE_COLUMNS).astype(float)
+        dates = df.index.strftime("%Y-%m-%d")
+        records = [
+            (ticker, date, *(None if pd.isna(v) else v for v in row))
+            for date, row in zip(dates, values.itertuples(index=False, name=None))
+        ]
+
+        columns = ", ".join(_SQL_COLUMNS.values())
+        updates = ", ".join(f"{name} = excluded.{name}" for name in _SQL_COLUMNS.values())
+        conn = self._connection()
+        with conn:  # jedna transakcja
+            conn.executemany(
+                f"INSERT INTO bars (ticker, date, {columns}) VALUES (?, ?, {', '.join('?' * len(_SQL_COLUMNS))})"
+                f" ON CONFLICT(ticker, date) DO UPDATE SET {updates}",
+                records,
+            )
+
+    def date_range(self, ticker: str) -> tuple:
+        first, last = self._connection().execute(
+            "SELECT MIN(date), MAX(date) FROM bars WHERE ticker = ?", (ticker,)
+        ).fetchone()
+        if first is None:
+            return None, None
+        return pd.Timestamp(first), pd.Timestamp(last)
+
+    def covered_from(self, ticker: str):
+        row = self._connection().execute(
+            "SELECT start FROM coverage WHERE ticker = ?", (ticker,)
+        ).fetchone()
+        return pd.Timestamp(row[0]) if row else None
+
+    def set_covered_from(self, ticker: str, date) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO coverage (ticker, start) VALUES (?, ?)"
+                " ON CONFLICT(ticker) DO UPDATE SET start = MIN(start, excluded.start)",
+                (ticker, pd.to_datetime(date).strftime("%Y-%m-%d")),
+            )
+
+    def empty_download(self, ticker: str):
+        row = self._connection().execute(
+            "SELECT start, attempted_at FROM empty_downloads WHERE ticker = ?", (ticker,)
+        ).fetchone()
+        return _parse_empty_download(dict(zip(("start", "attempted_at"), row)) if row else None)
+
+    def set_empty_download(self, ticker: str, start, attempted_at) -> None:
+        entry = _format_empty_download(start, attempted_at)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO empty_downloads (ticker, start, attempted_at) VALUES (?, ?, ?)",
+                (ticker, entry["start"], entry["attempted_at"]),
+            )
+
+    def tickers(self) -> list:
+        rows = self._connection().execute("SELECT DISTINCT ticker FROM bars ORDER BY ticker").fetchall()
+        return [row[0] for row in rows]
+
+
+# Pliki backendu memmap: daty jako int32 (dni od 1970-01-01), ceny jako float64 (little-endian)
+_DATE_FILE = "date.i4"
+_DATE_DTYPE = np.dtype("<i4")
+_PRICE_DTYPE = np.dtype("<f8")
+
+
+def _to_days(index) -> np.ndarray:
+    days = pd.DatetimeIndex(index).normalize().values.astype("datetime64[D]").astype(np.int64)
+    if len(days) and (days.min() < np.iinfo(np.int32).min or days.max() > np.iinfo(np.int32).max):
+        raise ValueError("Data poza zakresem int32 (dni od 1970-01-01)")
+    return days.astype(_DATE_DTYPE)
+
+
+def _from_days(days: np.ndarray) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype("datetime64[ns]"), name="Date")
+
+
+class MemmapPriceStorage(PriceStorage):
+    """
+    Backend binarny: katalog per ticker z kolumnami o stałej szerokości.
+
+    - date.i4 – daty int32 (dni od 1970-01-01), rosnąco i bez duplikatów;
+      {kolumna}.f8 – ceny float64 wyrównane z datami (nazwy jak w SQLite).
+    - Pliki otwierane są przez numpy.memmap w trybie tylko do odczytu: zakres dat
+      to wyszukiwanie binarne + widok na zmapowany plik (view), bez kopiowania;
+      strony plików współdzielą procesy przez cache systemu operacyjnego.
+    - Nowe notowania (daty po ostatniej w pliku) są dopisywane na końcu kolumn,
+      plik dat jako ostatni – czytelnik w trakcie dopisywania widzi krótszy, spójny stan.
+    - Korekty wcześniejszych dni przepisują kolumny tickera (pliki tymczasowe + os.replace).
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or MEMMAP_PATH)
+        self._lock = threading.RLock()
+        self._maps = {}
+
+    def _dir(self, ticker: str) -> str:
+        return os.path.join(self.path, ticker)
+
+    def _column_file(self, ticker: str, column: str) -> str:
+        return os.path.join(self._dir(ticker), f"{_SQL_COLUMNS[column]}.f8")
+
+    def _mapped(self, ticker: str) -> tuple:
+        """
+        (daty, {kolumna: ceny}) jako memmapy całej serii; mapowanie odświeżane po zmianie pliku dat.
+        """
+        date_file = os.path.join(self._dir(ticker), _DATE_FILE)
+        with self._lock:
+            try:
+                stat = os.stat(date_file)
+            except FileNotFoundError:
+                return np.empty(0, _DATE_DTYPE), {c: np.empty(0, _PRICE_DTYPE) for c in PRICE_COLUMNS}
+
+            key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            cached = self._maps.get(ticker)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+            n = stat.st_size // _DATE_DTYPE.itemsize
+            if n == 0:
+                mapped = np.empty(0, _DATE_DTYPE), {c: np.empty(0, _PRICE_DTYPE) for c in PRICE_COLUMNS}
+            else:
+                # Kolumny mogą być dłuższe od dat (przerwane dopisywanie) – liczy się długość dat
+                mapped = (
+                    np.memmap(date_file, dtype=_DATE_DTYPE, mode="r", shape=(n,)),
+                    {c: np.memmap(self._column_file(ticker, c), dtype=_PRICE_DTYPE, mode="r", shape=(n,))
+                     for c in PRICE_COLUMNS},
+                )
+            self._maps[ticker] = (key, mapped)
+            return mapped
+
+    def view(self, ticker: str, start=None, end=None, columns=None) -> tuple:
+        """
+        Zakres dat bez kopiowania danych.
+
+        Returns:
+            (daty int32 – dni od 1970-01-01, dict {kolumna: float64}) – widoki tylko
+            do odczytu na zmapowane pliki; daty na DatetimeIndex: _from_days
+        """
+        dates, values = self._mapped(ticker)
+        lo = 0 if start is None else int(np.searchsorted(dates, _to_days([pd.to_datetime(start)])[0], "left"))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, _to_days([pd.to_datetime(end)])[0], "right"))
+        return dates[lo:hi], {c: values[c][lo:hi] for c in columns or PRICE_COLUMNS}
+
+    def read_many(self, tickers, start=None, end=None, columns=None, dtype=None) -> dict:
+        # DataFrame jest kopią – nie zależy od późniejszych zmian plików
+        result = {}
+        for ticker in tickers:
+            dates, values = self.view(ticker, start, end, columns)
+            if len(dates):
+                if dtype is not None:
+                    values = {c: v.astype(dtype) for c, v in values.items()}
+                result[ticker] = pd.DataFrame(values, index=_from_days(dates))
+        return result
+
+    def upsert(self, ticker: str, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+
+        df = df.reindex(columns=PRICE_COLUMNS).astype(float)
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        os.makedirs(self._dir(ticker), exist_ok=True)
+
+        with self._lock:
+            dates, values = self._mapped(ticker)
+            days = _to_days(df.index)
+
+            if len(dates) == 0 or days[0] > dates[-1]:
+                self._append(ticker, len(dates), days, df)
+            else:
+                existing = pd.DataFrame(values, index=_from_days(dates))
+                # Zwolnienie własnych mapowań przed podmianą plików (Windows blokuje zmapowane pliki)
+                del dates, values
+                self._maps.pop(ticker, None)
+                merged = pd.concat([existing, df])
+                merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                self._rewrite(ticker, _to_days(merged.index), merged)
+
+    def _append(self, ticker: str, length: int, days: np.ndarray, df: pd.DataFrame) -> None:
+        for column in PRICE_COLUMNS:
+            file_path = self._column_file(ticker, column)
+            with open(file_path, "ab") as f:
+                f.truncate(length * _PRICE_DTYPE.itemsize)
+                f.write(df[column].to_numpy(_PRICE_DTYPE).tobytes())
+        with open(os.path.join(self._dir(ticker), _DATE_FILE), "ab") as f:
+            f.write(days.tobytes())
+
+    def _rewrite(self, ticker: str, days: np.ndarray, df: pd.DataFrame) -> None:
+        files = [(self._column_file(ticker, c), df[c].to_numpy(_PRICE_DTYPE)) for c in PRICE_COLUMNS]
+        files.append((os.path.join(self._dir(ticker), _DATE_FILE), days))
+        for file_path, array in files:
+            with open(file_path + ".tmp", "wb") as f:
+                f.write(array.tobytes())
+            os.replace(file_path + ".tmp", file_path)
+
+    def date_range(self, ticker: str) -> tuple:
+        dates, _ = self._mapped(ticker)
+        if not len(dates):
+            return None, None
+        first, last = _from_days(dates[[0, -1]])
+        return first, last
+
+    def covered_from(self, ticker: str):
+        meta_file = os.path.join(self._dir(ticker), "meta.json")
+        if not os.path.exists(meta_file):
+            return None
+        with open(meta_file, encoding="utf-8") as f:
+            return pd.Timestamp(json.load(f)["covered_from"])
+
+    def set_covered_from(self, ticker: str, date) -> None:
+        date = pd.to_datetime(date)
+        current = self.covered_from(ticker)
+        if current is not None and current <= date:
+            return
+        os.makedirs(self._dir(ticker), exist_ok=True)
+        with open(os.path.join(self._dir(ticker), "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"covered_from": date.strftime("%Y-%m-%d")}, f)
+
+    def empty_download(self, ticker: str):
+        file_path = os.path.join(self._dir(ticker), _EMPTY_DOWNLOADS_FILE)
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, encoding="utf-8") as f:
+            return _parse_empty_download(json.load(f))
+
+    def set_empty_download(self, ticker: str, start, attempted_at) -> None:
+        os.makedirs(self._dir(ticker), exist_ok=True)
+        with open(os.path.join(self._dir(ticker), _EMPTY_DOWNLOADS_FILE), "w", encoding="utf-8") as f:
+            json.dump(_format_empty_download(start, attempted_at), f)
+
+    def tickers(self) -> list:
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(
+            name for name in os.listdir(self.path)
+            if os.path.exists(os.path.join(self.path, name, _DATE_FILE))
+        )
+
+
+_BACKENDS = {
+    "csv": CsvYearStorage,
+    "sqlite": SQLitePriceStorage,
+    "memmap": MemmapPriceStorage,
+}
+
+
+def get_storage(name: str = None, path=None) -> PriceStorage:
+    """
+    Tworzy backend o podanej nazwie (domyślnie config.STORAGE_BACKEND).
+    """
+    name = (name or STORAGE_BACKEND).lower()
+    try:
+        backend = _BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Nieznany backend danych: {name} (dostępne: {sorted(_BACKENDS)})") from None
+    return backend(path)
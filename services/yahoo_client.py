@@ -1,19 +1,80 @@
 # yahoo_client.py
 
 import os
+from contextlib import contextmanager
 import pandas as pd
 import yfinance as yf
 from datetime import datetime
-from config import DATA_RAW_PATH
+from config import DATA_RAW_PATH, EMPTY_DOWNLOAD_RETRY, STORAGE_BACKEND
+from services.data_quality import ingest
+from services.prefetch import is_ready
+from services.resampling import resample
+from services.storage import CsvYearStorage, get_storage
+from utils import clock
+from utils.profiling import profiled
 
 # Jawna definicja struktury CSV
 CSV_COLUMNS = ["Date", "Price", "Open", "Close", "Adj Close", "Low", "High", "Volume"]
 
+# Źródło danych na czas odtwarzania snapshotu (services.snapshots.replay):
+# katalog cache zamiast DATA_RAW_PATH albo odtworzony backend (SQLite / memmap)
+# zamiast config.STORAGE_BACKEND oraz tryb offline (bez pobierania z Yahoo)
+_source = {"raw_path": None, "storage": None, "offline": False}
 
+
+def raw_data_path():
+    """
+    Katalog plików rocznych CSV (DATA_RAW_PATH albo katalog odtwarzanego snapshotu).
+    """
+    return _source["raw_path"] or DATA_RAW_PATH
+
+
+def is_offline() -> bool:
+    return _source["offline"]
+
+
+def is_default_source() -> bool:
+    """
+    True poza data_source (bieżący cache, tryb online).
+    """
+    return not any(_source.values())
+
+
+def price_storage():
+    """
+    Backend notowań bieżącego źródła danych: odtworzony backend (replay),
+    pliki roczne CSV z raw_data_path() albo config.STORAGE_BACKEND.
+    """
+    if _source["storage"] is not None:
+        return _source["storage"]
+    if STORAGE_BACKEND == "csv":
+        return CsvYearStorage(raw_data_path())
+    return get_storage()
+
+
+@contextmanager
+def data_source(raw_path=None, offline: bool = False, storage=None):
+    """
+    Tymczasowo czyta cache z raw_path (pliki roczne CSV) albo z backendu storage;
+    w trybie offline nic nie jest pobierane ani zapisywane – zwracane są wyłącznie
+    dane obecne w cache.
+    """
+    previous = dict(_source)
+    _source.update(raw_path=raw_path, storage=storage, offline=offline)
+    try:
+        yield
+    finally:
+        _source.update(previous)
+
+
+@profiled("fetch_yahoo_data")
 def fetch_yahoo_data(
         ticker: str,
         start_date: str,
-        resample_interval: str = None  # np. "M", "W", None
+        resample_interval: str = None,  # np. "M", "W", "1mo", None
+        storage=None,  # backend z services.storage; None → config.STORAGE_BACKEND
+        columns: list = None,  # np. ["Adj Close"]; None → wszystkie kolumny CSV
+        dtype=None  # np. "float32"; None → float64
 ) -> pd.DataFrame:
     """
     Pobiera i cache'uje dane dzienne (1d) z Yahoo Finance w podziale rocznym.
@@ -21,37 +82,59 @@ def fetch_yahoo_data(
     - Pliki CSV przechowują zawsze interwał 1d oraz kolumny zgodne z CSV_COLUMNS.
     - Aktualizowany jest wyłącznie bieżący rok; lata historyczne nie są ponownie pobierane.
     - Zwraca dane od start_date do „teraz” (filtr po dacie wykonywany po scaleniu roczników).
-    - Opcjonalny resampling wykonywany jest lokalnie na już pobranych danych.
+    - Dane przed zapisem przechodzą kontrolę jakości (services.data_quality): pliki w cache
+      są posortowane, bez duplikatów dat, cen <= 0 i jednodniowych skoków Adj Close.
+    - columns / dtype: tryb ładowania z projekcją kolumn – z plików parsowane są tylko
+      wskazane kolumny (od razu w zadanej precyzji), pozostałe nie są czytane ani resamplowane.
+    - Opcjonalny resampling wykonywany jest lokalnie na już pobranych danych (services.resampling).
     - Zwracany DataFrame ma indeks typu DatetimeIndex (Date jako index) i kolumny: Price, Open, Close, Adj Close, Low, High, Volume.
+    - Przy backendzie innym niż pliki roczne CSV (np. SQLite) dane czytane są zapytaniem
+      zakresowym, a brakujące dni pobierane i zapisywane jednym upsertem.
+    - "Teraz" pochodzi z utils.clock (podmienialny zegar); w trybie offline (data_source)
+      dane są tylko czytane z cache.
+    - Ticker z ważnym znacznikiem gotowości (services.prefetch) nie jest aktualizowany –
+      po rozgrzaniu cache na koniec miesiąca dane czytane są wyłącznie lokalnie.
     """
 
     start_dt = pd.to_datetime(start_date)
-    current_year = datetime.now().year
+    columns = _validate_columns(columns)
+
+    storage = storage if storage is not None else _source["storage"]
+    if storage is not None or STORAGE_BACKEND != "csv":
+        df_final = _fetch_with_storage(ticker, start_dt, storage or get_storage(), columns, dtype)
+        if resample_interval:
+            df_final = resample(df_final, resample_interval)
+        return df_final
+
+    now = clock.now()
+    current_year = now.year
     start_year = start_dt.year
+    raw_path = raw_data_path()
+    offline = is_offline()
 
-    os.makedirs(DATA_RAW_PATH, exist_ok=True)
+    os.makedirs(raw_path, exist_ok=True)
 
     all_data = []
 
     for year in range(start_year, current_year + 1):
 
-        file_path = os.path.join(DATA_RAW_PATH, f"{ticker}_{year}.csv")
+        file_path = os.path.join(raw_path, f"{ticker}_{year}.csv")
 
         year_start = datetime(year, 1, 1)
-        year_end = datetime.now() if year == current_year else datetime(year, 12, 31)
+        year_end = now if year == current_year else datetime(year, 12, 31)
 
         # --------------------------------------------------
         # PLIK ISTNIEJE
         # --------------------------------------------------
         if os.path.exists(file_path):
 
-            df_existing = pd.read_csv(file_path, parse_dates=["Date"], index_col="Date")
+            df_existing = _read_year(file_path, columns, dtype)
 
             # Aktualizacja bieżącego roku
-            if year == current_year:
+            if year == current_year and not offline:
                 last_date = df_existing.index.max()
 
-                if last_date < pd.to_datetime(datetime.now().date()):
+                if last_date < pd.to_datetime(now.date()) and not is_ready(ticker, now):
                     print(f"Updating {ticker} {year}")
 
                     df_new = yf.download(
@@ -65,10 +148,11 @@ def fetch_yahoo_data(
                         # Mapowanie danych z Yahoo na strukturę CSV
                         df_new = _map_yahoo_to_csv_structure(df_new)
 
-                        df_existing = pd.concat([df_existing, df_new])
-                        df_existing = df_existing[~df_existing.index.duplicated(keep="last")]
-                        df_existing.sort_index(inplace=True)
-                        df_existing.to_csv(file_path, columns=CSV_COLUMNS[1:], index=True)
+                        # Zapis zawsze pełnej struktury – plik czytany ponownie bez projekcji
+                        df_full = _read_year(file_path) if columns or dtype else df_existing
+                        df_full = ingest(ticker, pd.concat([df_full, df_new]))
+                        df_full.to_csv(file_path, columns=CSV_COLUMNS[1:], index=True)
+                        df_existing = _project(df_full, columns, dtype)
 
             # Dodaj do all_data tylko jeśli niepuste
             if df_existing is not None and not df_existing.empty:
@@ -77,7 +161,7 @@ def fetch_yahoo_data(
         # --------------------------------------------------
         # PLIK NIE ISTNIEJE
         # --------------------------------------------------
-        else:
+        elif not offline:
             print(f"Downloading {ticker} {year}")
 
             df_year = yf.download(
@@ -90,8 +174,9 @@ def fetch_yahoo_data(
 
             if not df_year.empty:
                 # Mapowanie danych z Yahoo na strukturę CSV
-                df_year = _map_yahoo_to_csv_structure(df_year)
+                df_year = ingest(ticker, _map_yahoo_to_csv_structure(df_year))
                 df_year.to_csv(file_path, columns=CSV_COLUMNS[1:], index=True)
+                df_year = _project(df_year, columns, dtype)
                 # Dodaj do all_data tylko jeśli niepuste
                 all_data.append(df_year)
 
@@ -107,8 +192,11 @@ def fetch_yahoo_data(
         return pd.DataFrame()
 
     df_final = pd.concat(non_empty)
-    df_final = df_final[~df_final.index.duplicated(keep="last")]
-    df_final.sort_index(inplace=True)
+
+    # Roczniki są oczyszczone przy zapisie – sortowanie/deduplikacja tylko dla starszych plików
+    if not (df_final.index.is_monotonic_increasing and df_final.index.is_unique):
+        df_final = df_final[~df_final.index.duplicated(keep="last")]
+        df_final.sort_index(inplace=True)
 
     df_final = df_final[df_final.index >= start_dt]
 
@@ -116,24 +204,102 @@ def fetch_yahoo_data(
     # RESAMPLING (opcjonalny)
     # --------------------------------------------------
     if resample_interval:
-        df_final = (
-            df_final
-            .resample(resample_interval)
-            .agg({
-                "Open": "first",
-                "High": "max",
-                "Low": "min",
-                "Close": "last",
-                "Adj Close": "last",
-                "Volume": "sum",
-                "Price": "last"
-            })
-            .dropna()
-        )
+        df_final = resample(df_final, resample_interval)
 
     return df_final
 
 
+def _validate_columns(columns) -> list:
+    if columns is None:
+        return None
+    columns = list(columns)
+    unknown = [c for c in columns if c not in CSV_COLUMNS[1:]]
+    if unknown:
+        raise ValueError(f"Nieznane kolumny: {unknown} (dozwolone: {CSV_COLUMNS[1:]})")
+    return columns
+
+
+def _read_year(file_path: str, columns: list = None, dtype=None) -> pd.DataFrame:
+    """
+    Czyta plik roczny; przy projekcji parsowane są tylko Date i wskazane kolumny.
+    """
+    columns = columns or CSV_COLUMNS[1:]
+    return pd.read_csv(
+        file_path,
+        usecols=["Date", *columns],
+        parse_dates=["Date"],
+        index_col="Date",
+        dtype={column: dtype for column in columns} if dtype is not None else None,
+    )[columns]
+
+
+def _project(df: pd.DataFrame, columns: list = None, dtype=None) -> pd.DataFrame:
+    if columns:
+        df = df[columns]
+    if dtype is not None:
+        df = df.astype(dtype)
+    return df
+
+
+def _recently_empty(storage, ticker: str, start_dt: pd.Timestamp) -> bool:
+    """
+    Czy zakres od start_dt był niedawno (w EMPTY_DOWNLOAD_RETRY) pobierany bez notowań.
+    """
+    attempt = storage.empty_download(ticker)
+    if attempt is None:
+        return False
+    start, attempted_at = attempt
+    return start <= start_dt and pd.Timestamp(clock.now()) - attempted_at < pd.Timedelta(seconds=EMPTY_DOWNLOAD_RETRY)
+
+
+def _fetch_with_storage(ticker: str, start_dt: pd.Timestamp, storage, columns: list = None, dtype=None) -> pd.DataFrame:
+    """
+    Uzupełnia backend o brakującą historię i bieżące notowania, po czym zwraca dane od start_dt.
+    """
+    today = pd.to_datetime(clock.today())
+
+    if is_offline():
+        return storage.read(ticker, start_dt, columns=columns, dtype=dtype)
+
+    # Brak historii sprzed dotychczasowego pokrycia → pobranie brakującego początku
+    covered_from = storage.covered_from(ticker)
+    if (covered_from is None or covered_from > start_dt) and not _recently_empty(storage, ticker, start_dt):
+        print(f"Downloading {ticker} from {start_dt.date()}")
+
+        df_new = yf.download(
+            ticker,
+            start=start_dt,
+            end=covered_from,
+            interval="1d",
+            progress=False
+        )
+        # Pokrycie tylko po udanym pobraniu – pusta odpowiedź (np. chwilowa awaria Yahoo)
+        # nie może oznaczyć zakresu jako pobranego, bo kolejne wywołania by go pominęły
+        if not df_new.empty:
+            storage.upsert(ticker, ingest(ticker, _map_yahoo_to_csv_structure(df_new)))
+            storage.set_covered_from(ticker, start_dt)
+        elif covered_from is not None:
+            # Brak notowań przed pokryciem (np. przed debiutem): próba zapisana z czasem,
+            # powtórzona dopiero po EMPTY_DOWNLOAD_RETRY zamiast przy każdym wywołaniu
+            storage.set_empty_download(ticker, start_dt, clock.now())
+
+    # Aktualizacja do dzisiaj
+    _, last_date = storage.date_range(ticker)
+    if last_date is not None and last_date < today and not is_ready(ticker):
+        print(f"Updating {ticker}")
+
+        df_new = yf.download(
+            ticker,
+            start=last_date + pd.Timedelta(days=1),
+            interval="1d",
+            progress=False
+        )
+        if not df_new.empty:
+            storage.upsert(ticker, ingest(ticker, _map_yahoo_to_csv_structure(df_new)))
+
+    return storage.read(ticker, start_dt, columns=columns, dtype=dtype)
+
+
 def _map_yahoo_to_csv_structure(df: pd.DataFrame) -> pd.DataFrame:
     """
     Mapuje dane z Yahoo Finance na strukturę zdefiniowaną przez CSV_COLUMNS.
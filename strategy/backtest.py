@@ -1,8 +1,33 @@
+import math
 import pandas as pd
 import numpy as np
+from config import BACKTEST_STATE_PATH, MOMENTUM_PERIODS
+from strategy.costs import net_statistics
+from strategy.decision_log import DecisionLog
 from strategy.gem import gem_decision
+from strategy.vectorized import ROLE_CODES
+from utils.hashing import code_version, data_fingerprint, fingerprint
+from utils.panel import PricePanel
+from utils.profiling import profiled
 
-def backtest_gem(assets: dict, start_date: str) -> dict:
+# Moduły, od których zależy wynik backtestu (zmiana kodu unieważnia cache)
+BACKTEST_MODULES = (
+    "strategy/backtest.py",
+    "strategy/gem.py",
+    "strategy/momentum.py",
+    "strategy/costs.py",
+    "strategy/decision_log.py",
+    "strategy/vectorized.py",
+)
+
+MOMENTUM_HORIZONS = ["3M", "6M", "12M"]
+
+# Liczba ostatnich miesięcy liczonych od nowa przy wznowieniu – ostatnia świeca
+# miesięczna bywa niepełna (bieżący miesiąc) i zmienia się do końca miesiąca
+RESUME_REPROCESS_MONTHS = 1
+
+@profiled("backtest_gem")
+def backtest_gem(assets, start_date: str, cache=None, costs=None) -> dict:
     """
     Backtest GEM dla wszystkich horyzontów momentum (3M,6M,12M) z dynamicznymi tickerami.
 
@@ -11,7 +36,13 @@ def backtest_gem(assets: dict, start_date: str) -> dict:
             'equity_us', 'equity_exus', 'defensive'
             i zawiera kolumnę 'Close'.
             Index musi być DatetimeIndex.
+            Zamiast dict można podać PricePanel z kolumnami ról (np. widok
+            z pamięci współdzielonej, utils.shared_panel) – dane nie są kopiowane.
         start_date: str, data rozpoczęcia inwestycji (format "YYYY-MM-DD")
+        cache: opcjonalny services.result_cache.ResultCache; wynik jest zapisywany
+            pod kluczem ze skrótu danych, parametrów i wersji kodu strategii
+        costs: opcjonalny strategy.costs.CostModel; wynik zawiera wtedy dodatkowo
+            krzywe, zwroty i statystyki netto (po kosztach i podatku) oraz liczbę przełączeń
 
     Returns:
         dict:
@@ -20,14 +51,28 @@ def backtest_gem(assets: dict, start_date: str) -> dict:
                 "monthly_returns": dict {horyzont: pd.Series},
                 "statistics": dict {horyzont: statystyki},
                 "decisions": dict {horyzont: ticker wybrany przez GEM},
+                "decision_log": strategy.decision_log.DecisionLog – wszystkie miesięczne
+                    decyzje (kody ról, momentum, risk-on/off) dla każdego horyzontu,
                 "tickers": dict {rola: ticker wprowadzony przez użytkownika}
             }
+            przy costs dodatkowo:
+                "net_equity_curves", "net_monthly_returns", "net_statistics": jak wyżej, netto
+                "switches": dict {horyzont: liczba zmian wybranego aktywa}
     """
 
-    # 🔹 Walidacja ról
-    required_roles = {"equity_us", "equity_exus", "defensive"}
-    if set(assets.keys()) != required_roles:
-        raise ValueError(f"Assets muszą zawierać dokładnie role: {required_roles}")
+    # 🔹 Cache wyników: te same dane + parametry + kod → zapisany wynik
+    if cache is not None:
+        key = fingerprint(
+            "backtest_gem",
+            data_fingerprint(assets),
+            start_date,
+            MOMENTUM_PERIODS,
+            costs.params() if costs is not None else None,
+            code_version(*BACKTEST_MODULES),
+        )
+        return cache.get_or_compute(key, lambda: backtest_gem(assets, start_date, costs=costs))
+
+    assets = _prepare_assets(assets)
 
     # 🔹 Wyciągamy tickery z DataFrame jeśli użytkownik je podał w atrybucie 'ticker'
     tickers_map = {role: df.attrs.get("ticker", role) for role, df in assets.items()}
@@ -35,49 +80,159 @@ def backtest_gem(assets: dict, start_date: str) -> dict:
     # 🔹 Daty do backtestu (przyjmujemy, że wszystkie aktywa mają te same daty)
     dates = assets["equity_us"].loc[start_date:].index
 
-    momentum_horizons = ["3M", "6M", "12M"]
-
     # 🏦 Inicjalizacja equity, miesięcznych zwrotów i decyzji
-    equity_curves = {h: [] for h in momentum_horizons}
-    monthly_returns = {h: [] for h in momentum_horizons}
-    portfolio_value = {h: 1.0 for h in momentum_horizons}  # start od 1 jednostki
-    decisions = {h: None for h in momentum_horizons}
+    state = _initial_state()
 
     # 🔄 Pętla po wszystkich miesiącach
     for current_date in dates:
-        # Wycinamy dane do dzisiejszej daty
-        current_assets = {role: df.loc[:current_date] for role, df in assets.items()}
+        _step(state, assets, current_date, tickers_map)
+
+    return _build_result(state, dates, tickers_map, costs)
+
+
+def backtest_gem_incremental(assets, start_date: str, store=None, costs=None) -> dict:
+    """
+    Backtest GEM wznawiany z zapisanego stanu (wynik identyczny z backtest_gem).
+
+    Po każdym uruchomieniu zapisywany jest stan: wartości portfela, krzywe equity,
+    zwroty i decyzje (z momentum każdej decyzji) – wraz ze skrótem danych, na których został
+    policzony. Kolejne uruchomienie liczy tylko nowe miesiące. Ostatnie
+    RESUME_REPROCESS_MONTHS miesięcy nie wchodzi do stanu (niepełna świeca bieżącego
+    miesiąca). Gdy dane historyczne sprzed punktu zapisu się zmieniły (korekta,
+    inne tickery), backtest liczony jest od początku.
+
+    Args:
+        assets: jak w backtest_gem
+        start_date: data rozpoczęcia inwestycji (format "YYYY-MM-DD")
+        store: services.result_cache.ResultCache na stan (domyślnie BACKTEST_STATE_PATH
+               bez limitu rozmiaru – stan nie jest wypierany przez inne wyniki)
+        costs: opcjonalny strategy.costs.CostModel (jak w backtest_gem)
+
+    Returns:
+        dict w formacie backtest_gem
+    """
+    from services.result_cache import ResultCache
 
-        # 🔑 decyzje GEM dla wszystkich horyzontów
-        gem_result = gem_decision(current_assets)  # zwraca dict {horyzont: wybrana rola}
+    assets = _prepare_assets(assets)
+    tickers_map = {role: df.attrs.get("ticker", role) for role, df in assets.items()}
+    dates = assets["equity_us"].loc[start_date:].index
 
-        for h in momentum_horizons:
-            selected_role = gem_result["decisions"][h]
-            selected_df = current_assets[selected_role]
+    store = store if store is not None else ResultCache(BACKTEST_STATE_PATH, max_bytes=math.inf)
+    key = fingerprint(
+        "backtest_gem_state",
+        tickers_map,
+        start_date,
+        MOMENTUM_PERIODS,
+        code_version(*BACKTEST_MODULES),
+    )
+
+    # 🔹 Wznowienie: stan pasuje, jeśli dane do daty zapisu są takie same
+    state, processed = _initial_state(), 0
+    saved = store.get(key)
+    if saved is not None:
+        n = saved["processed"]
+        if (
+            n <= len(dates)
+            and dates[n - 1] == saved["last_date"]
+            and _prefix_fingerprint(assets, saved["last_date"]) == saved["data_fingerprint"]
+        ):
+            state, processed = saved["state"], n
+        else:
+            print("[Backtest] Zmiana danych historycznych – pełne przeliczenie")
 
-            # obliczenie miesięcznego zwrotu
-            if len(selected_df) < 2:
-                monthly_return = 0
-            else:
-                prev_price = selected_df["Close"].iloc[-2]
-                current_price = selected_df["Close"].iloc[-1]
-                monthly_return = (current_price / prev_price) - 1
+    checkpoint = max(len(dates) - RESUME_REPROCESS_MONTHS, processed)
 
-            # aktualizacja equity
-            portfolio_value[h] *= (1 + monthly_return)
-            equity_curves[h].append(portfolio_value[h])
-            monthly_returns[h].append(monthly_return)
+    for current_date in dates[processed:checkpoint]:
+        _step(state, assets, current_date, tickers_map)
 
-            # zapamiętujemy ticker decyzji
-            decisions[h] = tickers_map[selected_role]
+    # 🔹 Zapis stanu (pickle w momencie zapisu – dalsze kroki go nie zmieniają)
+    if checkpoint > processed:
+        last_date = dates[checkpoint - 1]
+        store.put(key, {
+            "processed": checkpoint,
+            "last_date": last_date,
+            "data_fingerprint": _prefix_fingerprint(assets, last_date),
+            "state": state,
+        })
 
+    for current_date in dates[checkpoint:]:
+        _step(state, assets, current_date, tickers_map)
+
+    return _build_result(state, dates, tickers_map, costs)
+
+
+def _prepare_assets(assets) -> dict:
+    # 🔹 Panel (np. z pamięci współdzielonej) → DataFrame'y będące widokami na jego kolumny
+    if isinstance(assets, PricePanel):
+        assets = assets.to_frames()
+
+    # 🔹 Walidacja ról
+    required_roles = {"equity_us", "equity_exus", "defensive"}
+    if set(assets.keys()) != required_roles:
+        raise ValueError(f"Assets muszą zawierać dokładnie role: {required_roles}")
+
+    return assets
+
+
+def _prefix_fingerprint(assets: dict, last_date) -> str:
+    # Skrót danych wszystkich ról do daty zapisu stanu (wersja danych dla wznowienia)
+    return data_fingerprint({role: df.loc[:last_date] for role, df in assets.items()})
+
+
+def _initial_state() -> dict:
+    return {
+        "equity_curves": {h: [] for h in MOMENTUM_HORIZONS},
+        "monthly_returns": {h: [] for h in MOMENTUM_HORIZONS},
+        "portfolio_value": {h: 1.0 for h in MOMENTUM_HORIZONS},  # start od 1 jednostki
+        "decisions": {h: None for h in MOMENTUM_HORIZONS},
+        "selections": {h: [] for h in MOMENTUM_HORIZONS},  # kod roli wybranej w każdym miesiącu
+        "decision_momentum": {h: [] for h in MOMENTUM_HORIZONS},  # (momentum US, momentum exUS) per miesiąc
+    }
+
+
+def _step(state: dict, assets: dict, current_date, tickers_map: dict) -> None:
+    """
+    Jeden miesiąc backtestu: decyzje GEM na danych do current_date i aktualizacja stanu.
+    """
+    # Wycinamy dane do dzisiejszej daty
+    current_assets = {role: df.loc[:current_date] for role, df in assets.items()}
+
+    # 🔑 decyzje GEM dla wszystkich horyzontów
+    gem_result = gem_decision(current_assets)  # zwraca dict {horyzont: wybrana rola}
+
+    for h in MOMENTUM_HORIZONS:
+        selected_role = gem_result["decisions"][h]
+        selected_df = current_assets[selected_role]
+
+        # obliczenie miesięcznego zwrotu
+        if len(selected_df) < 2:
+            monthly_return = 0
+        else:
+            prev_price = selected_df["Close"].iloc[-2]
+            current_price = selected_df["Close"].iloc[-1]
+            monthly_return = (current_price / prev_price) - 1
+
+        # aktualizacja equity
+        state["portfolio_value"][h] *= (1 + monthly_return)
+        state["equity_curves"][h].append(state["portfolio_value"][h])
+        state["monthly_returns"][h].append(monthly_return)
+
+        # zapamiętujemy ticker decyzji
+        state["decisions"][h] = tickers_map[selected_role]
+        state["selections"][h].append(ROLE_CODES[selected_role])
+        state["decision_momentum"][h].append(tuple(
+            np.nan if value is None else value for value in gem_result["momentum"][h].values()
+        ))
+
+
+def _build_result(state: dict, dates, tickers_map: dict, costs=None) -> dict:
     # zamiana na pd.Series
-    equity_curves = {h: pd.Series(v, index=dates) for h, v in equity_curves.items()}
-    monthly_returns = {h: pd.Series(v, index=dates) for h, v in monthly_returns.items()}
+    equity_curves = {h: pd.Series(v, index=dates) for h, v in state["equity_curves"].items()}
+    monthly_returns = {h: pd.Series(v, index=dates) for h, v in state["monthly_returns"].items()}
 
     # 🧮 Statystyki
     statistics = {}
-    for h in momentum_horizons:
+    for h in MOMENTUM_HORIZONS:
         returns = monthly_returns[h]
         total_months = len(returns)
 
@@ -97,14 +252,48 @@ def backtest_gem(assets: dict, start_date: str) -> dict:
         }
 
     # 🔹 Zwracamy pełny wynik z tickerami i decyzjami GEM
-    return {
+    result = {
         "equity_curves": equity_curves,
         "monthly_returns": monthly_returns,
         "statistics": statistics,
-        "decisions": decisions,   # ticker wybrany przez strategię GEM dla 3M/6M/12M
+        "decisions": dict(state["decisions"]),   # ticker wybrany przez strategię GEM dla 3M/6M/12M
+        "decision_log": _decision_log(state, dates, tickers_map),   # pełny log decyzji
         "tickers": tickers_map    # mapowanie rola -> ticker użytkownika
     }
 
+    # 💸 Koszty transakcyjne i podatek: wszystkie horyzonty w jednym wywołaniu
+    if costs is not None:
+        codes = result["decision_log"].codes
+        returns = np.array([state["monthly_returns"][h] for h in MOMENTUM_HORIZONS], dtype=np.float64).reshape(-1, len(dates))
+        net = net_statistics(codes, returns, costs)
+
+        net_returns = {h: pd.Series(net["net_returns"][i], index=dates) for i, h in enumerate(MOMENTUM_HORIZONS)}
+        result["net_monthly_returns"] = net_returns
+        result["net_equity_curves"] = {h: (1 + r).cumprod() for h, r in net_returns.items()}
+        result["net_statistics"] = {
+            h: {name: float(values[i]) for name, values in net["net"].items()}
+            for i, h in enumerate(MOMENTUM_HORIZONS)
+        }
+        result["switches"] = {h: int(net["switches"][i]) for i, h in enumerate(MOMENTUM_HORIZONS)}
+
+    return result
+
+
+def _decision_log(state: dict, dates, tickers_map: dict) -> DecisionLog:
+    # Listy ze stanu → zwarte tablice (int8 kody ról, float32 momentum)
+    momentum = np.array(
+        [state["decision_momentum"][h] for h in MOMENTUM_HORIZONS], dtype=np.float32
+    ).reshape(len(MOMENTUM_HORIZONS), len(dates), 2)
+
+    return DecisionLog(
+        dates=dates,
+        horizons=MOMENTUM_HORIZONS,
+        codes=np.array([state["selections"][h] for h in MOMENTUM_HORIZONS], dtype=np.int8).reshape(-1, len(dates)),
+        momentum=momentum.transpose(0, 2, 1),
+        tickers=tickers_map,
+    )
+
+
 # equity_curves[h] – jak zmieniała się wartość portfela w czasie dla danego horyzontu (3M,6M,12M)
 # monthly_returns[h] – miesięczne zwroty portfela (np. 0.02 = +2%)
 # statistics[h]["CAGR"] – roczna stopa zwrotu
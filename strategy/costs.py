@@ -0,0 +1,177 @@
+import numpy as np
+
+from config import CAPITAL_GAINS_TAX_RATE, INITIAL_CAPITAL
+from utils.metrics import STATISTICS, performance_statistics
+
+
+class CostModel:
+    """
+    Model kosztów transakcyjnych i podatku dla strategii przełączającej cały portfel.
+
+    - fixed: stała prowizja za transakcję (w walucie portfela, np. PLN)
+    - bps: prowizja procentowa w punktach bazowych od wartości transakcji
+    - spread_bps: pełny spread bid/ask w punktach bazowych (każda transakcja płaci połowę)
+    - tax_rate: podatek od zrealizowanego zysku przy sprzedaży (domyślnie
+      config.CAPITAL_GAINS_TAX_RATE, 0 – bez podatku); każda pozycja to jedna partia,
+      zysk = przychód ze sprzedaży - kwota zakupu
+    - initial_capital: kapitał początkowy (potrzebny tylko dla prowizji stałej)
+
+    Przełączenie = sprzedaż poprzedniego aktywa + zakup nowego. Pierwszy miesiąc to zakup.
+    Pozycja otwarta na końcu historii nie jest sprzedawana (brak kosztu sprzedaży i podatku).
+    Podatek liczony jest przy każdej sprzedaży, bez rozliczania strat między latami,
+    a prowizja stała nie pomniejsza podstawy opodatkowania.
+    """
+
+    def __init__(self, fixed: float = 0.0, bps: float = 0.0, spread_bps: float = 0.0,
+                 tax_rate: float = None, initial_capital: float = None):
+        tax_rate = CAPITAL_GAINS_TAX_RATE if tax_rate is None else tax_rate
+        if min(fixed, bps, spread_bps, tax_rate) < 0 or tax_rate >= 1:
+            raise ValueError("Koszty muszą być nieujemne, a stawka podatku mniejsza niż 1")
+        self.fixed = float(fixed)
+        self.bps = float(bps)
+        self.spread_bps = float(spread_bps)
+        self.tax_rate = float(tax_rate)
+        self.initial_capital = float(INITIAL_CAPITAL if initial_capital is None else initial_capital)
+
+    @property
+    def rate(self) -> float:
+        # Proporcjonalny koszt jednej transakcji (prowizja + połowa spreadu)
+        return (self.bps + self.spread_bps / 2) / 10_000
+
+    def params(self) -> dict:
+        return {
+            "fixed": self.fixed,
+            "bps": self.bps,
+            "spread_bps": self.spread_bps,
+            "tax_rate": self.tax_rate,
+            "initial_capital": self.initial_capital,
+        }
+
+    def __repr__(self):
+        return f"CostModel({', '.join(f'{k}={v}' for k, v in self.params().items())})"
+
+
+def switch_events(codes: np.ndarray) -> np.ndarray:
+    """
+    Miesiące, w których portfel kupuje nowe aktywo (pierwszy miesiąc i każda zmiana wyboru).
+
+    codes: kody wybranych ról, czas wzdłuż ostatniej osi (np. (miesiące,) lub (konfiguracje, miesiące))
+    """
+    codes = np.asarray(codes)
+    events = np.ones(codes.shape, dtype=bool)
+    events[..., 1:] = np.diff(codes, axis=-1) != 0
+    return events
+
+
+def apply_costs(codes: np.ndarray, returns: np.ndarray, model: CostModel) -> np.ndarray:
+    """
+    Miesięczne zwroty netto po kosztach i podatku (wektorowo dla całej historii;
+    prowizja stała razem z podatkiem – pętla po miesiącach, wektorowo po pozostałych osiach).
+
+    Zwrot z miesiąca t należy do aktywa codes[..., t]; przy zmianie wyboru w miesiącu t
+    pozycja sprzedawana jest przed naliczeniem zwrotu z tego miesiąca.
+
+    Args:
+        codes: kody wybranych ról, czas wzdłuż ostatniej osi
+        returns: zwroty brutto wybranych aktywów, ten sam kształt co codes
+        model: CostModel
+
+    Returns:
+        np.ndarray zwrotów netto (kształt jak returns)
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    n_months = returns.shape[-1]
+    if n_months == 0:
+        return returns.copy()
+
+    buys = switch_events(codes)
+    if model.fixed > 0 and model.tax_rate > 0:
+        return _apply_costs_sequential(buys, returns, model)
+
+    sells = buys.copy()
+    sells[..., 0] = False
+    rate = model.rate
+
+    # Wzrost brutto od początku każdej partii do końca miesiąca t-1 (log-sumy prefiksowe)
+    log_growth = np.concatenate(
+        [np.zeros(returns.shape[:-1] + (1,)), np.cumsum(np.log1p(returns), axis=-1)], axis=-1
+    )
+    months = np.arange(n_months)
+    lot_start = np.maximum.accumulate(np.where(buys, months, 0), axis=-1)
+    previous_start = np.concatenate([lot_start[..., :1], lot_start[..., :-1]], axis=-1)
+    lot_growth = np.exp(log_growth[..., :-1] - np.take_along_axis(log_growth, previous_start, axis=-1))
+
+    # Sprzedaż: wartość partii po koszcie zakupu (wzgl. kwoty zakupu) = (1 - rate) * wzrost
+    value_ratio = (1 - rate) * lot_growth
+    with np.errstate(divide="ignore", invalid="ignore"):
+        proceeds = (1 - rate) - model.tax_rate * np.maximum((1 - rate) - 1 / value_ratio, 0)
+
+    factor = np.where(buys, 1 - rate, 1.0) * np.where(sells, proceeds, 1.0)
+    gross = 1 + returns
+    growth = factor * gross
+
+    if model.fixed == 0:
+        net_value = np.cumprod(growth, axis=-1)
+        previous = np.concatenate([np.ones(returns.shape[:-1] + (1,)), net_value[..., :-1]], axis=-1)
+        return net_value / previous - 1
+
+    # Prowizja stała bez podatku: V_t = growth_t * V_{t-1} - F_t * gross_t → rekurencja afiniczna przez cumprod
+    # (opłata za sprzedaż pomniejsza kwotę zakupu, więc obejmuje ją też koszt proporcjonalny zakupu)
+    fees = model.fixed * (buys + sells * (1 - rate)) * gross
+    cumulative = np.cumprod(growth, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = cumulative * (model.initial_capital - np.cumsum(fees / cumulative, axis=-1))
+    value = np.maximum(value, 0.0)
+
+    previous = np.concatenate(
+        [np.full(returns.shape[:-1] + (1,), model.initial_capital), value[..., :-1]], axis=-1
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(previous > 0, value / previous - 1, 0.0)
+
+
+def _apply_costs_sequential(buys: np.ndarray, returns: np.ndarray, model: CostModel) -> np.ndarray:
+    # Prowizja stała razem z podatkiem: partia po zakupie to (1 - rate) * kwota zakupu - F,
+    # więc stosunek wartości partii do kwoty zakupu zależy od wartości portfela
+    # i zysk nie wynika z samych log-sum zwrotów. Pętla po miesiącach, wektorowo po
+    # pozostałych osiach (liczba miesięcy jest mała).
+    rate = model.rate
+    value = np.full(returns.shape[:-1], model.initial_capital)
+    basis = np.zeros(returns.shape[:-1])
+    net = np.empty_like(returns)
+
+    for t in range(returns.shape[-1]):
+        previous = value
+        if t > 0:
+            proceeds = value * (1 - rate)
+            after_sale = proceeds - model.tax_rate * np.maximum(proceeds - basis, 0) - model.fixed
+            value = np.where(buys[..., t], after_sale, value)
+        basis = np.where(buys[..., t], value, basis)
+        value = np.where(buys[..., t], value * (1 - rate) - model.fixed, value)
+        value = np.maximum(value * (1 + returns[..., t]), 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            net[..., t] = np.where(previous > 0, value / previous - 1, 0.0)
+
+    return net
+
+
+def net_statistics(codes: np.ndarray, returns: np.ndarray, model: CostModel) -> dict:
+    """
+    Statystyki brutto i netto oraz liczba przełączeń (czas wzdłuż ostatniej osi).
+
+    Returns:
+        dict {"gross": {statystyka: wartość}, "net": {...}, "switches": liczba zmian wyboru,
+              "net_returns": zwroty netto}
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    net = apply_costs(codes, returns, model)
+    gross_stats = performance_statistics(returns, axis=-1)
+    net_stats = performance_statistics(net, axis=-1)
+    switches = switch_events(codes)[..., 1:].sum(axis=-1)
+
+    return {
+        "gross": {name: gross_stats[name] for name in STATISTICS},
+        "net": {name: net_stats[name] for name in STATISTICS},
+        "switches": switches,
+        "net_returns": net,
+    }
@@ -0,0 +1,130 @@
+# decision_log.py
+# Pełny miesięczny log decyzji GEM w zwartych tablicach kolumnowych.
+# Odpowiada za:
+# - zapis każdej decyzji (miesiąc × horyzont): kod roli int8, momentum obu aktywów
+#   ryzykownych (float32) i flaga risk-on/off
+# - dekodowanie kodów ról na tickery dopiero przy wyświetlaniu
+# - budowę logu wprost z danych (wektorowo), bez uruchamiania backtestu
+
+import numpy as np
+import pandas as pd
+
+from config import MOMENTUM_PERIODS
+from strategy.vectorized import DEFENSIVE, ROLES, gem_select, role_momentum
+
+# Kolumny zdekodowanego logu (kolejność jak w visualisation.tables)
+DECISION_COLUMNS = ("Date", "Horizon", "Ticker", "Role", "Momentum US", "Momentum exUS", "Signal")
+
+
+def decode(dates, horizons, tickers: dict, values: dict) -> pd.DataFrame:
+    """
+    Zamienia wybrane wiersze logu (pozycje daty i horyzontu, kody, momentum)
+    na DataFrame z tickerami i nazwami ról.
+    """
+    roles = np.array(ROLES)[values["codes"]]
+    names = np.array([tickers.get(role, role) for role in ROLES], dtype=object)
+    risk_on = values["risk_on"] if "risk_on" in values else values["codes"] != DEFENSIVE
+
+    return pd.DataFrame({
+        "Date": pd.DatetimeIndex(dates)[values["date_pos"]],
+        "Horizon": np.array(horizons)[values["horizon_pos"]],
+        "Ticker": names[values["codes"]],
+        "Role": roles,
+        "Momentum US": values["momentum_us"].astype(np.float64),
+        "Momentum exUS": values["momentum_exus"].astype(np.float64),
+        "Signal": np.where(risk_on, "risk_on", "risk_off"),
+    })
+
+
+class DecisionLog:
+    """
+    Decyzje GEM dla wszystkich miesięcy i horyzontów.
+
+    - dates: datetime64[ns], kształt (T,)
+    - horizons: etykiety horyzontów, np. ("3M", "6M", "12M")
+    - codes: int8 (H, T) – kod wybranej roli (strategy.vectorized.ROLES)
+    - momentum: float32 (H, 2, T) – momentum equity_us i equity_exus (NaN, gdy brak historii)
+    - risk_on: bool (H, T) – czy wybrano aktywo ryzykowne
+    - tickers: mapowanie rola -> ticker (używane tylko przy dekodowaniu)
+
+    Wiersz logu = (data, horyzont), numerowany data * H + horyzont.
+    """
+
+    def __init__(self, dates, horizons, codes, momentum, risk_on=None, tickers: dict = None):
+        self.dates = np.asarray(dates, dtype="datetime64[ns]")
+        self.horizons = tuple(horizons)
+        self.codes = np.asarray(codes, dtype=np.int8)
+        self.momentum = np.asarray(momentum, dtype=np.float32)
+        self.risk_on = self.codes != DEFENSIVE if risk_on is None else np.asarray(risk_on, dtype=bool)
+        self.tickers = dict(tickers) if tickers else {role: role for role in ROLES}
+
+        shape = (len(self.horizons), len(self.dates))
+        if self.codes.shape != shape or self.risk_on.shape != shape or self.momentum.shape != (shape[0], 2, shape[1]):
+            raise ValueError(
+                f"Niezgodny kształt logu decyzji: codes {self.codes.shape}, "
+                f"momentum {self.momentum.shape}, risk_on {self.risk_on.shape}, oczekiwano {shape}"
+            )
+
+    @classmethod
+    def from_assets(cls, assets: dict, start_date: str) -> "DecisionLog":
+        """
+        Log liczony wektorowo z danych wejściowych backtest_gem (wynik jak w backteście).
+        """
+        dates = assets["equity_us"].loc[start_date:].index
+        momentum = np.array([role_momentum(assets, dates, months) for months in MOMENTUM_PERIODS.values()])
+
+        return cls(
+            dates=dates,
+            horizons=[period.upper() for period in MOMENTUM_PERIODS],
+            codes=gem_select(momentum[:, 0], momentum[:, 1]),
+            momentum=momentum,
+            tickers={role: df.attrs.get("ticker", role) for role, df in assets.items()},
+        )
+
+    def __len__(self) -> int:
+        return self.codes.size
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + self.codes.nbytes + self.momentum.nbytes + self.risk_on.nbytes
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.dates, name="Date")
+
+    def selections(self, horizon: str) -> pd.Series:
+        """
+        Kody ról wybranych w kolejnych miesiącach dla horyzontu (int8).
+        """
+        return pd.Series(self.codes[self.horizons.index(horizon)], index=self.index, name=horizon)
+
+    def last(self) -> dict:
+        """
+        Ticker wybrany w ostatnim miesiącu, per horyzont (jak result["decisions"]).
+        """
+        if not len(self.dates):
+            return {h: None for h in self.horizons}
+        return {h: self.tickers[ROLES[self.codes[i, -1]]] for i, h in enumerate(self.horizons)}
+
+    def rows(self, rows) -> dict:
+        """
+        Wartości wskazanych wierszy logu (wiersz = data * H + horyzont), bez dekodowania.
+        """
+        date_pos, horizon_pos = np.divmod(np.asarray(rows, dtype=np.int64), len(self.horizons))
+        return {
+            "date_pos": date_pos,
+            "horizon_pos": horizon_pos,
+            "momentum_us": self.momentum[horizon_pos, 0, date_pos],
+            "momentum_exus": self.momentum[horizon_pos, 1, date_pos],
+            "codes": self.codes[horizon_pos, date_pos],
+            "risk_on": self.risk_on[horizon_pos, date_pos],
+        }
+
+    def decode(self, horizon: str = None) -> pd.DataFrame:
+        """
+        Log jako DataFrame (kolumny DECISION_COLUMNS), opcjonalnie dla jednego horyzontu.
+        """
+        rows = np.arange(len(self))
+        if horizon is not None:
+            rows = rows[rows % len(self.horizons) == self.horizons.index(horizon)]
+        return decode(self.dates, self.horizons, self.tickers, self.rows(rows))
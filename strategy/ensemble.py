@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from config import MOMENTUM_PERIODS
+from strategy.momentum import _get_price_column
+from strategy.vectorized import ROLES, gem_select, momentum_matrix, portfolio_returns, role_returns
+from utils.metrics import STATISTICS, performance_statistics
+from utils.panel import PricePanel
+
+
+def ensemble_lookbacks(extra_lookbacks: dict = None) -> dict:
+    """
+    Lookbacks of the ensemble: the configured GEM horizons plus optional extras.
+
+    Returns:
+        Dict {label: months}, e.g. {"3M": 3, "6M": 6, "12M": 12, "9M": 9}.
+    """
+    lookbacks = {period.upper(): months for period, months in MOMENTUM_PERIODS.items()}
+    for label, months in (extra_lookbacks or {}).items():
+        if int(months) < 1:
+            raise ValueError(f"Lookback must be at least 1 month: {label}={months}")
+        lookbacks[label] = int(months)
+    return lookbacks
+
+
+def normalize_weights(lookbacks: dict, weights: dict = None) -> np.ndarray:
+    """
+    Ensemble weights aligned with `lookbacks`, summing to 1 (equal when None).
+
+    Lookbacks missing from a custom weights dict get weight 0.
+    """
+    if weights is None:
+        return np.full(len(lookbacks), 1 / len(lookbacks))
+
+    unknown = set(weights) - set(lookbacks)
+    if unknown:
+        raise ValueError(f"Weights for unknown lookbacks: {sorted(unknown)}")
+
+    values = np.array([float(weights.get(label, 0.0)) for label in lookbacks])
+    if (values < 0).any() or values.sum() <= 0:
+        raise ValueError(f"Weights must be non-negative with a positive sum: {weights}")
+    return values / values.sum()
+
+
+def backtest_ensemble(assets, start_date: str, weights: dict = None, extra_lookbacks: dict = None) -> dict:
+    """
+    GEM ensemble: each month the portfolio holds a weighted blend of the
+    per-lookback GEM selections (rebalanced monthly to the blend).
+
+    Momentum for all lookbacks comes from one vectorized pass, so the
+    individual horizons and the blend share the same selection codes;
+    a single-lookback ensemble reproduces backtest_gem for that horizon.
+
+    Args:
+        assets: Dict {role: DataFrame} or PricePanel, as for backtest_gem.
+        start_date: First backtest month ("YYYY-MM-DD").
+        weights: Dict {lookback label: weight}; None for equal weights.
+        extra_lookbacks: Additional lookbacks {label: months}, e.g. {"9M": 9}.
+
+    Returns:
+        dict:
+            {
+                "weights": DataFrame (dates × roles) of blended role weights,
+                "selections": DataFrame (dates × lookbacks) of selected roles,
+                "equity_curve": pd.Series,
+                "monthly_returns": pd.Series,
+                "statistics": dict of portfolio statistics,
+                "components": dict {lookback: statistics of that lookback alone},
+                "lookbacks": dict {lookback: (months, weight)}
+            }
+    """
+    if isinstance(assets, PricePanel):
+        assets = assets.to_frames()
+
+    if set(assets) != set(ROLES):
+        raise ValueError(f"Assets must contain exactly the roles: {set(ROLES)}")
+
+    lookbacks = ensemble_lookbacks(extra_lookbacks)
+    blend = normalize_weights(lookbacks, weights)
+    dates = assets["equity_us"].loc[start_date:].index
+
+    momentum = []
+    for role in ROLES[:2]:
+        df = assets[role]
+        prices = df[_get_price_column(df)].to_numpy()
+        momentum.append(momentum_matrix(df.index, prices, dates, lookbacks.values()))
+
+    codes = gem_select(*momentum)  # (lookbacks, months)
+    returns = role_returns(assets, dates)  # (months, roles)
+
+    # One-hot selections weighted by lookback → role weights per month
+    one_hot = codes[:, :, None] == np.arange(len(ROLES))
+    role_weights = np.einsum("l,ltr->tr", blend, one_hot.astype(np.float64))
+
+    portfolio = portfolio_returns(role_weights, returns)
+    component_returns = np.take_along_axis(returns.T, codes.astype(np.intp), axis=0)  # (lookbacks, months)
+
+    stats = performance_statistics(portfolio)
+    component_stats = performance_statistics(component_returns, axis=1)
+    labels = list(lookbacks)
+
+    return {
+        "weights": pd.DataFrame(role_weights, index=dates, columns=list(ROLES)),
+        "selections": pd.DataFrame(np.array(ROLES)[codes.T], index=dates, columns=labels),
+        "equity_curve": pd.Series(np.cumprod(1 + portfolio), index=dates),
+        "monthly_returns": pd.Series(portfolio, index=dates),
+        "statistics": {name: float(stats[name]) for name in STATISTICS},
+        "components": {
+            label: {name: float(component_stats[name][i]) for name in STATISTICS}
+            for i, label in enumerate(labels)
+        },
+        "lookbacks": {label: (lookbacks[label], float(blend[i])) for i, label in enumerate(labels)},
+    }
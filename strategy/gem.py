@@ -2,18 +2,44 @@ from typing import Dict, Any
 import pandas as pd
 from config import MOMENTUM_PERIODS
 from strategy.momentum import get_momentum
+from strategy.signals import get_signal
+from strategy.vectorized import ROLES
+from utils.hashing import code_version, data_fingerprint, fingerprint
+from utils.profiling import profiled
+
+# Modules whose source is part of the cached signal version
+GEM_MODULES = ("strategy/gem.py", "strategy/momentum.py", "strategy/decision_log.py", "strategy/vectorized.py")
+
+# Backtest horizon labels ("3M", "6M", "12M") mapped to MOMENTUM_PERIODS keys
+BACKTEST_HORIZONS = {period.upper(): period for period in MOMENTUM_PERIODS}
 
 
 class GEM:
-    def __init__(self, data_service: Any):
+    # Bar type consumed by the strategy (see services.resampling / data_service.get_bars)
+    bar_type = "monthly"
+
+    def __init__(self, data_service: Any, result_cache: Any = None, currency: str = None):
         """
         Initialize the GEM strategy.
 
         Args:
             data_service: An object capable of fetching asset data via get_data().
+            result_cache: Optional services.result_cache.ResultCache. When set,
+                          evaluate_all() results are reused for unchanged data,
+                          parameters and strategy code.
+            currency: Optional investor currency (e.g. "PLN"); prices are converted
+                      by the data service before momentum is computed.
         """
         self.data_service = data_service
+        self.result_cache = result_cache
+        self.currency = currency
 
+    def _monthly_data(self, asset: str) -> pd.DataFrame:
+        if self.currency is None:
+            return self.data_service.get_monthly_data(asset)
+        return self.data_service.get_monthly_data(asset, currency=self.currency)
+
+    @profiled("GEM.evaluate")
     def evaluate(
         self,
         asset_a: str,
@@ -49,8 +75,8 @@ class GEM:
         # Note: We fetch data starting earlier to ensure we have enough history for momentum calculation
         # The data_service handles the start_date logic based on momentum window,
         # but here we explicitly request monthly data.
-        df_a = self.data_service.get_monthly_data(asset_a)
-        df_b = self.data_service.get_monthly_data(asset_b)
+        df_a = self._monthly_data(asset_a)
+        df_b = self._monthly_data(asset_b)
 
         # Filter data to include only available history up to cutoff_date
         df_a = df_a[df_a["Date"] <= cutoff_date]
@@ -88,6 +114,53 @@ class GEM:
             "signal_type": signal_type,
         }
 
+    def evaluate_signal(
+        self,
+        asset_a: str,
+        asset_b: str,
+        defensive_asset: str,
+        signal: Any,
+        decision_date: str,
+        **params,
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a signal plugin (see strategy.signals) for the given assets.
+
+        Uses the same cutoff as evaluate(): data up to the end of the month
+        before decision_date; the allocation comes from signal.aligned_weights
+        on the cutoff date. Only the last signal.warmup + 1 rows of each asset
+        before the cutoff are passed to the plugin, which is all the current
+        allocation depends on.
+
+        Args:
+            signal: Registered signal name (e.g. 'accelerating') or Signal instance.
+            **params: Signal parameters when `signal` is a name.
+        """
+        signal = get_signal(signal, **params)
+
+        decision_dt = pd.Timestamp(decision_date)
+        cutoff_date = decision_dt.replace(day=1) - pd.Timedelta(days=1)
+
+        tickers = dict(zip(ROLES, (asset_a, asset_b, defensive_asset)))
+        frames = {}
+        for role, ticker in tickers.items():
+            df = self._monthly_data(ticker)
+            end = df["Date"].searchsorted(cutoff_date, side="right")
+            frames[role] = df.iloc[max(end - signal.warmup - 1, 0):end]
+
+        weights = pd.Series(signal.aligned_weights(frames, [cutoff_date])[0], index=list(ROLES))
+
+        winner_role = weights.idxmax()
+
+        return {
+            "signal": signal.name,
+            "params": signal.params,
+            "decision_date": decision_date,
+            "weights": {tickers[role]: float(weights[role]) for role in ROLES},
+            "winner": tickers[winner_role],
+            "signal_type": "risk_off" if winner_role == "defensive" else "risk_on",
+        }
+
     def evaluate_all(
         self,
         asset_a: str,
@@ -99,6 +172,33 @@ class GEM:
         Evaluate GEM for all configured momentum periods.
         """
 
+        if self.result_cache is not None:
+            # The key covers the price data version, so fresh bars invalidate it
+            key = fingerprint(
+                "GEM.evaluate_all",
+                data_fingerprint(self._monthly_data(asset_a)),
+                data_fingerprint(self._monthly_data(asset_b)),
+                asset_a,
+                asset_b,
+                defensive_asset,
+                decision_date,
+                MOMENTUM_PERIODS,
+                code_version(*GEM_MODULES),
+            )
+            return self.result_cache.get_or_compute(
+                key,
+                lambda: self._evaluate_all(asset_a, asset_b, defensive_asset, decision_date),
+            )
+
+        return self._evaluate_all(asset_a, asset_b, defensive_asset, decision_date)
+
+    def _evaluate_all(
+        self,
+        asset_a: str,
+        asset_b: str,
+        defensive_asset: str,
+        decision_date: str,
+    ) -> Dict[str, Dict[str, Any]]:
         results = {}
 
         for period in MOMENTUM_PERIODS.keys():
@@ -110,4 +210,47 @@ class GEM:
                 decision_date=decision_date,
             )
 
-        return results
\ No newline at end of file
+        return results
+
+
+def gem_decision(assets: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """
+    Evaluate GEM on in-memory price history for every backtest horizon.
+
+    Used by the backtest, where each DataFrame is already sliced up to the
+    current date. Selection rules are the same as in GEM.evaluate:
+    'equity_us' wins ties, the winner must have positive momentum.
+
+    Args:
+        assets: dict {role: pd.DataFrame} with roles 'equity_us', 'equity_exus'
+                and 'defensive' (see strategy.momentum for price columns).
+
+    Returns:
+        dict with keys:
+            "decisions": {horizon: selected role} for horizons '3M', '6M', '12M',
+            "momentum": {horizon: {role: momentum or None}} for both risky roles.
+        When momentum cannot be calculated (too little history, NaN prices)
+        the defensive role is selected.
+    """
+
+    decisions = {}
+    momentum = {}
+
+    for horizon, period in BACKTEST_HORIZONS.items():
+        try:
+            momentum_a = get_momentum(assets["equity_us"], period)
+            momentum_b = get_momentum(assets["equity_exus"], period)
+        except ValueError:
+            decisions[horizon] = "defensive"
+            momentum[horizon] = {"equity_us": None, "equity_exus": None}
+            continue
+
+        if momentum_a >= momentum_b:
+            winner, winner_momentum = "equity_us", momentum_a
+        else:
+            winner, winner_momentum = "equity_exus", momentum_b
+
+        decisions[horizon] = winner if winner_momentum > 0 else "defensive"
+        momentum[horizon] = {"equity_us": momentum_a, "equity_exus": momentum_b}
+
+    return {"decisions": decisions, "momentum": momentum}
@@ -2,18 +2,21 @@ import pandas as pd
 from typing import Dict
 
 from config import MOMENTUM_PERIODS
+from utils.profiling import profiled
 
 
 def _get_price_column(df: pd.DataFrame) -> str:
     """
     Returns the column name used for momentum calculation.
-    Prefers 'Adj Close', falls back to 'Price'.
+    Prefers 'Adj Close', falls back to 'Price' and then 'Close'.
     """
     if "Adj Close" in df.columns:
         return "Adj Close"
     if "Price" in df.columns:
         return "Price"
-    raise ValueError("DataFrame must contain 'Adj Close' or 'Price' column.")
+    if "Close" in df.columns:
+        return "Close"
+    raise ValueError("DataFrame must contain 'Adj Close', 'Price' or 'Close' column.")
 
 
 def _validate_data_length(df: pd.DataFrame, required_period: int) -> None:
@@ -26,6 +29,7 @@ def _validate_data_length(df: pd.DataFrame, required_period: int) -> None:
         )
 
 
+@profiled("get_momentum")
 def get_momentum(df: pd.DataFrame, period: str) -> float:
     """
     Returns the latest momentum value for a given period.
@@ -0,0 +1,142 @@
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import MOMENTUM_PERIODS, STORAGE_BACKEND
+from services.resampling import resample
+from services.storage import get_storage
+
+# Only this column is read from the price cache
+SCREEN_COLUMN = "Adj Close"
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Yields consecutive lists of at most `size` items.
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ticker_momentum(storage, ticker: str, as_of=None, anchor: str = None) -> Optional[Tuple[str, pd.Timestamp, Dict[str, float]]]:
+    """
+    Read → monthly resample → momentum for a single ticker.
+
+    Returns:
+        (ticker, last monthly bar date, {period: momentum}) or None when there is
+        no data. Periods with too little history are left out.
+    """
+    daily = storage.read(ticker, end=as_of, columns=[SCREEN_COLUMN])
+    if daily.empty:
+        return None
+
+    monthly = resample(daily, "monthly", anchor)[SCREEN_COLUMN].to_numpy(dtype=np.float64)
+    if len(monthly) == 0:
+        return None
+
+    momentums = {}
+    for period, months in MOMENTUM_PERIODS.items():
+        if len(monthly) > months:
+            value = monthly[-1] / monthly[-1 - months] - 1
+            if not np.isnan(value):
+                momentums[period] = float(value)
+
+    return ticker, daily.index[-1], momentums
+
+
+def _screen_chunk(tickers: List[str], backend: str, path, as_of, anchor) -> list:
+    # Runs in a worker process: results for one chunk of tickers (small, picklable)
+    storage = get_storage(backend, path)
+    return [r for r in (ticker_momentum(storage, t, as_of, anchor) for t in tickers) if r is not None]
+
+
+def iter_momentum(
+    tickers: Iterable[str] = None,
+    path=None,
+    as_of=None,
+    anchor: str = None,
+    chunk_size: int = 50,
+    workers: int = None,
+    backend: str = None,
+) -> Iterator[Tuple[str, pd.Timestamp, Dict[str, float]]]:
+    """
+    Streams momentum for every ticker in the price cache.
+
+    Tickers are processed one at a time (or one chunk per worker process),
+    so memory does not grow with the size of the universe.
+
+    Args:
+        tickers: Tickers to screen; defaults to every ticker in the cache.
+        path: Cache location for the backend (defaults to its configured path).
+        as_of: Ignore prices after this date.
+        anchor: Monthly bar anchor ('last' / 'first'), see services.resampling.
+        chunk_size: Tickers per worker task.
+        workers: Number of worker processes; None or 1 runs in-process.
+        backend: Storage backend name (defaults to config.STORAGE_BACKEND).
+    """
+    backend = backend or STORAGE_BACKEND
+    storage = get_storage(backend, path)
+    tickers = tickers if tickers is not None else storage.tickers()
+
+    if not workers or workers <= 1:
+        for ticker in tickers:
+            result = ticker_momentum(storage, ticker, as_of, anchor)
+            if result is not None:
+                yield result
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Bounded number of chunks in flight keeps memory flat for huge universes
+        chunks = iter_chunks(tickers, chunk_size)
+        pending = [pool.submit(_screen_chunk, chunk, backend, path, as_of, anchor) for chunk in islice(chunks, workers * 2)]
+
+        while pending:
+            future = pending.pop(0)
+            for chunk in islice(chunks, 1):
+                pending.append(pool.submit(_screen_chunk, chunk, backend, path, as_of, anchor))
+            yield from future.result()
+
+
+def screen_momentum(
+    tickers: Iterable[str] = None,
+    top_k: int = 20,
+    path=None,
+    as_of=None,
+    anchor: str = None,
+    chunk_size: int = 50,
+    workers: int = None,
+    backend: str = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Top-k tickers by momentum for every configured period.
+
+    Only a heap of `top_k` entries per period is kept while streaming.
+
+    Returns:
+        Dict {period: DataFrame[Ticker, Momentum, Last Date]} sorted by momentum, descending.
+    """
+    heaps = {period: [] for period in MOMENTUM_PERIODS}
+
+    for ticker, last_date, momentums in iter_momentum(tickers, path, as_of, anchor, chunk_size, workers, backend):
+        for period, value in momentums.items():
+            item = (value, ticker, last_date)
+            if len(heaps[period]) < top_k:
+                heapq.heappush(heaps[period], item)
+            else:
+                heapq.heappushpop(heaps[period], item)
+
+    return {
+        period: pd.DataFrame(
+            sorted(heap, reverse=True),
+            columns=["Momentum", "Ticker", "Last Date"],
+        )[["Ticker", "Momentum", "Last Date"]]
+        for period, heap in heaps.items()
+    }
@@ -0,0 +1,345 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from strategy.momentum import _get_price_column
+from strategy.vectorized import DEFENSIVE, ROLES, gem_select, portfolio_returns, role_returns
+from utils.metrics import STATISTICS, performance_statistics
+from utils.panel import PricePanel
+
+# Registered signal plugins: {name: Signal subclass}
+SIGNALS = {}
+
+
+def register_signal(cls):
+    """
+    Class decorator adding a Signal subclass to SIGNALS under its `name`.
+    """
+    if not cls.name:
+        raise ValueError(f"Signal class {cls.__name__} has no name")
+    if cls.name in SIGNALS and SIGNALS[cls.name] is not cls:
+        raise ValueError(f"Signal already registered: {cls.name}")
+    SIGNALS[cls.name] = cls
+    return cls
+
+
+def get_signal(signal, **params) -> "Signal":
+    """
+    Signal instance from a registered name (with params) or an existing instance.
+    """
+    if isinstance(signal, Signal):
+        if params:
+            raise ValueError("Params can only be given together with a signal name")
+        return signal
+    if signal not in SIGNALS:
+        raise ValueError(f"Unknown signal: {signal} (expected one of {sorted(SIGNALS)})")
+    return SIGNALS[signal](**params)
+
+
+def momentum(prices: np.ndarray, months: int) -> np.ndarray:
+    """
+    Momentum over `months` rows along axis 0 (NaN where history is too short).
+    """
+    result = np.full(prices.shape, np.nan)
+    if len(prices) > months:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[months:] = prices[months:] / prices[:-months] - 1
+    return result
+
+
+def rolling_volatility(prices: np.ndarray, window: int) -> np.ndarray:
+    """
+    Standard deviation (ddof=1) of the valid one-row returns among the last
+    `window` along axis 0; NaN where fewer than two are valid.
+
+    Uses NaN-masked cumulative sums plus a count, so memory stays proportional
+    to the input for any window and a missing price (e.g. before a later
+    listing in signal_panel) only affects the windows that contain it.
+    """
+    returns = momentum(prices, 1)
+    result = np.full(prices.shape, np.nan)
+    if len(prices) <= window:
+        return result
+
+    tail = returns[1:]
+    valid = ~np.isnan(tail)
+    tail = np.where(valid, tail, 0.0)
+    zeros = np.zeros((1,) + tail.shape[1:])
+    s0 = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+    s1 = np.concatenate([zeros, np.cumsum(tail, axis=0)])
+    s2 = np.concatenate([zeros, np.cumsum(tail ** 2, axis=0)])
+
+    count = s0[window:] - s0[:-window]
+    total = s1[window:] - s1[:-window]
+    total_sq = s2[window:] - s2[:-window]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (total_sq - total ** 2 / count) / (count - 1)
+    result[window:] = np.where(count >= 2, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+    return result
+
+
+class Signal(ABC):
+    """
+    Signal plugin: price panel in, selection weights out.
+
+    `weights(prices)` takes prices in ROLES order along axis 1, shaped (T, 3)
+    or (T, 3, *batch) for many universes at once, and returns role weights of
+    the same shape. Row t may only use rows up to t, so the weights can be
+    applied directly to the return of the month ending on row t (as in
+    backtest_gem). All computation is vectorized over time and batch axes.
+
+    `aligned_weights(frames, dates)` gives the weights on given dates from
+    per-role price frames; backtest_signal and GEM.evaluate_signal use it.
+    """
+
+    name = None
+
+    def __init__(self, **params):
+        self.params = params
+
+    @property
+    def warmup(self) -> int:
+        """
+        Rows of history needed before the first non-defensive selection.
+        """
+        return 0
+
+    @abstractmethod
+    def weights(self, prices: np.ndarray) -> np.ndarray:
+        ...
+
+    def aligned_weights(self, assets: dict, dates) -> np.ndarray:
+        """
+        Role weights on each of `dates`, shape (len(dates), 3), from a dict
+        {role: DataFrame} (DatetimeIndex or 'Date' column).
+
+        Uses the weights of the last signal_panel row on or before each date
+        (defensive before the first row).
+        """
+        panel = signal_panel(assets)
+        rows = panel.index.searchsorted(pd.DatetimeIndex(dates), side="right") - 1
+        weights = self.panel_weights(panel).to_numpy() if len(panel.dates) else np.empty((0, len(ROLES)))
+        defensive = np.eye(len(ROLES))[DEFENSIVE]
+        return np.where((rows >= 0)[:, None], weights[np.maximum(rows, 0)], defensive)
+
+    def panel_weights(self, panel: PricePanel) -> pd.DataFrame:
+        """
+        Weights for a PricePanel with one column per role.
+        """
+        values = panel.values[:, [panel.column_index(role) for role in ROLES]]
+        return pd.DataFrame(self.weights(values), index=panel.index, columns=list(ROLES))
+
+    def __repr__(self):
+        params = ", ".join(f"{k}={v!r}" for k, v in self.params.items())
+        return f"{type(self).__name__}({params})"
+
+
+class DualMomentumSignal(Signal):
+    """
+    Dual momentum on a per-asset score: the better risky asset (equity_us on ties)
+    is held while its score is positive, the defensive asset otherwise.
+    A NaN score on either side selects defensive, exactly like gem_select.
+    """
+
+    @abstractmethod
+    def scores(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Per-asset scores for prices shaped (T, n, *batch), each column scored
+        from its own prices only (n is 2 for equity_us and equity_exus).
+        """
+
+    def aligned_weights(self, assets: dict, dates) -> np.ndarray:
+        """
+        Scores of each risky role are computed on the rows of its own history
+        and taken as of each date (last own row on or before it), so lookbacks
+        count rows of each asset like backtest_gem and GEM.evaluate, also when
+        an asset has missing months.
+        """
+        dates = pd.DatetimeIndex(dates).to_numpy(dtype="datetime64[ns]")
+        scores = []
+        for role in ROLES[:2]:
+            df = assets[role]
+            if df.empty:
+                scores.append(np.full(len(dates), np.nan))
+                continue
+            index = df["Date"] if "Date" in df.columns else df.index
+            positions = np.searchsorted(index.to_numpy(dtype="datetime64[ns]"), dates, side="right") - 1
+            prices = df[_get_price_column(df)].to_numpy(dtype=np.float64)
+            own = self.scores(prices[:, None])[:, 0]
+            scores.append(np.where(positions >= 0, own[np.maximum(positions, 0)], np.nan))
+
+        codes = gem_select(*scores)
+        return (codes[:, None] == np.arange(len(ROLES))).astype(np.float64)
+
+    def weights(self, prices: np.ndarray) -> np.ndarray:
+        prices = np.asarray(prices, dtype=np.float64)
+        scores = self.scores(prices[:, :2])
+        codes = gem_select(scores[:, 0], scores[:, 1])
+        roles = np.arange(len(ROLES)).reshape((1, -1) + (1,) * (codes.ndim - 1))
+        return (codes[:, None] == roles).astype(np.float64)
+
+
+@register_signal
+class GemSignal(DualMomentumSignal):
+    """
+    Classic GEM on a single lookback (identical to backtest_gem for that horizon).
+    """
+
+    name = "gem"
+
+    def __init__(self, months: int = 12):
+        if int(months) < 1:
+            raise ValueError(f"Lookback must be at least 1 month: {months}")
+        super().__init__(months=int(months))
+
+    @property
+    def warmup(self) -> int:
+        return self.params["months"]
+
+    def scores(self, prices):
+        return momentum(prices, self.params["months"])
+
+
+@register_signal
+class CompositeMomentumSignal(DualMomentumSignal):
+    """
+    Weighted average of momentum over several lookbacks (equal weights by default).
+    """
+
+    name = "composite"
+
+    def __init__(self, lookbacks=(3, 6, 12), weights=None):
+        lookbacks = tuple(int(m) for m in lookbacks)
+        if not lookbacks or min(lookbacks) < 1:
+            raise ValueError(f"Lookbacks must be at least 1 month: {lookbacks}")
+
+        weights = np.ones(len(lookbacks)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if weights.shape != (len(lookbacks),) or (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError(f"Weights must be non-negative, one per lookback, with a positive sum: {weights}")
+
+        super().__init__(lookbacks=lookbacks, weights=tuple(float(w) for w in weights / weights.sum()))
+
+    @property
+    def warmup(self) -> int:
+        return max(self.params["lookbacks"])
+
+    def scores(self, prices):
+        return sum(w * momentum(prices, m) for m, w in zip(self.params["lookbacks"], self.params["weights"]))
+
+
+@register_signal
+class AcceleratingMomentumSignal(CompositeMomentumSignal):
+    """
+    Accelerating dual momentum: sum of 1, 3 and 6 month returns
+    (an equal-weight composite, so the sign and the ranking are the same).
+    """
+
+    name = "accelerating"
+
+    def __init__(self, lookbacks=(1, 3, 6)):
+        super().__init__(lookbacks=lookbacks)
+
+
+@register_signal
+class VolAdjustedMomentumSignal(DualMomentumSignal):
+    """
+    Momentum divided by the volatility of monthly returns over `vol_window` rows.
+    """
+
+    name = "vol_adjusted"
+
+    def __init__(self, months: int = 12, vol_window: int = 12):
+        if int(months) < 1 or int(vol_window) < 2:
+            raise ValueError(f"Need months >= 1 and vol_window >= 2: {months}, {vol_window}")
+        super().__init__(months=int(months), vol_window=int(vol_window))
+
+    @property
+    def warmup(self) -> int:
+        return max(self.params["months"], self.params["vol_window"])
+
+    def scores(self, prices):
+        volatility = rolling_volatility(prices, self.params["vol_window"])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return momentum(prices, self.params["months"]) / volatility
+
+
+def _role_frames(assets) -> dict:
+    # Frames with a DatetimeIndex ('Date' column from data_service moved to the index)
+    return {role: df.set_index("Date") if "Date" in df.columns else df for role, df in assets.items()}
+
+
+def signal_panel(assets) -> PricePanel:
+    """
+    Role price panel used as signal input: the momentum price column of each
+    role (as get_momentum) on the equity_us dates, like the backtest calendar.
+
+    Other roles contribute their last price on or before each date (NaN before
+    their first row), so a later-listed asset does not truncate equity_us history.
+    """
+    if isinstance(assets, PricePanel):
+        return assets
+
+    frames = _role_frames(assets)
+    column = _get_price_column(frames["equity_us"])
+    index = frames["equity_us"].index
+
+    return PricePanel(
+        dates=index.to_numpy(dtype="datetime64[ns]"),
+        values=np.column_stack([
+            frames[role][column].reindex(index, method="ffill").to_numpy(dtype=np.float64) for role in ROLES
+        ]).reshape(len(index), len(ROLES)),
+        columns=ROLES,
+        column=column,
+        tickers={role: frames[role].attrs.get("ticker", role) for role in ROLES},
+    )
+
+
+def backtest_signal(assets, start_date: str, signal="gem", **params) -> dict:
+    """
+    Backtest of any signal plugin on a single (US, ex-US, defensive) set.
+
+    Weights of all months come from one `signal.aligned_weights` call; the
+    portfolio is rebalanced monthly to them. Dual momentum plugins score each
+    asset on its own rows, so GemSignal(months=m) reproduces backtest_gem for
+    the matching horizon, also across missing months.
+
+    Args:
+        assets: Dict {role: DataFrame} or PricePanel, as for backtest_gem.
+        start_date: First backtest month ("YYYY-MM-DD").
+        signal: Registered signal name or Signal instance.
+        **params: Signal parameters when `signal` is a name.
+
+    Returns:
+        dict:
+            {
+                "weights": DataFrame (dates × roles),
+                "selections": pd.Series of the highest-weight role,
+                "equity_curve": pd.Series,
+                "monthly_returns": pd.Series,
+                "statistics": dict of portfolio statistics,
+                "signal": repr of the signal
+            }
+    """
+    signal = get_signal(signal, **params)
+
+    if isinstance(assets, PricePanel):
+        assets = assets.to_frames()
+
+    if set(assets) != set(ROLES):
+        raise ValueError(f"Assets must contain exactly the roles: {set(ROLES)}")
+
+    dates = assets["equity_us"].loc[start_date:].index
+    weights = signal.aligned_weights(assets, dates)
+
+    portfolio = portfolio_returns(weights, role_returns(assets, dates))
+    stats = performance_statistics(portfolio)
+
+    return {
+        "weights": pd.DataFrame(weights, index=dates, columns=list(ROLES)),
+        "selections": pd.Series(np.array(ROLES)[weights.argmax(axis=1)], index=dates),
+        "equity_curve": pd.Series(np.cumprod(1 + portfolio), index=dates),
+        "monthly_returns": pd.Series(portfolio, index=dates),
+        "statistics": {name: float(stats[name]) for name in STATISTICS},
+        "signal": repr(signal),
+    }
@@ -0,0 +1,258 @@
+from itertools import permutations, repeat
+
+import numpy as np
+import pandas as pd
+
+from config import MOMENTUM_PERIODS
+from strategy.momentum import _get_price_column
+from strategy.signals import get_signal
+from strategy.vectorized import EQUITY_EXUS, EQUITY_US, gem_select, portfolio_returns
+from utils.metrics import STATISTICS, performance_statistics
+from utils.panel import PricePanel
+from utils.shared_panel import SharedPanelPool
+
+HORIZONS = tuple(period.upper() for period in MOMENTUM_PERIODS)
+
+# Triplets evaluated per batch (one worker task); bounds the (months × triplets) temporaries
+DEFAULT_CHUNK_SIZE = 4096
+
+TRIPLET_COLUMNS = ("US", "exUS", "Defensive")
+
+
+def candidate_triplets(tickers, equity_us=None, equity_exus=None, defensive=None) -> np.ndarray:
+    """
+    All (US, ex-US, defensive) combinations of distinct assets.
+
+    Args:
+        tickers: Universe, in panel column order.
+        equity_us, equity_exus, defensive: Optional candidate lists per role;
+            each defaults to the whole universe.
+
+    Returns:
+        np.ndarray int32 of shape (K, 3) with column positions in `tickers`.
+    """
+    tickers = list(tickers)
+    position = {ticker: i for i, ticker in enumerate(tickers)}
+    pools = [
+        [position[t] for t in (candidates if candidates is not None else tickers)]
+        for candidates in (equity_us, equity_exus, defensive)
+    ]
+
+    if equity_us is None and equity_exus is None and defensive is None:
+        triplets = list(permutations(range(len(tickers)), 3))
+    else:
+        triplets = [
+            (a, b, d)
+            for a in pools[0] for b in pools[1] if b != a
+            for d in pools[2] if d != a and d != b
+        ]
+
+    return np.array(triplets, dtype=np.int32).reshape(-1, 3)
+
+
+def asset_features(frames: dict, start_date: str) -> PricePanel:
+    """
+    Momentum and monthly returns of every asset, computed once.
+
+    Frames are aligned on their common dates (as PricePanel.from_frames).
+    Momentum uses the same price column as get_momentum; returns use 'Close',
+    exactly like backtest_gem, including the row before start_date.
+
+    Returns:
+        PricePanel over the backtest dates with column blocks
+        [returns | momentum per horizon], each block N assets wide.
+    """
+    close, prices, returns = _aligned_prices(frames)
+    tickers = list(close.columns)
+    n_dates = len(close.dates)
+
+    blocks = [returns]
+    for months in MOMENTUM_PERIODS.values():
+        momentum = np.full_like(prices.values, np.nan)
+        if n_dates > months:
+            momentum[months:] = prices.values[months:] / prices.values[:-months] - 1
+        blocks.append(momentum)
+
+    rows = close.index.searchsorted(pd.Timestamp(start_date))
+    columns = [f"{block}:{ticker}" for block in ("Return", *HORIZONS) for ticker in tickers]
+
+    return PricePanel(
+        dates=close.dates[rows:],
+        values=np.ascontiguousarray(np.hstack(blocks)[rows:]),
+        columns=columns,
+        column=prices.column,
+        tickers={f"{block}:{t}": close.tickers[t] for block in ("Return", *HORIZONS) for t in tickers},
+    )
+
+
+def _aligned_prices(frames: dict) -> tuple:
+    # Close (returns) and momentum price panels on common dates, plus monthly returns
+    first = next(iter(frames.values()))
+    if "Date" in first.columns:
+        first = first.set_index("Date")
+    momentum_column = _get_price_column(first)
+
+    close = PricePanel.from_frames(frames, column="Close")
+    prices = close if momentum_column == "Close" else PricePanel.from_frames(frames, column=momentum_column)
+
+    returns = np.zeros_like(close.values)
+    returns[1:] = close.values[1:] / close.values[:-1] - 1
+    return close, prices, returns
+
+
+def signal_features(frames: dict, start_date: str) -> tuple:
+    """
+    Inputs of a signal plugin sweep: monthly returns and momentum prices of every asset.
+
+    Unlike asset_features, the panel keeps the full history, because plugins
+    compute their own lookbacks from prices.
+
+    Returns:
+        (PricePanel with column blocks [returns | prices], first backtest row)
+    """
+    close, prices, returns = _aligned_prices(frames)
+    tickers = list(close.columns)
+    columns = [f"{block}:{ticker}" for block in ("Return", "Price") for ticker in tickers]
+
+    panel = PricePanel(
+        dates=close.dates,
+        values=np.ascontiguousarray(np.hstack([returns, prices.values])),
+        columns=columns,
+        column=prices.column,
+        tickers={f"{block}:{t}": close.tickers[t] for block in ("Return", "Price") for t in tickers},
+    )
+    return panel, int(close.index.searchsorted(pd.Timestamp(start_date)))
+
+
+def evaluate_triplets(features: PricePanel, triplets: np.ndarray) -> np.ndarray:
+    """
+    Batched GEM backtest of many triplets over a feature panel.
+
+    Returns:
+        np.ndarray of shape (K, len(HORIZONS), len(STATISTICS)).
+    """
+    n_assets = features.values.shape[1] // (len(HORIZONS) + 1)
+    blocks = features.values.reshape(len(features.dates), len(HORIZONS) + 1, n_assets)
+    returns = blocks[:, 0, :]
+
+    a, b, d = (triplets[:, i] for i in range(3))
+    result = np.empty((len(triplets), len(HORIZONS), len(STATISTICS)))
+
+    for h in range(len(HORIZONS)):
+        momentum = blocks[:, h + 1, :]
+        codes = gem_select(momentum[:, a], momentum[:, b])  # (months, K)
+        selected = np.where(codes == EQUITY_US, a, np.where(codes == EQUITY_EXUS, b, d))
+        portfolio = np.take_along_axis(returns, selected, axis=1)
+
+        stats = performance_statistics(portfolio, axis=0)
+        for s, name in enumerate(STATISTICS):
+            result[:, h, s] = stats[name]
+
+    return result
+
+
+def evaluate_signal_triplets(features: PricePanel, triplets: np.ndarray, signal, start_row: int) -> np.ndarray:
+    """
+    Batched backtest of a signal plugin over many triplets (see signal_features).
+
+    The plugin receives prices of shape (months, 3, K) and returns role weights
+    for every triplet in one call.
+
+    Returns:
+        np.ndarray of shape (K, 1, len(STATISTICS)).
+    """
+    n_assets = features.values.shape[1] // 2
+    blocks = features.values.reshape(len(features.dates), 2, n_assets)
+
+    weights = signal.weights(blocks[:, 1, :][:, triplets.T])  # (months, 3, K)
+    returns = blocks[:, 0, :][:, triplets.T]
+    portfolio = portfolio_returns(weights, returns)[start_row:]
+
+    stats = performance_statistics(portfolio, axis=0)
+    return np.stack([stats[name] for name in STATISTICS], axis=-1)[:, None, :]
+
+
+def screen_triplets(
+    frames: dict,
+    start_date: str,
+    equity_us=None,
+    equity_exus=None,
+    defensive=None,
+    by: str = "Sharpe",
+    horizon: str = None,
+    top: int = None,
+    workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    signal=None,
+) -> pd.DataFrame:
+    """
+    Ranks every GEM triplet in a universe.
+
+    Statistics match backtest_gem run separately on each (US, ex-US, defensive)
+    combination of the aligned frames. Triplets are evaluated in batches; with
+    workers > 1 the batches run in a process pool over the feature panel
+    published in shared memory.
+
+    Args:
+        frames: Dict {ticker: monthly DataFrame} (DatetimeIndex or 'Date' column).
+        start_date: First backtest month ("YYYY-MM-DD").
+        equity_us, equity_exus, defensive: Optional candidate lists per role.
+        by: Statistic used for ranking (descending, NaN last).
+        horizon: Keep only this horizon ("3M", "6M", "12M").
+        top: Keep only the best `top` rows.
+        workers: Number of worker processes; None or 1 evaluates in-process.
+        chunk_size: Triplets per batch.
+        signal: Optional signal plugin (registered name or strategy.signals.Signal)
+            used instead of the GEM horizons; Horizon then holds the signal name.
+
+    Returns:
+        pd.DataFrame with columns US, exUS, Defensive, Horizon and statistics.
+    """
+    if by not in STATISTICS:
+        raise ValueError(f"Unknown statistic: {by} (expected one of {STATISTICS})")
+
+    if signal is None:
+        horizons = HORIZONS
+        features = asset_features(frames, start_date)
+        evaluate, extra = evaluate_triplets, ()
+        n_blocks = len(HORIZONS) + 1
+    else:
+        signal = get_signal(signal)
+        horizons = (signal.name,)
+        features, start_row = signal_features(frames, start_date)
+        evaluate, extra = evaluate_signal_triplets, (repeat(signal), repeat(start_row))
+        n_blocks = 2
+
+    n_assets = len(features.columns) // n_blocks
+    keys = [c.split(":", 1)[1] for c in features.columns[:n_assets]]
+    tickers = [features.tickers[c] for c in features.columns[:n_assets]]
+
+    triplets = candidate_triplets(keys, equity_us, equity_exus, defensive)
+    chunks = [triplets[i:i + chunk_size] for i in range(0, len(triplets), chunk_size)]
+
+    if not workers or workers <= 1:
+        results = [evaluate(features, *args) for args in zip(chunks, *extra)]
+    else:
+        with SharedPanelPool(max_workers=workers) as pool:
+            descriptor = pool.publish(features)
+            results = list(pool.map(evaluate, descriptor, chunks, *extra))
+
+    values = np.concatenate(results) if results else np.empty((0, len(horizons), len(STATISTICS)))
+
+    names = np.asarray(tickers, dtype=object)
+    table = pd.DataFrame({
+        column: np.repeat(names[triplets[:, i]], len(horizons))
+        for i, column in enumerate(TRIPLET_COLUMNS)
+    })
+    table["Horizon"] = np.tile(horizons, len(triplets))
+    for s, name in enumerate(STATISTICS):
+        table[name] = values[:, :, s].reshape(-1)
+
+    if horizon is not None:
+        table = table[table["Horizon"] == horizon]
+
+    table = table.sort_values(by, ascending=False, na_position="last", kind="stable")
+    if top is not None:
+        table = table.head(top)
+
+    return table.reset_index(drop=True)
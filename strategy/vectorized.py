@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+from strategy.momentum import _get_price_column
+
+# Role order used for int8 role codes in all array-based code paths
+ROLES = ("equity_us", "equity_exus", "defensive")
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+EQUITY_US, EQUITY_EXUS, DEFENSIVE = range(len(ROLES))
+
+
+def momentum_asof(index: pd.DatetimeIndex, prices: np.ndarray, dates, months: int) -> np.ndarray:
+    """
+    Momentum of one asset as seen on each of the given dates.
+
+    Mirrors get_momentum(df.loc[:date], period): the last row on or before
+    the date is compared with the row `months` rows earlier.
+
+    Args:
+        index: Sorted DatetimeIndex of the asset's price history.
+        prices: Price array aligned with index.
+        dates: Evaluation dates.
+        months: Lookback in rows (monthly bars).
+
+    Returns:
+        np.ndarray of momentum values, NaN where history is too short.
+    """
+    positions = index.searchsorted(pd.DatetimeIndex(dates), side="right") - 1
+    prices = np.asarray(prices, dtype=np.float64)
+
+    valid = positions >= months
+    current = prices[np.where(valid, positions, 0)]
+    past = prices[np.where(valid, positions - months, 0)]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        momentum = current / past - 1
+
+    return np.where(valid, momentum, np.nan)
+
+
+def gem_select(momentum_a: np.ndarray, momentum_b: np.ndarray) -> np.ndarray:
+    """
+    Vectorized GEM selection, identical to GEM.evaluate / gem_decision.
+
+    Relative momentum picks asset A on ties (>=), absolute momentum requires
+    the winner to be positive; NaN momentum on either side selects defensive.
+
+    Returns:
+        np.ndarray int8 of role codes (EQUITY_US, EQUITY_EXUS, DEFENSIVE).
+    """
+    momentum_a = np.asarray(momentum_a, dtype=np.float64)
+    momentum_b = np.asarray(momentum_b, dtype=np.float64)
+
+    a_wins = momentum_a >= momentum_b
+    winner_momentum = np.where(a_wins, momentum_a, momentum_b)
+    risk_on = (winner_momentum > 0) & ~np.isnan(momentum_a) & ~np.isnan(momentum_b)
+
+    codes = np.where(a_wins, EQUITY_US, EQUITY_EXUS)
+    return np.where(risk_on, codes, DEFENSIVE).astype(np.int8)
+
+
+def role_momentum(assets: dict, dates, months: int) -> tuple:
+    """
+    Momentum of both risky roles on the given dates.
+
+    Returns:
+        (momentum equity_us, momentum equity_exus) as float arrays.
+    """
+    result = []
+    for role in ROLES[:2]:
+        df = assets[role]
+        column = _get_price_column(df)
+        result.append(momentum_asof(df.index, df[column].to_numpy(), dates, months))
+    return tuple(result)
+
+
+def momentum_matrix(index: pd.DatetimeIndex, prices: np.ndarray, dates, lookbacks) -> np.ndarray:
+    """
+    momentum_asof for several lookbacks at once (one date lookup shared by all).
+
+    Returns:
+        np.ndarray of shape (len(lookbacks), len(dates)), NaN where history is too short.
+    """
+    positions = index.searchsorted(pd.DatetimeIndex(dates), side="right") - 1
+    prices = np.asarray(prices, dtype=np.float64)
+    lookbacks = np.asarray(list(lookbacks), dtype=np.int64)[:, None]
+
+    valid = positions >= lookbacks
+    current = prices[np.where(positions >= 0, positions, 0)]
+    past = prices[np.where(valid, positions - lookbacks, 0)]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        momentum = current / past - 1
+
+    return np.where(valid, momentum, np.nan)
+
+
+def role_returns(assets: dict, dates) -> np.ndarray:
+    """
+    Return of each role over the month ending on each date, as in backtest_gem:
+    Close of the last row on or before the date over the row before it (0 without history).
+
+    Returns:
+        np.ndarray of shape (len(dates), len(ROLES)).
+    """
+    result = np.zeros((len(dates), len(ROLES)))
+    for code, role in enumerate(ROLES):
+        df = assets[role]
+        close = df["Close"].to_numpy(dtype=np.float64)
+        positions = df.index.searchsorted(pd.DatetimeIndex(dates), side="right") - 1
+        valid = positions >= 1
+        current = close[np.where(valid, positions, 0)]
+        previous = close[np.where(valid, positions - 1, 0)]
+        result[:, code] = np.where(valid, current / previous - 1, 0.0)
+    return result
+
+
+def portfolio_returns(weights: np.ndarray, returns: np.ndarray, axis: int = 1) -> np.ndarray:
+    """
+    Weighted sum of role returns along `axis`.
+
+    Roles with zero weight are skipped, so a NaN return of an asset that is not
+    held does not leak into the portfolio (as in backtest_gem, which only reads
+    the selected asset).
+    """
+    with np.errstate(invalid="ignore"):
+        return np.where(weights != 0, weights * returns, 0.0).sum(axis=axis)
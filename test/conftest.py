@@ -0,0 +1,64 @@
+# Profilowanie przebiegu testów: GEM_PROFILE=1 (wyniki w config.PROFILE_PATH)
+# albo GEM_PROFILE=<katalog>, np.  GEM_PROFILE=1 python -m pytest test/test_backtest_incremental.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import profiling
+
+_session = {}
+
+
+def pytest_sessionstart(session):
+    path = profiling.env_path()
+    if path is not None:
+        _session["path"] = path
+        _session["profiler"] = profiling.enable()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    profiler = _session.get("profiler")
+    if profiler is not None:
+        profiling.disable()
+        _session["files"] = profiler.write(_session["path"])
+
+
+def pytest_terminal_summary(terminalreporter):
+    profiler = _session.get("profiler")
+    if profiler is None:
+        return
+    terminalreporter.section("profil etapów (utils.profiling)")
+    terminalreporter.write_line(profiler.summary())
+    terminalreporter.write_line(f"Wyniki: {_session['files']['summary'].parent}")
+
+
+def _create_assets(periods=72, seed=0, drift=0.005, volatility=0.04, tickers=None,
+                   start="2014-01-31", columns=("Close",), index_name=None):
+    """
+    Deterministyczne miesięczne ceny dla trzech ról GEM (indeks = koniec miesiąca).
+
+    - tickers: nazwy w df.attrs["ticker"] (kolejno equity_us, equity_exus, defensive); None → bez attrs
+    - columns: kolumny z tą samą ceną (np. ("Close", "Adj Close"))
+    """
+    dates = pd.date_range(start=start, periods=periods, freq="ME", name=index_name)
+    rng = np.random.default_rng(seed)
+
+    assets = {}
+    for i, role in enumerate(["equity_us", "equity_exus", "defensive"]):
+        close = 100 * np.cumprod(1 + rng.normal(drift, volatility, periods))
+        df = pd.DataFrame({column: close for column in columns}, index=dates)
+        if tickers is not None:
+            df.attrs["ticker"] = tickers[i]
+        assets[role] = df
+
+    return assets
+
+
+@pytest.fixture
+def create_assets():
+    """
+    Fabryka danych testowych GEM: create_assets(periods=..., seed=..., ...).
+    Moduł z innymi domyślnymi parametrami nadpisuje fixture przez functools.partial.
+    """
+    return _create_assets
@@ -0,0 +1,109 @@
+from functools import partial
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.result_cache import ResultCache
+from strategy import backtest
+from strategy.backtest import backtest_gem, backtest_gem_incremental
+
+START_DATE = "2016-01-01"
+
+
+@pytest.fixture
+def create_assets(create_assets):
+    return partial(create_assets, seed=5, tickers=("EQUITY_US", "EQUITY_EXUS", "DEFENSIVE"))
+
+
+def truncate(assets, periods):
+    return {role: df.iloc[:periods] for role, df in assets.items()}
+
+
+def assert_same_result(result, expected):
+    for h in expected["equity_curves"]:
+        pd.testing.assert_series_equal(result["equity_curves"][h], expected["equity_curves"][h])
+        pd.testing.assert_series_equal(result["monthly_returns"][h], expected["monthly_returns"][h])
+    assert result["statistics"] == expected["statistics"]
+    assert result["decisions"] == expected["decisions"]
+    assert result["tickers"] == expected["tickers"]
+
+
+def count_decisions():
+    return patch.object(backtest, "gem_decision", side_effect=backtest.gem_decision)
+
+
+def test_incremental_matches_full_backtest(tmp_path, create_assets):
+    assets = create_assets()
+
+    result = backtest_gem_incremental(assets, START_DATE, store=ResultCache(tmp_path))
+
+    assert_same_result(result, backtest_gem(assets, START_DATE))
+
+
+def test_resume_processes_only_new_months(tmp_path, create_assets):
+    store = ResultCache(tmp_path)
+    assets = create_assets()
+
+    backtest_gem_incremental(truncate(assets, 70), START_DATE, store=store)
+
+    with count_decisions() as mock_decision:
+        result = backtest_gem_incremental(assets, START_DATE, store=store)
+
+    # 2 nowe miesiące + ostatni miesiąc poprzedniego uruchomienia (niepełna świeca)
+    assert mock_decision.call_count == 3
+    assert_same_result(result, backtest_gem(assets, START_DATE))
+
+
+def test_revised_last_bar_does_not_force_full_recompute(tmp_path, create_assets):
+    store = ResultCache(tmp_path)
+    assets = create_assets()
+
+    backtest_gem_incremental(assets, START_DATE, store=store)
+
+    # Bieżący miesiąc: ostatnia świeca zmienia cenę przy kolejnym uruchomieniu
+    revised = {role: df.copy() for role, df in assets.items()}
+    revised["equity_us"].iloc[-1, 0] *= 1.05
+
+    with count_decisions() as mock_decision:
+        result = backtest_gem_incremental(revised, START_DATE, store=store)
+
+    assert mock_decision.call_count == 1
+    assert_same_result(result, backtest_gem(revised, START_DATE))
+
+
+def test_revised_history_falls_back_to_full_recompute(tmp_path, create_assets):
+    store = ResultCache(tmp_path)
+    assets = create_assets()
+
+    backtest_gem_incremental(truncate(assets, 70), START_DATE, store=store)
+
+    revised = {role: df.copy() for role, df in assets.items()}
+    revised["defensive"].iloc[40, 0] *= 0.9
+
+    with count_decisions() as mock_decision:
+        result = backtest_gem_incremental(revised, START_DATE, store=store)
+
+    assert mock_decision.call_count == len(revised["equity_us"].loc[START_DATE:])
+    assert_same_result(result, backtest_gem(revised, START_DATE))
+
+
+def test_default_state_store_is_not_evicted(tmp_path, monkeypatch, create_assets):
+    monkeypatch.setattr(backtest, "BACKTEST_STATE_PATH", tmp_path / "state")
+    assets = create_assets()
+    backtest_gem_incremental(truncate(assets, 70), START_DATE)
+
+    # Duże wpisy w dedykowanym magazynie nie wypierają stanu (brak limitu LRU)
+    store = ResultCache(tmp_path / "state", max_bytes=float("inf"))
+    store.put("x" * 64, np.zeros(2 ** 16))
+    assert len(store.entries()) == 2
+
+    saved = [store.get(path.stem) for _, _, path in store.entries()]
+    state = next(entry for entry in saved if isinstance(entry, dict))["state"]
+    assert "momentum" not in state
+
+    with count_decisions() as mock_decision:
+        backtest_gem_incremental(assets, START_DATE)
+    # Ostatni zapisany miesiąc (niepełna świeca) + 2 nowe
+    assert mock_decision.call_count == 3
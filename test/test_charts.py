@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from visualisation.charts import (
+    downsample,
+    drawdown_chart,
+    equity_curves_chart,
+    lttb_indices,
+    minmax_indices,
+    target_points,
+)
+
+
+def create_equity_curves(n_strategies=20, n_days=8000):
+    """
+    Dzienne krzywe kapitału dla wielu strategii (ok. 30 lat sesji).
+    """
+    dates = pd.bdate_range("1995-01-02", periods=n_days)
+    rng = np.random.default_rng(5)
+
+    return {
+        f"strategy_{i}": pd.Series(np.cumprod(1 + rng.normal(0.0003, 0.01, n_days)), index=dates)
+        for i in range(n_strategies)
+    }
+
+
+def test_lttb_keeps_endpoints_and_size():
+    x = np.arange(10_000)
+    y = np.sin(x / 100.0)
+
+    indices = lttb_indices(x, y, 500)
+
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_minmax_keeps_extremes():
+    y = np.random.default_rng(1).normal(size=10_000)
+
+    indices = minmax_indices(y, 200)
+
+    assert len(indices) <= 202
+    assert np.argmax(y) in indices
+    assert np.argmin(y) in indices
+
+
+def test_downsample_short_series_is_unchanged():
+    s = pd.Series([1.0, 2.0, np.nan, 3.0])
+
+    result = downsample(s, 100)
+
+    assert result.tolist() == [1.0, 2.0, 3.0]
+
+
+def test_drawdown_chart_preserves_max_drawdown():
+    curve = create_equity_curves(1)["strategy_0"]
+    expected = (curve / curve.cummax() - 1).min()
+
+    traces = drawdown_chart({"GEM": curve}).traces(width=300)
+
+    assert len(traces["GEM"]) <= target_points(300) + 2
+    assert traces["GEM"].min() == pytest.approx(expected)
+
+
+def test_large_comparison_uses_webgl():
+    go = pytest.importorskip("plotly.graph_objects")
+
+    fig = equity_curves_chart(create_equity_curves()).build(width=1200)
+
+    assert len(fig.data) == 20
+    assert all(isinstance(trace, go.Scattergl) for trace in fig.data)
+    assert all(len(trace.x) <= target_points(1200) for trace in fig.data)
+
+
+def test_small_chart_uses_svg_scatter():
+    go = pytest.importorskip("plotly.graph_objects")
+
+    curves = create_equity_curves(n_strategies=2, n_days=120)
+    fig = equity_curves_chart(curves).build()
+
+    assert all(isinstance(trace, go.Scatter) for trace in fig.data)
@@ -0,0 +1,111 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from config import CAPITAL_GAINS_TAX_RATE
+from strategy.backtest import backtest_gem
+from strategy.costs import CostModel, apply_costs, switch_events
+
+START_DATE = "2016-01-01"
+
+
+def reference_net_returns(codes, returns, model):
+    """
+    Symulacja miesiąc po miesiącu: partia = kwota zakupu, sprzedaż przy zmianie wyboru.
+    """
+    value = model.initial_capital
+    basis = None
+    net = []
+
+    for t, (code, r) in enumerate(zip(codes, returns)):
+        start_value = value
+        if t == 0 or code != codes[t - 1]:
+            if t > 0:
+                proceeds = value * (1 - model.rate)
+                tax = model.tax_rate * max(proceeds - basis, 0)
+                value = proceeds - tax - model.fixed
+            basis = value
+            value = value * (1 - model.rate) - model.fixed
+        value *= 1 + r
+        net.append(value / start_value - 1)
+
+    return np.array(net)
+
+
+def random_history(seed=0, months=120, n_codes=3):
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, n_codes, months).astype(np.int8)
+    codes = np.repeat(codes[::4], 4)[:months]  # pozycje trzymane po kilka miesięcy
+    returns = rng.normal(0.01, 0.05, months)
+    return codes, returns
+
+
+@pytest.fixture
+def create_assets(create_assets):
+    return partial(create_assets, seed=4, volatility=0.05)
+
+
+def test_switch_events_from_selection_codes():
+    codes = np.array([[0, 0, 1, 1, 2, 0], [2, 2, 2, 2, 2, 2]])
+
+    events = switch_events(codes)
+
+    assert events.tolist() == [
+        [True, False, True, False, True, True],
+        [True, False, False, False, False, False],
+    ]
+
+
+def test_zero_cost_model_keeps_gross_returns():
+    codes, returns = random_history()
+
+    np.testing.assert_allclose(apply_costs(codes, returns, CostModel(tax_rate=0)), returns)
+
+
+@pytest.mark.parametrize("model", [
+    CostModel(bps=10, spread_bps=8, tax_rate=0),
+    CostModel(tax_rate=0.19),
+    CostModel(bps=5, spread_bps=4, tax_rate=0.19),
+    CostModel(fixed=5, bps=5, tax_rate=0, initial_capital=20_000),
+    CostModel(fixed=5, bps=5, tax_rate=0.19, initial_capital=20_000),
+])
+def test_vectorized_costs_match_loop_simulation(model):
+    codes, returns = random_history(seed=1)
+
+    expected = reference_net_returns(codes, returns, model)
+
+    np.testing.assert_allclose(apply_costs(codes, returns, model), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_default_tax_rate_comes_from_config():
+    assert CostModel().tax_rate == CAPITAL_GAINS_TAX_RATE
+    assert CostModel(tax_rate=0).tax_rate == 0.0
+
+
+@pytest.mark.parametrize("model", [
+    CostModel(bps=10, tax_rate=0.19),
+    CostModel(fixed=5, bps=10, tax_rate=0.19),
+])
+def test_batched_rows_match_single_rows(model):
+    histories = [random_history(seed) for seed in range(4)]
+    codes = np.stack([c for c, _ in histories])
+    returns = np.stack([r for _, r in histories])
+
+    batched = apply_costs(codes, returns, model)
+
+    for i, (c, r) in enumerate(histories):
+        np.testing.assert_allclose(batched[i], apply_costs(c, r, model))
+
+
+def test_backtest_reports_net_next_to_gross(create_assets):
+    assets = create_assets()
+    gross_only = backtest_gem(assets, START_DATE)
+
+    result = backtest_gem(assets, START_DATE, costs=CostModel(bps=10, spread_bps=10, tax_rate=0.19))
+
+    assert result["statistics"] == gross_only["statistics"]
+    for h in ("3M", "6M", "12M"):
+        assert result["switches"][h] >= 0
+        assert result["net_statistics"][h]["CAGR"] <= result["statistics"][h]["CAGR"]
+        assert result["net_equity_curves"][h].index.equals(result["equity_curves"][h].index)
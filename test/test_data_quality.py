@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from services.data_quality import check_prices, clean_prices, has_findings, ingest, load_report
+from services.storage import PRICE_COLUMNS
+from services.yahoo_client import fetch_yahoo_data
+from utils.clock import FixedClock, use_clock
+
+
+def create_daily_dataframe(start="2023-01-02", end="2023-06-30"):
+    dates = pd.bdate_range(start, end, name="Date")
+    close = np.linspace(100, 120, len(dates))
+    return pd.DataFrame({column: close for column in PRICE_COLUMNS}, index=dates)
+
+
+def corrupt(df):
+    """
+    Wprowadza typowe błędy danych: duplikat daty, cenę zerową, jednodniową
+    szpilkę Adj Close, lukę w notowaniach i nieskorygowany split (bez powrotu).
+    """
+    df = df.copy()
+    df.loc["2023-02-01", "Close"] = 0.0
+    df.loc["2023-03-01", "Adj Close"] *= 3
+    df.loc["2023-05-15":, ["Adj Close", "Close", "Price"]] /= 4
+    df = df.drop(df.loc["2023-04-03":"2023-04-14"].index)
+    duplicate = df.loc[["2023-01-10"]] * 1.01
+    return pd.concat([df, duplicate])
+
+
+def test_check_detects_all_issue_types():
+    report = check_prices(corrupt(create_daily_dataframe()))
+
+    assert report["duplicates"] == ["2023-01-10"]
+    assert report["non_positive"] == ["2023-02-01"]
+    assert report["spikes"] == ["2023-03-01"]
+    assert report["gaps"] == ["2023-04-17"]
+    assert report["jumps"] == ["2023-05-15"]
+
+
+def test_clean_drops_bad_rows_and_sorts():
+    df = corrupt(create_daily_dataframe())
+
+    cleaned, report = clean_prices(df)
+
+    assert cleaned.index.is_monotonic_increasing and cleaned.index.is_unique
+    assert pd.Timestamp("2023-02-01") not in cleaned.index
+    assert pd.Timestamp("2023-03-01") not in cleaned.index
+    assert report["dropped"] == 3
+    # Ostatnie notowanie z powtórzonej daty zostaje
+    assert cleaned.loc["2023-01-10", "Open"] == df["Open"].iloc[-1]
+    # Skok bez powrotu jest tylko raportowany
+    assert pd.Timestamp("2023-05-15") in cleaned.index
+
+
+def test_clean_data_has_no_findings():
+    cleaned, report = clean_prices(create_daily_dataframe())
+
+    assert not has_findings(report)
+    assert report["dropped"] == 0
+    assert len(cleaned) == len(create_daily_dataframe())
+
+
+def test_fetch_cleans_before_writing_cache(tmp_path):
+    raw = tmp_path / "raw"
+    reports = tmp_path / "quality"
+    history = corrupt(create_daily_dataframe())
+
+    def fake_download(ticker, start=None, end=None, **kwargs):
+        df = history[(history.index >= pd.Timestamp(start)) & (history.index <= pd.Timestamp(end))]
+        return df.drop(columns="Price")
+
+    with patch("services.yahoo_client.DATA_RAW_PATH", raw), \
+            patch("services.data_quality.QUALITY_REPORT_PATH", reports), \
+            use_clock(FixedClock("2023-12-31")), \
+            patch("services.yahoo_client.yf.download", side_effect=fake_download):
+        df = fetch_yahoo_data("SPY", "2023-01-01")
+
+    cached = pd.read_csv(raw / "SPY_2023.csv", parse_dates=["Date"], index_col="Date")
+    assert cached.index.is_monotonic_increasing and cached.index.is_unique
+    assert (cached[["Close", "Adj Close"]] > 0).all().all()
+    assert len(df) == len(cached)
+
+    entries = load_report("SPY", reports)
+    assert len(entries) == 1
+    assert entries[0]["spikes"] == ["2023-03-01"]
+
+
+def test_recheck_does_not_duplicate_findings(tmp_path):
+    history = corrupt(create_daily_dataframe())
+    first = history[history.index <= "2023-05-31"]
+
+    ingest("SPY", first, tmp_path)
+    cleaned = ingest("SPY", first, tmp_path)
+    # Ponowna kontrola całego roku po dopisaniu notowań: luka i skok już zgłoszone
+    ingest("SPY", pd.concat([cleaned, history[history.index > "2023-05-31"]]), tmp_path)
+
+    entries = load_report("SPY", tmp_path)
+    assert len(entries) == 1
+    findings = [(check, date) for check in ("duplicates", "non_positive", "gaps", "spikes", "jumps")
+                for date in entries[0][check]]
+    assert sorted(findings) == sorted([
+        ("duplicates", "2023-01-10"), ("non_positive", "2023-02-01"), ("spikes", "2023-03-01"),
+        ("gaps", "2023-04-17"), ("jumps", "2023-05-15"),
+    ])
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from services import data_service
+from services.data_service import gather_universe, get_data_async, get_monthly_data_async
+
+
+def create_frame(ticker):
+    dates = pd.date_range("2024-01-31", periods=12, freq="M")
+    return pd.DataFrame({"Date": dates, "Adj Close": np.arange(12.0) + len(ticker)})
+
+
+class FakeGetData:
+    """
+    Zastępuje blokujące get_data: opóźnienie per ticker, licznik wywołań
+    i maksymalna liczba równoległych wywołań.
+    """
+
+    def __init__(self, delays=None, default_delay=0.05, errors=None):
+        self.delays = delays or {}
+        self.default_delay = default_delay
+        self.errors = errors or {}
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker, source="yahoo", start_date=None, interval=None, anchor=None):
+        with self._lock:
+            self.calls.append((ticker, interval))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delays.get(ticker, self.default_delay))
+            if ticker in self.errors:
+                raise self.errors[ticker]
+            return create_frame(ticker)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class TestAsyncDataService(unittest.TestCase):
+    def run_with(self, fake, coro_factory):
+        async def runner():
+            return await coro_factory()
+
+        with patch.object(data_service, "get_data", side_effect=fake):
+            return asyncio.run(runner())
+
+    def test_gather_universe_respects_concurrency_limit(self):
+        """
+        Scenariusz: 12 tickerów, limit 3 równoległych ładowań.
+        Oczekiwane: wszystkie pobrane, nigdy więcej niż 3 naraz.
+        """
+        fake = FakeGetData()
+        tickers = [f"T{i}" for i in range(12)]
+
+        result = self.run_with(fake, lambda: gather_universe(tickers, concurrency=3))
+
+        self.assertEqual(list(result), tickers)
+        self.assertEqual(fake.max_active, 3)
+
+    def test_same_ticker_is_loaded_once_and_cached(self):
+        """
+        Scenariusz: równoległe i późniejsze żądania o ten sam ticker.
+        Oczekiwane: jedno ładowanie, każdy dostaje własną kopię.
+        """
+        fake = FakeGetData()
+
+        async def scenario():
+            first, second = await asyncio.gather(get_data_async("SPY"), get_data_async("SPY"))
+            third = await get_data_async("SPY")
+            return first, second, third
+
+        first, second, third = self.run_with(fake, scenario)
+
+        self.assertEqual(len(fake.calls), 1)
+        self.assertIsNot(first, second)
+        pd.testing.assert_frame_equal(first, third)
+
+    def test_slow_ticker_times_out_without_blocking_others(self):
+        """
+        Scenariusz: jeden ticker odpowiada bardzo wolno.
+        Oczekiwane: timeout tylko dla niego, reszta zwrócona szybko.
+        """
+        fake = FakeGetData(delays={"SLOW": 2.0})
+
+        start = time.perf_counter()
+        result = self.run_with(
+            fake,
+            lambda: gather_universe(["SPY", "SLOW", "VEU"], timeout=0.3, return_exceptions=True),
+        )
+        elapsed = time.perf_counter() - start
+
+        self.assertIsInstance(result["SLOW"], asyncio.TimeoutError)
+        self.assertIsInstance(result["SPY"], pd.DataFrame)
+        self.assertIsInstance(result["VEU"], pd.DataFrame)
+        self.assertLess(elapsed, 2.0 + 0.5)
+
+    def test_cancelled_caller_does_not_cancel_shared_load(self):
+        """
+        Scenariusz: jeden z dwóch oczekujących zostaje anulowany.
+        Oczekiwane: drugi dostaje wynik, ładowanie wykonane raz.
+        """
+        fake = FakeGetData(default_delay=0.2)
+
+        async def scenario():
+            first = asyncio.create_task(get_data_async("SPY"))
+            second = asyncio.create_task(get_data_async("SPY"))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await first
+            return await second
+
+        result = self.run_with(fake, scenario)
+
+        self.assertIsInstance(result, pd.DataFrame)
+        self.assertEqual(len(fake.calls), 1)
+
+    def test_errors_are_not_cached(self):
+        """
+        Scenariusz: pierwsze ładowanie kończy się błędem.
+        Oczekiwane: błąd zgłoszony, kolejne wywołanie ponawia ładowanie.
+        """
+        fake = FakeGetData(errors={"BAD": ValueError("Brak danych")})
+
+        async def scenario():
+            with self.assertRaises(ValueError):
+                await get_data_async("BAD")
+            fake.errors.clear()
+            return await get_data_async("BAD")
+
+        result = self.run_with(fake, scenario)
+
+        self.assertIsInstance(result, pd.DataFrame)
+        self.assertEqual(len(fake.calls), 2)
+
+    def test_monthly_async_uses_monthly_interval(self):
+        fake = FakeGetData(default_delay=0)
+
+        self.run_with(fake, lambda: get_monthly_data_async("SPY"))
+
+        self.assertEqual(fake.calls, [("SPY", "monthly")])
+
+
+if __name__ == '__main__':
+    unittest.main()
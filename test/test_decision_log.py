@@ -0,0 +1,69 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy.backtest import backtest_gem
+from strategy.decision_log import DECISION_COLUMNS, DecisionLog
+from strategy.gem import gem_decision
+from visualisation.tables import DecisionTable
+
+START_DATE = "2016-01-01"
+
+
+@pytest.fixture
+def create_assets(create_assets):
+    return partial(create_assets, seed=21, drift=0.004, volatility=0.05, tickers=("SPY", "VEU", "BND"))
+
+
+def test_backtest_records_every_month(create_assets):
+    assets = create_assets()
+    result = backtest_gem(assets, START_DATE)
+    log = result["decision_log"]
+
+    assert log.codes.dtype == np.int8 and log.momentum.dtype == np.float32
+    assert len(log) == len(assets["equity_us"].loc[START_DATE:]) * 3
+    assert log.last() == result["decisions"]
+
+    # Dowolny miesiąc w środku historii: decyzja i momentum jak w gem_decision
+    date = log.index[17]
+    expected = gem_decision({role: df.loc[:date] for role, df in assets.items()})
+    decoded = log.decode().set_index(["Date", "Horizon"])
+    for h, role in expected["decisions"].items():
+        row = decoded.loc[(date, h)]
+        assert row["Role"] == role
+        assert row["Ticker"] == assets[role].attrs["ticker"]
+        assert row["Signal"] == ("risk_off" if role == "defensive" else "risk_on")
+        assert row["Momentum US"] == pytest.approx(expected["momentum"][h]["equity_us"], rel=1e-6)
+
+
+def test_vectorized_log_matches_backtest(create_assets):
+    assets = create_assets()
+    recorded = backtest_gem(assets, START_DATE)["decision_log"]
+
+    computed = DecisionLog.from_assets(assets, START_DATE)
+
+    np.testing.assert_array_equal(computed.codes, recorded.codes)
+    np.testing.assert_array_equal(computed.risk_on, recorded.risk_on)
+    np.testing.assert_allclose(computed.momentum, recorded.momentum, equal_nan=True)
+    assert list(computed.decode(horizon="6M").columns) == list(DECISION_COLUMNS)
+
+
+def test_log_is_compact(create_assets):
+    log = backtest_gem(create_assets(), START_DATE)["decision_log"]
+
+    # kod (1) + 2 × momentum (4) + flaga (1) bajtów na decyzję, plus daty
+    assert log.nbytes == len(log) * 10 + len(log.dates) * 8
+
+
+def test_decision_table_from_log_matches_assets(create_assets):
+    assets = create_assets()
+    log = backtest_gem(assets, START_DATE)["decision_log"]
+
+    from_log = DecisionTable(log, page_size=9)
+    from_assets = DecisionTable(assets, START_DATE, page_size=9)
+
+    pd.testing.assert_frame_equal(from_log.page(3), from_assets.page(3))
+    page = from_log.page(0, sort_by="Momentum exUS", horizon="12M", formatted=False)
+    assert page["Momentum exUS"].is_monotonic_increasing
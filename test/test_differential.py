@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.differential import (
+    SCENARIOS,
+    compare_backtest,
+    run,
+    synthetic_universe,
+    vectorized_engine,
+)
+from strategy.decision_log import DecisionLog
+
+
+def test_fast_engines_match_reference_on_all_scenarios():
+    report = run(seeds=range(2), months=40)
+
+    assert report["cases"] == 2 * len(SCENARIOS)
+    mismatches = report["mismatches"]
+    breaches = report["breaches"]
+
+    # Wszystkie silniki (backtest i sygnał bieżący) zgodne z referencją w każdym scenariuszu
+    assert mismatches.empty, mismatches.to_string()
+    assert breaches.empty, breaches.to_string()
+
+    timing = report["timing"]
+    assert set(timing["Check"]) == {"backtest", "live"}
+    assert (timing["Speedup"] > 0).all()
+
+
+def test_scenarios_contain_edge_cases():
+    ties, _ = synthetic_universe(0, "ties")
+    pd.testing.assert_frame_equal(ties["equity_us"], ties["equity_exus"])
+
+    nan, _ = synthetic_universe(0, "nan")
+    assert any(df["Adj Close"].isna().any() for df in nan.values())
+
+    short, _ = synthetic_universe(0, "short")
+    assert len(short["equity_us"]) < 15
+
+    staggered, _ = synthetic_universe(0, "staggered")
+    assert staggered["defensive"].index[0] > staggered["equity_us"].index[0]
+
+
+def test_reports_per_date_mismatch_of_broken_engine():
+    def ties_to_exus(assets, start_date):
+        # Błędne rozstrzyganie remisów (> zamiast >=)
+        result = vectorized_engine(assets, start_date)
+        log = DecisionLog.from_assets(assets, start_date)
+        tie = (log.momentum[:, 0] == log.momentum[:, 1]) & (log.codes == 0)
+        result["codes"] = np.where(tie, 1, result["codes"]).astype(np.int8)
+        return result
+
+    assets, start_date = synthetic_universe(1, "ties")
+    report = compare_backtest(assets, start_date, engines={"broken": ties_to_exus})
+
+    assert report["mismatches"]
+    assert {row["Reference"] for row in report["mismatches"]} == {"equity_us"}
+    assert {row["Fast"] for row in report["mismatches"]} == {"equity_exus"}
+    assert report["timing"]["reference"] > 0
@@ -0,0 +1,77 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from strategy.backtest import backtest_gem
+from strategy.ensemble import backtest_ensemble, normalize_weights
+from utils.metrics import STATISTICS
+
+START_DATE = "2016-01-01"
+
+
+@pytest.fixture
+def create_assets(create_assets):
+    return partial(create_assets, seed=8, volatility=0.045)
+
+
+def test_single_lookback_matches_backtest_gem(create_assets):
+    assets = create_assets()
+    reference = backtest_gem(assets, START_DATE)
+
+    for horizon in ("3M", "6M", "12M"):
+        result = backtest_ensemble(assets, START_DATE, weights={horizon: 1})
+
+        np.testing.assert_allclose(
+            result["monthly_returns"].to_numpy(), reference["monthly_returns"][horizon].to_numpy()
+        )
+        for name in STATISTICS:
+            assert result["statistics"][name] == pytest.approx(reference["statistics"][horizon][name])
+            assert result["components"][horizon][name] == pytest.approx(reference["statistics"][horizon][name])
+
+
+def test_equal_weight_blend_is_average_of_components(create_assets):
+    assets = create_assets()
+    reference = backtest_gem(assets, START_DATE)
+
+    result = backtest_ensemble(assets, START_DATE)
+
+    expected = sum(reference["monthly_returns"][h] for h in ("3M", "6M", "12M")) / 3
+    np.testing.assert_allclose(result["monthly_returns"].to_numpy(), expected.to_numpy())
+    np.testing.assert_allclose(result["weights"].sum(axis=1), 1.0)
+    assert set(np.unique(result["weights"].to_numpy().round(6))) <= {0.0, 0.333333, 0.666667, 1.0}
+
+
+def test_extra_lookbacks_and_custom_weights(create_assets):
+    assets = create_assets()
+
+    result = backtest_ensemble(assets, START_DATE, weights={"12M": 2, "9M": 1, "1M": 1},
+                               extra_lookbacks={"9M": 9, "1M": 1})
+
+    assert list(result["selections"].columns) == ["3M", "6M", "12M", "9M", "1M"]
+    assert result["lookbacks"]["12M"] == (12, 0.5)
+    assert result["lookbacks"]["3M"] == (3, 0.0)
+    assert result["selections"].isin(["equity_us", "equity_exus", "defensive"]).all().all()
+
+
+def test_invalid_weights_raise():
+    lookbacks = {"3M": 3, "6M": 6}
+
+    with pytest.raises(ValueError):
+        normalize_weights(lookbacks, {"24M": 1})
+    with pytest.raises(ValueError):
+        normalize_weights(lookbacks, {"3M": 0})
+
+
+def test_missing_price_of_asset_not_held_does_not_leak(create_assets):
+    assets = create_assets()
+    # Stały wzrost equity_us: dodatnie momentum na każdym horyzoncie, defensive nigdy nie jest trzymany
+    assets["equity_us"]["Close"] = 100 * 1.02 ** np.arange(len(assets["equity_us"]))
+    assets["defensive"].iloc[40, 0] = np.nan
+    reference = backtest_gem(assets, START_DATE)
+
+    result = backtest_ensemble(assets, START_DATE)
+
+    assert np.isfinite(result["monthly_returns"]).all()
+    expected = sum(reference["monthly_returns"][h] for h in ("3M", "6M", "12M")) / 3
+    np.testing.assert_allclose(result["monthly_returns"].to_numpy(), expected.to_numpy())
@@ -0,0 +1,79 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from services.export import TABLES, export_backtest, export_backtests, read_table, table_schemas
+from strategy.backtest import MOMENTUM_HORIZONS, backtest_gem
+from strategy.costs import CostModel
+from utils.metrics import STATISTICS
+
+pa = pytest.importorskip("pyarrow")
+
+START_DATE = "2016-01-01"
+
+
+@pytest.fixture
+def create_assets(create_assets):
+    return partial(create_assets, periods=60, tickers=("SPY", "VEU", "BND"))
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_roundtrip_matches_backtest(tmp_path, fmt, create_assets):
+    result = backtest_gem(create_assets(seed=1), START_DATE, costs=CostModel(bps=10))
+
+    paths = export_backtest(result, tmp_path, fmt=fmt, run="base")
+    assert set(paths) == set(TABLES)
+
+    schemas = table_schemas()
+    for table in TABLES:
+        assert read_table(tmp_path, table, fmt=fmt).schema.equals(schemas[table], check_metadata=False)
+
+    returns = read_table(tmp_path, "monthly_returns", fmt=fmt).to_pandas()
+    for h in MOMENTUM_HORIZONS:
+        exported = returns[returns["Horizon"] == h]
+        np.testing.assert_allclose(exported["Return"].to_numpy(), result["monthly_returns"][h].to_numpy())
+        np.testing.assert_array_equal(exported["Date"].to_numpy(), result["monthly_returns"][h].index.to_numpy())
+
+    decisions = read_table(tmp_path, "decisions", fmt=fmt).to_pandas()
+    last = decisions.groupby("Horizon", observed=True)["Ticker"].last()
+    assert {h: last[h] for h in MOMENTUM_HORIZONS} == result["decisions"]
+    decisions["Horizon"] = decisions["Horizon"].astype(str)
+    log = result["decision_log"].decode().merge(decisions, on=["Date", "Horizon"], suffixes=("", "_exported"))
+    assert len(log) == len(decisions)
+    np.testing.assert_array_equal(log["Ticker_exported"].astype(str), log["Ticker"])
+    np.testing.assert_array_equal(log["Risk On"], log["Signal"] == "risk_on")
+    np.testing.assert_allclose(log["Momentum US_exported"], log["Momentum US"], equal_nan=True)
+
+    stats = read_table(tmp_path, "statistics", fmt=fmt).to_pandas()
+    assert len(stats) == 2 * len(MOMENTUM_HORIZONS)
+    gross = stats[~stats["Net"]].set_index("Horizon")
+    for h in MOMENTUM_HORIZONS:
+        for name in STATISTICS:
+            assert gross.loc[h, name] == pytest.approx(result["statistics"][h][name], nan_ok=True)
+
+
+def test_sweep_export_reads_selected_columns_zero_copy(tmp_path, create_assets):
+    results = {
+        f"run{i}": backtest_gem(create_assets(seed=i, tickers=(f"A{i}", f"B{i}", "BND")), START_DATE)
+        for i in range(3)
+    }
+    export_backtests(results, tmp_path)
+
+    table = read_table(tmp_path, "equity_curves", columns=["Run", "Equity"])
+    assert table.column_names == ["Run", "Equity"]
+    assert table.num_rows == 3 * len(MOMENTUM_HORIZONS) * len(results["run0"]["equity_curves"]["3M"])
+
+    # Bufory kolumny wskazują na zmapowany plik – pamięć procesu nie rośnie o dane
+    before = pa.total_allocated_bytes()
+    equity = table.column("Equity").chunk(0).to_numpy(zero_copy_only=True)
+    assert pa.total_allocated_bytes() == before
+    assert equity[-1] == pytest.approx(results["run2"]["equity_curves"]["12M"].iloc[-1])
+
+    runs = read_table(tmp_path, "decisions", columns=["Run", "Ticker"]).to_pandas()
+    assert set(runs.loc[runs["Run"] == "run1", "Ticker"]) <= {"A1", "B1", "BND"}
+
+
+def test_unknown_format_raises(tmp_path, create_assets):
+    with pytest.raises(ValueError):
+        export_backtest(backtest_gem(create_assets(seed=1), START_DATE), tmp_path, fmt="csv")
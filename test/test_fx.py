@@ -0,0 +1,141 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.data_service import get_data
+from services.fx import align_rates, convert_assets, convert_frame, convert_panel, fx_ticker
+from strategy.gem import GEM
+from utils.panel import PricePanel
+
+PRICE_COLUMNS = ["Price", "Open", "Close", "Adj Close", "Low", "High", "Volume"]
+
+
+def create_daily_dataframe(start="2023-01-02", end="2023-12-29", freq="B", base=100.0):
+    dates = pd.date_range(start, end, freq=freq, name="Date")
+    close = np.linspace(base, base * 1.2, len(dates))
+    return pd.DataFrame({column: close for column in PRICE_COLUMNS}, index=dates)
+
+
+def usdpln_rates():
+    # Kurs notowany także w weekendy – wyrównanie bierze ostatni kurs z dnia notowania akcji
+    dates = pd.date_range("2022-12-01", "2023-12-31", freq="D")
+    return pd.Series(np.linspace(4.0, 4.4, len(dates)), index=dates, name="FX")
+
+
+def fake_loader(calls):
+    def loader(ticker, start_date=None, interval=None, columns=None, **kwargs):
+        calls.append(ticker)
+        rates = usdpln_rates()
+        return pd.DataFrame({"Date": rates.index, "Close": rates.to_numpy()})
+    return loader
+
+
+def test_align_rates_uses_last_rate_on_or_before_date():
+    rates = pd.Series([4.0, 4.1, 4.2], index=pd.to_datetime(["2023-01-02", "2023-01-04", "2023-01-06"]))
+
+    aligned = align_rates(rates, pd.to_datetime(["2023-01-01", "2023-01-03", "2023-01-06", "2023-01-09"]))
+
+    np.testing.assert_allclose(aligned, [np.nan, 4.0, 4.2, 4.2])
+
+
+def test_convert_frame_multiplies_prices_only():
+    df = create_daily_dataframe()
+    rates = usdpln_rates()
+
+    converted = convert_frame(df, rates)
+
+    expected = df["Close"].to_numpy() * rates.reindex(df.index).to_numpy()
+    np.testing.assert_allclose(converted["Adj Close"].to_numpy(), expected)
+    np.testing.assert_allclose(converted["Volume"].to_numpy(), df["Volume"].to_numpy())
+
+
+def test_convert_panel_single_rate_and_per_column():
+    frames = {"SPY": create_daily_dataframe(), "CDR": create_daily_dataframe(base=50)}
+    panel = PricePanel.from_frames(frames)
+    rates = usdpln_rates()
+
+    converted = convert_panel(panel, rates)
+    partial = convert_panel(panel, {"SPY": rates})
+
+    factor = rates.reindex(panel.index).to_numpy()
+    np.testing.assert_allclose(converted.values, panel.values * factor[:, None])
+    np.testing.assert_allclose(partial.values[:, 0], panel.values[:, 0] * factor)
+    np.testing.assert_allclose(partial.values[:, 1], panel.values[:, 1])
+
+
+def test_convert_assets_fetches_each_rate_once():
+    calls = []
+    assets = {}
+    for role, ticker in [("equity_us", "SPY"), ("equity_exus", "VEU"), ("defensive", "BND")]:
+        df = create_daily_dataframe()
+        df.attrs["ticker"] = ticker
+        assets[role] = df
+
+    with patch.dict("services.fx.ASSET_CURRENCIES", {"BND": "PLN"}):
+        converted = convert_assets(assets, "PLN", loader=fake_loader(calls))
+
+    assert calls == [fx_ticker("USD", "PLN")]
+    assert converted["defensive"] is assets["defensive"]
+    assert converted["equity_us"].attrs["ticker"] == "SPY"
+    assert converted["equity_us"]["Close"].iloc[-1] == pytest.approx(120 * usdpln_rates()["2023-12-29"])
+
+
+def test_get_data_with_currency_uses_cached_fx_path():
+    def fake_fetch(ticker, start_date, **kwargs):
+        if ticker == "USDPLN=X":
+            rates = usdpln_rates()
+            return pd.DataFrame({"Close": rates.to_numpy()}, index=rates.index.rename("Date"))
+        return create_daily_dataframe()
+
+    with patch("services.data_service.fetch_yahoo_data", side_effect=fake_fetch) as mock_fetch:
+        usd = get_data("FX_TEST", start_date="2023-06-01", interval="monthly")
+        pln = get_data("FX_TEST", start_date="2023-06-01", interval="monthly", currency="PLN")
+
+    fetched = [call.kwargs.get("ticker", call.args[0] if call.args else None) for call in mock_fetch.call_args_list]
+    assert "USDPLN=X" in fetched
+    rates = usdpln_rates()
+    expected = usd["Close"].to_numpy() * rates.reindex(usd["Date"]).to_numpy()
+    np.testing.assert_allclose(pln["Close"].to_numpy(), expected)
+
+
+def test_get_data_converts_daily_prices_before_resampling():
+    daily = create_daily_dataframe()
+    daily["High"] = daily["Close"] * np.where(np.arange(len(daily)) % 5 == 0, 1.05, 1.01)
+    rates = usdpln_rates()
+
+    def fake_fetch(ticker, start_date, **kwargs):
+        if ticker == "USDPLN=X":
+            return pd.DataFrame({"Close": rates.to_numpy()}, index=rates.index.rename("Date"))
+        return daily
+
+    with patch("services.data_service.fetch_yahoo_data", side_effect=fake_fetch):
+        pln = get_data("FX_DAILY", start_date="2023-06-01", interval="monthly", currency="pln")
+
+    # Świeca miesięczna z dziennych cen w PLN: Open po kursie z pierwszej sesji, High – maksimum dni
+    converted = daily[["Open", "High", "Close"]].mul(rates.reindex(daily.index), axis=0)
+    expected = converted.resample("ME").agg({"Open": "first", "High": "max", "Close": "last"})
+    np.testing.assert_allclose(pln[["Open", "High", "Close"]].to_numpy(), expected.to_numpy())
+
+
+def test_currency_codes_are_case_insensitive():
+    with patch("services.data_service.fetch_yahoo_data", return_value=create_daily_dataframe()) as mock_fetch, \
+            patch("services.fx.ASSET_CURRENCIES", {"FX_CASE": "usd"}):
+        same = get_data("FX_CASE", start_date="2023-06-01", interval="monthly", currency="USD")
+
+    fetched = [call.kwargs.get("ticker", call.args[0] if call.args else None) for call in mock_fetch.call_args_list]
+    assert "USDUSD=X" not in fetched
+    assert same["Close"].iloc[-1] == pytest.approx(120.0)
+
+
+def test_gem_passes_currency_to_data_service():
+    data_service = MagicMock()
+    dates = pd.date_range("2023-01-31", periods=14, freq="M")
+    data_service.get_monthly_data.return_value = pd.DataFrame(
+        {"Date": dates, "Adj Close": np.linspace(100, 130, len(dates))}
+    )
+
+    GEM(data_service, currency="PLN").evaluate("SPY", "VEU", "BND", "3m", "2024-03-01")
+
+    data_service.get_monthly_data.assert_any_call("SPY", currency="PLN")
@@ -0,0 +1,132 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import services.prefetch as prefetch
+from services.prefetch import (
+    REPORT_COLUMNS,
+    is_ready,
+    last_trading_day,
+    load_marker,
+    next_run,
+    warm,
+)
+from services.storage import PRICE_COLUMNS, CsvYearStorage
+from services.yahoo_client import data_source, fetch_yahoo_data
+from utils.clock import FixedClock, use_clock
+
+
+def create_daily_dataframe(start, end, base=100.0):
+    dates = pd.bdate_range(start, end, name="Date")
+    close = np.linspace(base, base * 1.2, len(dates))
+    return pd.DataFrame({column: close for column in PRICE_COLUMNS}, index=dates)
+
+
+@pytest.fixture
+def prefetch_path(tmp_path, monkeypatch):
+    path = tmp_path / "prefetch"
+    monkeypatch.setattr(prefetch, "PREFETCH_PATH", path)
+    return path
+
+
+def test_last_trading_day_and_next_run():
+    # Sobota 31.05.2025 → ostatnia sesja w piątek 30.05
+    assert last_trading_day("2025-05-10") == pd.Timestamp("2025-05-30")
+    assert last_trading_day("2025-05-30") == pd.Timestamp("2025-05-30")
+
+    assert next_run(datetime(2025, 5, 10, 9)) == datetime(2025, 5, 30, 22)
+    # Po zamknięciu ostatniej sesji → koniec następnego miesiąca
+    assert next_run(datetime(2025, 5, 30, 22, 30)) == datetime(2025, 6, 30, 22)
+
+    with use_clock(FixedClock("2025-06-02T08:00:00")):
+        assert next_run() == datetime(2025, 6, 30, 22)
+
+
+def test_warm_writes_markers_and_report(prefetch_path):
+    def fetch(ticker, start_date):
+        if ticker == "MISSING":
+            return pd.DataFrame()
+        return create_daily_dataframe(start_date, "2025-05-30")
+
+    def bars(ticker, start_date=None):
+        return pd.DataFrame({"Date": pd.date_range("2025-01-31", periods=5, freq="M"), "Close": 1.0})
+
+    with use_clock(FixedClock("2025-05-30T22:05:00")):
+        report = warm(["SPY", "VEU", "MISSING"], workers=2, fetch=fetch, bars=bars)
+
+    assert list(report.columns) == REPORT_COLUMNS
+    assert list(report["Ticker"]) == ["SPY", "VEU", "MISSING"]
+    assert list(report["Status"]) == ["ready", "ready", "error"]
+    assert (report.loc[:1, "Last Date"] == "2025-05-30").all()
+    assert (report.loc[:1, "Total [s]"] >= 0).all()
+
+    marker = load_marker("SPY")
+    assert marker["valid_until"] == "2025-06-02T22:00:00"
+    assert marker["monthly_rows"] == 5
+    assert (prefetch_path / "bars" / "VEU.csv").exists()
+    assert load_marker("MISSING") is None
+
+    assert is_ready("SPY", datetime(2025, 6, 2, 9, 30))
+    assert not is_ready("SPY", datetime(2025, 6, 2, 22, 0))
+    assert not is_ready("MISSING", datetime(2025, 6, 2, 9, 30))
+
+
+def test_first_day_requests_served_from_cache(tmp_path, prefetch_path):
+    raw = tmp_path / "raw"
+    cached = create_daily_dataframe("2025-01-02", "2025-05-30")
+    CsvYearStorage(raw).upsert("SPY", cached)
+
+    with data_source(raw_path=raw):
+        with use_clock(FixedClock("2025-05-30T22:05:00")):
+            report = warm(["SPY"], bars=lambda ticker, start_date=None: pd.DataFrame())
+        assert report.loc[0, "Status"] == "ready"
+
+        # Pierwszy dzień miesiąca: cache aktualny do zamknięcia sesji 2.06
+        with patch("services.yahoo_client.yf.download") as mock_download:
+            with use_clock(FixedClock("2025-06-02T09:30:00")):
+                served = fetch_yahoo_data("SPY", "2025-01-01")
+        mock_download.assert_not_called()
+        pd.testing.assert_frame_equal(served, cached, check_freq=False)
+
+        # Po zamknięciu kolejnej sesji znacznik wygasa → zwykła aktualizacja
+        with patch("services.yahoo_client.yf.download", return_value=pd.DataFrame()) as mock_download:
+            with use_clock(FixedClock("2025-06-02T22:30:00")):
+                fetch_yahoo_data("SPY", "2025-01-01")
+        mock_download.assert_called_once()
+
+
+def test_monthly_bars_served_from_processed_cache(tmp_path, prefetch_path):
+    from services import data_service
+
+    raw = tmp_path / "raw"
+    CsvYearStorage(raw).upsert("SPY", create_daily_dataframe("2023-01-02", "2025-05-30"))
+
+    with patch("services.yahoo_client.DATA_RAW_PATH", raw), patch("services.yahoo_client.yf.download") as download:
+        with use_clock(FixedClock("2025-05-30T22:05:00")):
+            report = warm(["SPY"], start_date="2025-01-01")
+        download.assert_not_called()
+    assert report.loc[0, "Status"] == "ready"
+    assert load_marker("SPY")["bars"] == {"start": "2023-12-01", "anchor": "last"}
+    data_service.clear_caches()
+
+    # Inny proces pierwszego dnia miesiąca: świece z prefetchu, bez odczytu danych dziennych
+    with patch("services.data_service.fetch_yahoo_data") as fetch:
+        with use_clock(FixedClock("2025-06-02T09:30:00")):
+            served = data_service.get_monthly_data("SPY", start_date="2025-01-01")
+        fetch.assert_not_called()
+    expected = pd.read_csv(prefetch_path / "bars" / "SPY.csv", parse_dates=["Date"])
+    pd.testing.assert_frame_equal(served, expected)
+    assert served["Date"].iloc[-1] == pd.Timestamp("2025-05-30")
+
+    # Po wygaśnięciu znacznika albo dla innego zakresu – zwykła ścieżka przez dane dzienne
+    for now, start_date in (("2025-06-02T22:30:00", "2025-01-01"), ("2025-06-02T09:30:00", "2024-01-01")):
+        data_service.clear_caches()
+        daily = create_daily_dataframe("2023-01-02", "2025-05-30")
+        with patch("services.data_service.fetch_yahoo_data", return_value=daily) as fetch:
+            with use_clock(FixedClock(now)):
+                data_service.get_monthly_data("SPY", start_date=start_date)
+            fetch.assert_called_once()
+    data_service.clear_caches()
@@ -0,0 +1,117 @@
+import threading
+from functools import partial
+
+import numpy as np
+import pytest
+
+from strategy.backtest import backtest_gem
+from strategy.momentum import get_momentum
+from utils import profiling
+from utils.profiling import REPORT_COLUMNS, profiled, stage
+
+
+@pytest.fixture
+def create_assets(create_assets):
+    return partial(create_assets, periods=30, start="2020-01-31", columns=("Close", "Adj Close"), index_name="Date")
+
+
+@pytest.fixture
+def profiler():
+    profiler = profiling.enable(interval=0.001)
+    try:
+        yield profiler
+    finally:
+        profiling.disable()
+
+
+def test_disabled_profiling_only_calls_function():
+    calls = []
+
+    @profiled("get_data")
+    def load(x):
+        calls.append(x)
+        return x * 2
+
+    if profiling.is_enabled():
+        pytest.skip("profilowanie włączone dla całej sesji (GEM_PROFILE)")
+    assert load(3) == 6
+    assert calls == [3]
+    assert load.__name__ == "load"
+
+
+def test_stages_report_calls_time_and_memory(profiler, create_assets):
+    assets = create_assets()
+    backtest_gem(assets, "2021-01-31")
+
+    @profiled("get_data")
+    def allocate():
+        return np.ones(2 ** 20)  # 8 MB
+
+    allocate()
+    with stage("custom"):
+        get_momentum(assets["equity_us"].loc[:"2021-06-30"].reset_index(), "3m")
+
+    report = profiler.report().set_index("Stage")
+    assert list(report.reset_index().columns) == REPORT_COLUMNS
+    # Kolejność STAGES, potem pozostałe etapy
+    assert list(report.index) == ["get_data", "get_momentum", "backtest_gem", "custom"]
+
+    assert report.loc["backtest_gem", "Calls"] == 1
+    # 18 miesięcy × 3 horyzonty × 2 aktywa + wywołanie w etapie custom
+    assert report.loc["get_momentum", "Calls"] == 18 * 3 * 2 + 1
+    assert report.loc["get_data", "Peak Memory [MB]"] >= 7.9
+    # Czas własny backtest_gem nie obejmuje zagnieżdżonego get_momentum
+    assert 0 < report.loc["backtest_gem", "Self CPU [s]"] < report.loc["backtest_gem", "Wall [s]"]
+
+    hot = profiler.hot_spots(5)
+    assert len(hot) == 5
+    assert hot["Self [s]"].is_monotonic_decreasing
+
+
+def test_write_outputs_collapsed_stacks_and_summary(profiler, tmp_path):
+    def slow():
+        total = 0.0
+        for i in range(300_000):
+            total += i ** 0.5
+        return total
+
+    @profiled("backtest_gem")
+    def run():
+        return slow()
+
+    run()
+    profiler.sample()  # poza etapem – brak próbki
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    worker.join()
+
+    profiling.disable()
+    files = profiler.write(tmp_path)
+
+    lines = files["stacks"].read_text(encoding="utf-8").splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        # Korzeń to etap, dalej od razu udekorowana funkcja – bez ramek wywołującego (test, pytest)
+        root, first = stack.split(";")[:2]
+        assert root == "backtest_gem"
+        assert first.startswith("test_write_outputs_collapsed_stacks_and_summary.<locals>.run ")
+        assert int(count) > 0
+    assert any(".slow " in line for line in lines)
+
+    assert files["backtest_gem"].exists()
+    summary = files["summary"].read_text(encoding="utf-8")
+    assert "backtest_gem" in summary and "slow" in summary
+    assert profiler.report().set_index("Stage").loc["backtest_gem", "Calls"] == 2
+
+
+def test_env_path(monkeypatch, tmp_path):
+    monkeypatch.delenv(profiling.PROFILE_ENV, raising=False)
+    assert profiling.env_path() is None
+
+    monkeypatch.setenv(profiling.PROFILE_ENV, "1")
+    assert profiling.env_path() == profiling.PROFILE_PATH
+
+    monkeypatch.setenv(profiling.PROFILE_ENV, str(tmp_path))
+    assert profiling.env_path() == tmp_path
@@ -0,0 +1,126 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import data_service
+from services.resampling import BarCache, resample, resample_bars, resolve_granularity
+from strategy.gem import GEM
+
+
+def create_daily_dataframe():
+    """
+    Dzienne dane sesyjne (dni robocze) w formacie fetch_yahoo_data.
+    """
+    dates = pd.bdate_range("2023-01-02", "2024-06-28", name="Date")
+    rng = np.random.default_rng(3)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(dates)))
+
+    return pd.DataFrame(
+        {
+            "Price": close,
+            "Open": close * 0.99,
+            "Close": close,
+            "Adj Close": close * 0.95,
+            "Low": close * 0.98,
+            "High": close * 1.02,
+            "Volume": rng.integers(1_000, 5_000, len(dates)).astype(float),
+        },
+        index=dates,
+    )
+
+
+def test_monthly_last_matches_pandas_resample():
+    df = create_daily_dataframe()
+
+    bars = resample(df, "monthly", anchor="last")
+    expected = df.resample("M").agg(
+        {"Price": "last", "Open": "first", "Close": "last", "Adj Close": "last",
+         "Low": "min", "High": "max", "Volume": "sum"}
+    )
+
+    np.testing.assert_allclose(bars.to_numpy(), expected[bars.columns].to_numpy())
+    # Etykieta = ostatni dzień sesyjny miesiąca, a nie koniec kalendarzowy
+    assert bars.index[0] == pd.Timestamp("2023-01-31")
+    assert bars.index[3] == pd.Timestamp("2023-04-28")
+
+
+def test_weekly_and_monthly_from_one_pass():
+    df = create_daily_dataframe()
+
+    bars = resample_bars(df, ("weekly", "monthly"), anchor="last")
+    expected_weekly = df["Adj Close"].resample("W").last()
+
+    np.testing.assert_allclose(bars["weekly"]["Adj Close"].to_numpy(), expected_weekly.to_numpy())
+    assert len(bars["monthly"]) == 18
+
+
+def test_first_anchor_uses_first_trading_day():
+    df = create_daily_dataframe()
+
+    bars = resample(df, "1mo", anchor="first")
+
+    assert bars.index[0] == pd.Timestamp("2023-01-02")
+    assert bars.index[3] == pd.Timestamp("2023-04-03")
+    assert bars["Adj Close"].iloc[3] == df.loc["2023-04-03", "Adj Close"]
+
+
+def test_missing_value_at_period_edge_keeps_bar():
+    df = create_daily_dataframe()
+    df.loc["2023-02-28", "Adj Close"] = np.nan
+    df.loc["2023-03-01", ["Open", "Close"]] = np.nan
+
+    bars = resample(df, "monthly", anchor="last")
+    expected = df.resample("M").agg(
+        {"Price": "last", "Open": "first", "Close": "last", "Adj Close": "last",
+         "Low": "min", "High": "max", "Volume": "sum"}
+    )
+
+    # Luty zostaje: Adj Close z ostatniej sesji z notowaniem (jak w pandas)
+    assert len(bars) == len(expected)
+    np.testing.assert_allclose(bars.to_numpy(), expected.to_numpy())
+    assert bars.loc["2023-02-28", "Adj Close"] == df.loc["2023-02-27", "Adj Close"]
+    assert bars.loc["2023-03-31", "Open"] == df.loc["2023-03-02", "Open"]
+
+    first = resample(df, "monthly", anchor="first")
+    assert pd.Timestamp("2023-03-01") in first.index
+    assert first.loc["2023-03-01", "Open"] == df.loc["2023-03-02", "Open"]
+    assert first.loc["2023-03-01", "Adj Close"] == df.loc["2023-03-01", "Adj Close"]
+
+
+def test_resolve_granularity():
+    assert resolve_granularity("M") == "monthly"
+    assert resolve_granularity("1wk") == "weekly"
+    assert resolve_granularity(GEM) == "monthly"
+    with pytest.raises(ValueError):
+        resolve_granularity("5m")
+
+
+def test_bar_cache_resamples_once_per_data_version():
+    df = create_daily_dataframe()
+    cache = BarCache()
+
+    with patch("services.resampling.resample_bars", wraps=resample_bars) as spy:
+        monthly = cache.get("SPY", df, "monthly", "last")
+        weekly = cache.get("SPY", df, "weekly", "last")
+        cache.get("SPY", df, "monthly", "last")
+        assert spy.call_count == 1
+
+        df_updated = df.copy()
+        df_updated.iloc[-1, 0] += 1.0
+        cache.get("SPY", df_updated, "monthly", "last")
+        assert spy.call_count == 2
+
+    assert len(monthly) == 18
+    assert len(weekly) > len(monthly)
+
+
+@patch("services.data_service.fetch_yahoo_data")
+def test_get_monthly_data_returns_date_column(mock_fetch):
+    mock_fetch.return_value = create_daily_dataframe()
+
+    df = data_service.get_monthly_data("TEST_RESAMPLING", start_date="2024-01-01")
+
+    assert list(df.columns[:2]) == ["Date", "Price"]
+    assert df["Date"].iloc[-1] == pd.Timestamp("2024-06-28")
@@ -0,0 +1,93 @@
+import os
+from functools import partial
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from services.result_cache import ResultCache
+from strategy.backtest import BACKTEST_MODULES, backtest_gem
+from strategy.gem import GEM, GEM_MODULES
+
+START_DATE = "2016-01-01"
+
+
+@pytest.fixture
+def create_assets(create_assets):
+    return partial(create_assets, periods=48, seed=11)
+
+
+def test_put_get_roundtrip(tmp_path):
+    cache = ResultCache(tmp_path)
+
+    cache.put("abc123", {"value": pd.Series([1.0, 2.0])})
+
+    assert "abc123" in cache
+    assert cache.get("abc123")["value"].tolist() == [1.0, 2.0]
+    assert cache.get("missing") is None
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    payload = os.urandom(4000)  # nieskompresowalne dane → przewidywalny rozmiar
+    cache = ResultCache(tmp_path, max_bytes=10_000)
+
+    cache.put("aa1", payload)
+    cache.put("bb2", payload)
+    # Cofamy mtime, aby kolejność użycia nie zależała od rozdzielczości zegara
+    for age, key in [(300, "aa1"), (200, "bb2")]:
+        entry = cache._entry_path(key)
+        os.utime(entry, (entry.stat().st_atime - age, entry.stat().st_mtime - age))
+
+    cache.get("aa1")          # aa1 staje się najświeższy
+    cache.put("cc3", payload)  # przekroczenie limitu → usunięcie bb2
+
+    assert "aa1" in cache
+    assert "bb2" not in cache
+    assert "cc3" in cache
+    assert cache.size() <= 10_000
+
+
+def test_code_version_covers_decision_modules():
+    # Wybór ról i momentum liczone są w strategy/vectorized.py i strategy/decision_log.py
+    for modules in (BACKTEST_MODULES, GEM_MODULES):
+        assert {"strategy/decision_log.py", "strategy/vectorized.py"} <= set(modules)
+
+
+def test_backtest_reuses_cached_result(tmp_path, create_assets):
+    cache = ResultCache(tmp_path)
+    assets = create_assets()
+
+    first = backtest_gem(assets, START_DATE, cache=cache)
+
+    with patch("strategy.backtest.gem_decision") as mock_decision:
+        second = backtest_gem(create_assets(), START_DATE, cache=cache)
+        mock_decision.assert_not_called()
+
+    pd.testing.assert_series_equal(first["equity_curves"]["12M"], second["equity_curves"]["12M"])
+
+
+def test_backtest_recomputes_when_data_changes(tmp_path, create_assets):
+    cache = ResultCache(tmp_path)
+    assets = create_assets()
+
+    backtest_gem(assets, START_DATE, cache=cache)
+    assets["equity_us"].iloc[-1, 0] *= 1.01
+    backtest_gem(assets, START_DATE, cache=cache)
+
+    assert len(cache.entries()) == 2
+
+
+@patch("strategy.gem.get_momentum")
+def test_gem_evaluate_all_uses_cache(mock_get_momentum, tmp_path):
+    mock_get_momentum.side_effect = [0.02, 0.01, 0.05, 0.08, -0.1, -0.2]
+    data_service = MagicMock()
+    data_service.get_monthly_data.return_value = pd.DataFrame(
+        {"Date": pd.date_range("2024-01-31", periods=3, freq="M"), "Adj Close": [1.0, 2.0, 3.0]}
+    )
+    gem = GEM(data_service, result_cache=ResultCache(tmp_path))
+
+    first = gem.evaluate_all("SPY", "VEU", "BND", decision_date="2025-01-01")
+    second = gem.evaluate_all("SPY", "VEU", "BND", decision_date="2025-01-01")
+
+    assert first == second
+    assert mock_get_momentum.call_count == 6
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.storage import PRICE_COLUMNS, CsvYearStorage, get_storage
+from strategy.momentum import get_all_momentums
+from strategy.screen import screen_momentum
+
+N_TICKERS = 30
+
+
+def write_universe(path, storage=None):
+    """
+    Zapisuje do katalogu cache pliki roczne (albo do podanego backendu) dla N_TICKERS
+    syntetycznych tickerów. Zwraca dict {ticker: dzienne DataFrame}.
+    """
+    storage = storage or CsvYearStorage(path)
+    dates = pd.bdate_range("2022-01-03", "2024-06-28", name="Date")
+    rng = np.random.default_rng(21)
+    universe = {}
+
+    for i in range(N_TICKERS):
+        trend = rng.normal(0.0005, 0.0003)
+        close = 100 * np.cumprod(1 + trend + rng.normal(0, 0.01, len(dates)))
+        df = pd.DataFrame({column: close for column in PRICE_COLUMNS}, index=dates)
+        ticker = f"T{i:02d}"
+        storage.upsert(ticker, df)
+        universe[ticker] = df
+
+    return universe
+
+
+def expected_ranking(universe, period):
+    values = {}
+    for ticker, df in universe.items():
+        monthly = df[["Adj Close"]].resample("M").last()
+        values[ticker] = get_all_momentums(monthly)[period]
+    return sorted(values.items(), key=lambda item: item[1], reverse=True)
+
+
+def test_screen_returns_top_k_per_period(tmp_path):
+    universe = write_universe(tmp_path)
+
+    result = screen_momentum(top_k=5, path=tmp_path)
+
+    for period in ("3m", "6m", "12m"):
+        expected = expected_ranking(universe, period)[:5]
+        assert result[period]["Ticker"].tolist() == [ticker for ticker, _ in expected]
+        assert result[period]["Momentum"].tolist() == pytest.approx([value for _, value in expected])
+
+
+def test_screen_with_worker_pool_matches_serial(tmp_path):
+    write_universe(tmp_path)
+
+    serial = screen_momentum(top_k=7, path=tmp_path)
+    parallel = screen_momentum(top_k=7, path=tmp_path, workers=2, chunk_size=4)
+
+    for period in serial:
+        pd.testing.assert_frame_equal(serial[period], parallel[period])
+
+
+def test_screen_respects_as_of_and_short_history(tmp_path):
+    write_universe(tmp_path)
+
+    result = screen_momentum(top_k=3, path=tmp_path, as_of="2022-05-31")
+
+    # Od początku 2022 do końca maja jest 5 miesięcy – 6m i 12m niepoliczalne
+    assert len(result["3m"]) == 3
+    assert result["6m"].empty and result["12m"].empty
+    assert (result["3m"]["Last Date"] <= pd.Timestamp("2022-05-31")).all()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "memmap"])
+def test_screen_reads_configured_backend(tmp_path, backend):
+    path = tmp_path / "prices.sqlite" if backend == "sqlite" else tmp_path / "memmap"
+    storage = get_storage(backend, path)
+    universe = write_universe(path, storage)
+
+    result = screen_momentum(top_k=5, path=path, backend=backend)
+
+    expected = expected_ranking(universe, "12m")[:5]
+    assert result["12m"]["Ticker"].tolist() == [ticker for ticker, _ in expected]
@@ -0,0 +1,76 @@
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy.backtest import backtest_gem
+from utils.panel import PricePanel
+from utils.shared_panel import SharedPanelPool, attach_panel, publish_panel
+
+START_DATE = "2016-01-01"
+
+
+@pytest.fixture
+def create_assets(create_assets):
+    return partial(create_assets, periods=60, seed=7, tickers=("SPY", "VEU", "BND"))
+
+
+def final_values(panel, start_date):
+    # Funkcja wykonywana w workerze: dostaje PricePanel podpięty z pamięci współdzielonej
+    result = backtest_gem(panel, start_date)
+    return {h: curve.iloc[-1] for h, curve in result["equity_curves"].items()}
+
+
+def test_panel_from_frames_aligns_dates(create_assets):
+    assets = create_assets()
+    assets["defensive"] = assets["defensive"].iloc[2:]
+
+    panel = PricePanel.from_frames(assets)
+
+    assert panel.values.shape == (58, 3)
+    assert panel.tickers["equity_exus"] == "VEU"
+    assert pd.Timestamp(panel.dates[0]) == assets["defensive"].index[0]
+
+
+def test_attach_returns_zero_copy_read_only_views(create_assets):
+    panel = PricePanel.from_frames(create_assets())
+
+    with publish_panel(panel) as handle:
+        attached = attach_panel(handle.descriptor)
+
+        np.testing.assert_array_equal(attached.values, panel.values)
+        np.testing.assert_array_equal(attached.dates, panel.dates)
+        assert not attached.values.flags.writeable
+
+        series = attached.series("equity_us")
+        assert np.shares_memory(series.to_numpy(), attached.values)
+
+
+def test_backtest_accepts_panel(create_assets):
+    assets = create_assets()
+
+    expected = backtest_gem(assets, START_DATE)
+    result = backtest_gem(PricePanel.from_frames(assets), START_DATE)
+
+    for h, curve in expected["equity_curves"].items():
+        pd.testing.assert_series_equal(result["equity_curves"][h], curve, check_names=False, check_freq=False)
+    assert result["decisions"] == expected["decisions"]
+    assert result["tickers"] == expected["tickers"]
+
+
+def test_pool_runs_backtest_on_shared_panel_and_cleans_up(create_assets):
+    assets = create_assets()
+    expected = final_values(PricePanel.from_frames(assets), START_DATE)
+
+    with SharedPanelPool(max_workers=2) as pool:
+        descriptor = pool.publish(PricePanel.from_frames(assets))
+        results = list(pool.map(final_values, descriptor, [START_DATE, START_DATE]))
+
+    for result in results:
+        assert result == pytest.approx(expected)
+
+    # Po zamknięciu puli segment nie istnieje
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=descriptor.name)
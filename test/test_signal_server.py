@@ -0,0 +1,164 @@
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import Request, urlopen
+
+import numpy as np
+import pandas as pd
+
+from services.signal_server import SignalServer, SignalState
+from strategy.gem import GEM
+
+
+def create_monthly_bars(seed, periods=36):
+    """
+    Miesięczne świece w formacie data_service.get_monthly_data (kolumna 'Date').
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2022-01-31", periods=periods, freq="M")
+    prices = 100 * np.cumprod(1 + rng.normal(0.01, 0.04, periods))
+    return pd.DataFrame({"Date": dates, "Adj Close": prices})
+
+
+class FakeLoader:
+    """
+    Loader świec z licznikiem wywołań; dane można podmienić w trakcie testu.
+    """
+
+    def __init__(self):
+        self.data = {"SPY": create_monthly_bars(1), "VEU": create_monthly_bars(2), "BND": create_monthly_bars(3)}
+        self.calls = 0
+
+    def __call__(self, ticker):
+        self.calls += 1
+        return self.data[ticker]
+
+    def get_monthly_data(self, ticker):
+        return self.data[ticker]
+
+
+class TestSignalServer(unittest.TestCase):
+    def setUp(self):
+        self.loader = FakeLoader()
+        self.server = SignalServer(port=0, state=SignalState(self.loader)).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def get(self, path):
+        with urlopen(self.server.url + path, timeout=5) as response:
+            return response.status, json.loads(response.read())
+
+    def test_signal_matches_gem_evaluate_all(self):
+        """
+        Scenariusz: zapytanie o sygnał dla zadanej daty.
+        Oczekiwane: ten sam wynik co GEM.evaluate_all na tych samych danych.
+        """
+        status, payload = self.get("/signal?asset_a=SPY&asset_b=VEU&defensive=BND&date=2024-06-01")
+
+        expected = GEM(self.loader).evaluate_all("SPY", "VEU", "BND", "2024-06-01")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(payload, json.loads(json.dumps(expected, default=str)))
+
+    def test_repeated_requests_are_served_from_memory(self):
+        """
+        Scenariusz: wiele równoległych zapytań o ten sam sygnał.
+        Oczekiwane: dane ładowane raz.
+        """
+        path = "/signal?asset_a=SPY&asset_b=VEU&defensive=BND&date=2024-06-01"
+        self.get(path)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: self.get(path), range(40)))
+
+        self.assertTrue(all(status == 200 for status, _ in results))
+        self.assertEqual(self.loader.calls, 2)
+
+    def test_slow_load_does_not_block_other_tickers(self):
+        """
+        Scenariusz: ładowanie SPY trwa, w tym czasie przychodzą żądania o VEU i o SPY.
+        Oczekiwane: VEU ładuje się bez czekania na SPY, SPY ładowany jest raz.
+        """
+        release = threading.Event()
+        calls = []
+
+        def loader(ticker):
+            calls.append(ticker)
+            if ticker == "SPY":
+                release.wait(5)
+            return self.loader.data[ticker]
+
+        state = SignalState(loader)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            slow = [pool.submit(state.bars, "SPY") for _ in range(2)]
+            self.assertIs(pool.submit(state.bars, "VEU").result(timeout=2), self.loader.data["VEU"])
+            self.assertFalse(any(future.done() for future in slow))
+            release.set()
+            self.assertTrue(all(future.result(timeout=5) is self.loader.data["SPY"] for future in slow))
+
+        self.assertEqual(sorted(calls), ["SPY", "VEU"])
+
+    def test_signal_cache_is_bounded(self):
+        """
+        Scenariusz: zapytania o sygnał dla wielu dat decyzji.
+        Oczekiwane: w cache zostaje tylko max_signals ostatnio używanych wyników.
+        """
+        state = SignalState(self.loader, max_signals=3)
+        dates = ["2024-03-01", "2024-04-01", "2024-05-01", "2024-06-01"]
+        for date in dates:
+            state.signal("SPY", "VEU", "BND", date)
+        state.signal("SPY", "VEU", "BND", "2024-04-01")
+        state.signal("SPY", "VEU", "BND", "2024-07-01")
+
+        self.assertEqual([key[3] for key in state._signals], ["2024-06-01", "2024-04-01", "2024-07-01"])
+
+    def test_refresh_updates_only_changed_tickers(self):
+        """
+        Scenariusz: pojawia się nowa świeca dla SPY.
+        Oczekiwane: odświeżony zostaje tylko SPY, sygnał liczony na nowych danych.
+        """
+        path = "/signal?asset_a=SPY&asset_b=VEU&defensive=BND&date=2025-02-01"
+        _, before = self.get(path)
+
+        bars = self.loader.data["SPY"]
+        new_bar = pd.DataFrame({"Date": [bars["Date"].iloc[-1] + pd.offsets.MonthEnd(1)], "Adj Close": [1.0]})
+        self.loader.data["SPY"] = pd.concat([bars, new_bar], ignore_index=True)
+
+        request = Request(self.server.url + "/refresh", method="POST")
+        with urlopen(request, timeout=5) as response:
+            refreshed = json.loads(response.read())
+        _, after = self.get(path)
+
+        self.assertEqual(refreshed["updated"], ["SPY"])
+        self.assertNotEqual(before["12m"]["asset_a_momentum"], after["12m"]["asset_a_momentum"])
+
+    def test_refresh_detects_revision_of_historical_bars(self):
+        """
+        Scenariusz: korekta historycznego Adj Close VEU (np. po dywidendzie), bez nowej świecy.
+        Oczekiwane: odświeżony zostaje VEU, sygnał liczony na skorygowanych danych.
+        """
+        path = "/signal?asset_a=SPY&asset_b=VEU&defensive=BND&date=2025-02-01"
+        _, before = self.get(path)
+
+        bars = self.loader.data["VEU"].copy()
+        bars.loc[len(bars) - 13, "Adj Close"] *= 0.9
+        self.loader.data["VEU"] = bars
+
+        request = Request(self.server.url + "/refresh", method="POST")
+        with urlopen(request, timeout=5) as response:
+            refreshed = json.loads(response.read())
+        _, after = self.get(path)
+
+        self.assertEqual(refreshed["updated"], ["VEU"])
+        self.assertNotEqual(before["12m"]["asset_b_momentum"], after["12m"]["asset_b_momentum"])
+
+    def test_missing_parameters(self):
+        with self.assertRaises(Exception) as ctx:
+            self.get("/signal?asset_a=SPY")
+        self.assertEqual(ctx.exception.code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
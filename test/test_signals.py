@@ -0,0 +1,222 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy.backtest import backtest_gem
+from strategy.gem import GEM
+from strategy.signals import (
+    SIGNALS,
+    CompositeMomentumSignal,
+    DualMomentumSignal,
+    GemSignal,
+    Signal,
+    VolAdjustedMomentumSignal,
+    backtest_signal,
+    get_signal,
+    rolling_volatility,
+    signal_panel,
+)
+from strategy.triplets import screen_triplets
+from utils.metrics import STATISTICS
+
+START_DATE = "2016-01-01"
+
+
+@pytest.fixture
+def create_assets(create_assets):
+    return partial(create_assets, seed=8, volatility=0.045)
+
+
+def test_builtins_are_registered():
+    assert {"gem", "accelerating", "composite", "vol_adjusted"} <= set(SIGNALS)
+    assert get_signal("gem", months=6).params == {"months": 6}
+
+    with pytest.raises(ValueError):
+        get_signal("unknown")
+
+
+@pytest.mark.parametrize("horizon, months", [("3M", 3), ("6M", 6), ("12M", 12)])
+def test_gem_signal_matches_backtest_gem(horizon, months, create_assets):
+    assets = create_assets()
+    reference = backtest_gem(assets, START_DATE)
+
+    result = backtest_signal(assets, START_DATE, "gem", months=months)
+
+    np.testing.assert_allclose(
+        result["monthly_returns"].to_numpy(), reference["monthly_returns"][horizon].to_numpy()
+    )
+    assert result["selections"].iloc[-1] == reference["decisions"][horizon]
+    for name in STATISTICS:
+        assert result["statistics"][name] == pytest.approx(reference["statistics"][horizon][name])
+
+
+def test_later_listed_asset_does_not_truncate_panel(create_assets):
+    assets = create_assets()
+    assets["defensive"] = assets["defensive"].iloc[30:]
+    reference = backtest_gem(assets, START_DATE)
+
+    panel = signal_panel(assets)
+    result = backtest_signal(assets, START_DATE, "gem", months=12)
+
+    assert len(panel.index) == len(assets["equity_us"])
+    assert np.isnan(panel.values[:30, 2]).all()
+    np.testing.assert_allclose(result["monthly_returns"].to_numpy(), reference["monthly_returns"]["12M"].to_numpy())
+
+
+@pytest.mark.parametrize("horizon, months", [("3M", 3), ("6M", 6), ("12M", 12)])
+def test_gem_signal_matches_backtest_gem_with_missing_months(horizon, months, create_assets):
+    assets = create_assets()
+    # Missing months inside equity_exus history: lookbacks count the asset's own rows
+    assets["equity_exus"] = assets["equity_exus"].drop(assets["equity_exus"].index[20:26])
+    reference = backtest_gem(assets, START_DATE)
+
+    result = backtest_signal(assets, START_DATE, "gem", months=months)
+
+    np.testing.assert_allclose(
+        result["monthly_returns"].to_numpy(), reference["monthly_returns"][horizon].to_numpy()
+    )
+    assert result["selections"].iloc[-1] == reference["decisions"][horizon]
+
+
+def test_missing_price_of_asset_not_held_does_not_leak(create_assets):
+    assets = create_assets()
+    assets["equity_us"]["Close"] = 100 * 1.02 ** np.arange(len(assets["equity_us"]))
+    assets["defensive"].iloc[40, 0] = np.nan
+
+    result = backtest_signal(assets, START_DATE, "gem", months=12)
+
+    assert (result["selections"] != "defensive").all()
+    assert np.isfinite(result["monthly_returns"]).all()
+
+
+@pytest.mark.parametrize("name", ["gem", "accelerating", "composite", "vol_adjusted"])
+def test_weights_are_one_hot_and_batch_consistent(name):
+    signal = get_signal(name)
+    rng = np.random.default_rng(3)
+    prices = 100 * np.cumprod(1 + rng.normal(0.005, 0.05, (60, 3, 5)), axis=0)
+
+    batched = signal.weights(prices)
+
+    assert batched.shape == prices.shape
+    np.testing.assert_allclose(batched.sum(axis=1), 1.0)
+    # Before warmup only the defensive role can be held
+    assert (batched[:signal.warmup, 2] == 1).all()
+    for k in range(prices.shape[2]):
+        np.testing.assert_array_equal(signal.weights(prices[:, :, k]), batched[:, :, k])
+
+
+def test_composite_and_volatility_scores():
+    prices = np.array([100.0, 110.0, 99.0, 118.8, 130.68])[:, None]
+
+    volatility = rolling_volatility(prices, 3)
+    returns = prices[1:, 0] / prices[:-1, 0] - 1
+    assert np.isnan(volatility[:3]).all()
+    assert volatility[3, 0] == pytest.approx(np.std(returns[:3], ddof=1))
+    assert volatility[4, 0] == pytest.approx(np.std(returns[1:4], ddof=1))
+
+    composite = CompositeMomentumSignal(lookbacks=(1, 2), weights=(3, 1))
+    expected = 0.75 * (130.68 / 118.8 - 1) + 0.25 * (130.68 / 99.0 - 1)
+    assert composite.scores(prices)[-1, 0] == pytest.approx(expected)
+
+    vol_adjusted = VolAdjustedMomentumSignal(months=2, vol_window=3)
+    assert vol_adjusted.scores(prices)[-1, 0] == pytest.approx((130.68 / 99.0 - 1) / volatility[4, 0])
+
+
+def test_volatility_ignores_missing_prices_before_listing():
+    rng = np.random.default_rng(3)
+    listed = 100 * np.cumprod(1 + rng.normal(0.01, 0.04, 20))
+    prices = np.concatenate([np.full(5, np.nan), listed])[:, None]
+
+    volatility = rolling_volatility(prices, 6)
+    returns = listed[1:] / listed[:-1] - 1
+    # Windows overlapping the NaN prefix use the valid returns only; later ones are unaffected
+    assert volatility[8, 0] == pytest.approx(np.std(returns[:3], ddof=1))
+    assert np.isfinite(volatility[7:, 0]).all()
+    np.testing.assert_allclose(volatility[11:, 0], rolling_volatility(listed[:, None], 6)[6:, 0])
+
+    scores = VolAdjustedMomentumSignal(months=3, vol_window=6).scores(prices)
+    assert np.isfinite(scores[8:, 0]).all()
+
+
+def test_plugin_without_scores_cannot_be_created():
+    class Incomplete(DualMomentumSignal):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_custom_plugin_runs_in_sweep(create_assets):
+    class AlwaysDefensive(Signal):
+        name = "always_defensive"
+
+        def weights(self, prices):
+            weights = np.zeros(prices.shape)
+            weights[:, 2] = 1.0
+            return weights
+
+    frames = {f"T{i}": df for i, df in enumerate(create_assets(seed=11).values())}
+    table = screen_triplets(frames, START_DATE, signal=AlwaysDefensive())
+
+    assert set(table["Horizon"]) == {"always_defensive"}
+    # Result depends only on the defensive asset
+    cagr = table.groupby("Defensive")["CAGR"].nunique()
+    assert (cagr == 1).all()
+
+
+def test_sweep_with_gem_signal_matches_builtin_horizon(create_assets):
+    frames = {f"T{i}": df for i, df in enumerate(create_assets(seed=5).values())}
+    frames["T3"] = create_assets(seed=6)["equity_us"]
+
+    builtin = screen_triplets(frames, START_DATE, horizon="6M")
+    plugin = screen_triplets(frames, START_DATE, signal=GemSignal(months=6), workers=2, chunk_size=7)
+
+    key = ["US", "exUS", "Defensive"]
+    merged = builtin.merge(plugin, on=key, suffixes=("", "_plugin"))
+    assert len(merged) == len(builtin) == 24
+    for name in STATISTICS:
+        np.testing.assert_allclose(merged[name], merged[f"{name}_plugin"])
+
+
+class FakeDataService:
+    def __init__(self):
+        dates = pd.date_range("2022-01-31", periods=30, freq="M")
+        rng = np.random.default_rng(4)
+        self.data = {
+            ticker: pd.DataFrame({"Date": dates, "Adj Close": 100 * np.cumprod(1 + rng.normal(0.01, 0.04, 30))})
+            for ticker in ("SPY", "VEU", "BND")
+        }
+
+    def get_monthly_data(self, ticker):
+        return self.data[ticker]
+
+
+def test_live_gem_signal_matches_evaluate():
+    gem = GEM(FakeDataService())
+
+    for date in ("2023-03-01", "2023-09-01", "2024-05-01"):
+        expected = gem.evaluate("SPY", "VEU", "BND", "12m", date)
+        result = gem.evaluate_signal("SPY", "VEU", "BND", "gem", date, months=12)
+
+        assert result["winner"] == expected["winner"]
+        assert result["signal_type"] == expected["signal_type"]
+        assert result["weights"][expected["winner"]] == 1.0
+
+
+def test_live_signal_reads_only_warmup_rows():
+    class RecordingSignal(GemSignal):
+        name = None
+        lengths = []
+
+        def scores(self, prices):
+            self.lengths.append(len(prices))
+            return super().scores(prices)
+
+    signal = RecordingSignal(months=6)
+    result = GEM(FakeDataService()).evaluate_signal("SPY", "VEU", "BND", signal, "2024-05-01")
+
+    expected = GEM(FakeDataService()).evaluate("SPY", "VEU", "BND", "6m", "2024-05-01")
+    assert signal.lengths == [7, 7]
+    assert result["winner"] == expected["winner"]
@@ -0,0 +1,174 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from services.data_service import get_data
+from utils.singleflight import SingleFlight
+
+N_THREADS = 16
+
+
+def run_concurrently(fn, n=N_THREADS):
+    """
+    Uruchamia fn(i) w n wątkach jednocześnie (bariera startowa) i zwraca
+    listę (wynik, wyjątek) w kolejności wątków.
+    """
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            return fn(i), None
+        except Exception as e:
+            return None, e
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(worker, range(n)))
+
+
+class SlowLoader:
+    """
+    Wolne ładowanie z licznikiem wywołań (symulacja pobierania z Yahoo).
+    """
+
+    def __init__(self, delay=0.2, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return create_daily_dataframe()
+
+
+def create_daily_dataframe():
+    dates = pd.bdate_range("2024-01-01", "2024-12-31", name="Date")
+    close = np.linspace(100, 150, len(dates))
+    columns = ["Price", "Open", "Close", "Adj Close", "Low", "High", "Volume"]
+    return pd.DataFrame({column: close for column in columns}, index=dates)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        """
+        Scenariusz: wiele wątków jednocześnie prosi o ten sam klucz.
+        Oczekiwane: funkcja wykonana raz, wszyscy dostają ten sam wynik.
+        """
+        group = SingleFlight()
+        loader = SlowLoader()
+
+        results = run_concurrently(lambda i: group.do("SPY", loader))
+
+        self.assertEqual(loader.calls, 1)
+        self.assertTrue(all(error is None for _, error in results))
+        values = [result[0] for result, _ in results]
+        self.assertTrue(all(value is values[0] for value in values))
+        self.assertTrue(all(result[1] for result, _ in results))
+        self.assertEqual(group.in_flight(), 0)
+
+    def test_different_keys_run_independently(self):
+        """
+        Scenariusz: równoległe wywołania dla różnych kluczy.
+        Oczekiwane: każdy klucz ładowany osobno, bez wzajemnego blokowania.
+        """
+        group = SingleFlight()
+        loader = SlowLoader(delay=0.2)
+
+        start = time.perf_counter()
+        run_concurrently(lambda i: group.do(f"T{i % 4}", loader), n=8)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(loader.calls, 4)
+        self.assertLess(elapsed, 0.6)
+
+    def test_error_is_propagated_to_all_waiters(self):
+        """
+        Scenariusz: ładowanie kończy się wyjątkiem.
+        Oczekiwane: ten sam wyjątek trafia do każdego czekającego wątku.
+        """
+        group = SingleFlight()
+        loader = SlowLoader(error=ConnectionError("Yahoo niedostępne"))
+
+        results = run_concurrently(lambda i: group.do("SPY", loader))
+
+        self.assertEqual(loader.calls, 1)
+        errors = [error for _, error in results]
+        self.assertTrue(all(isinstance(error, ConnectionError) for error in errors))
+        self.assertEqual(group.in_flight(), 0)
+
+    def test_key_is_released_after_completion(self):
+        """
+        Scenariusz: kolejne (nie równoległe) wywołania.
+        Oczekiwane: każde wykonuje funkcję – single flight nie jest cache.
+        """
+        group = SingleFlight()
+        loader = SlowLoader(delay=0)
+
+        _, shared_first = group.do("SPY", loader)
+        _, shared_second = group.do("SPY", loader)
+
+        self.assertEqual(loader.calls, 2)
+        self.assertFalse(shared_first or shared_second)
+
+
+class TestGetDataCoalescing(unittest.TestCase):
+    def test_concurrent_get_data_fetches_once(self):
+        """
+        Scenariusz: dashboard i zadanie wsadowe jednocześnie pobierają ten sam ticker.
+        Oczekiwane: jedno wywołanie fetch_yahoo_data, każdy dostaje własną kopię danych.
+        """
+        loader = SlowLoader()
+
+        with patch("services.data_service.fetch_yahoo_data", side_effect=loader):
+            results = run_concurrently(lambda i: get_data("COALESCE_TEST", start_date="2024-06-01"))
+
+        self.assertEqual(loader.calls, 1)
+        frames = [df for df, error in results]
+        self.assertTrue(all(error is None for _, error in results))
+        self.assertEqual(len({id(df) for df in frames}), len(frames))
+        for df in frames[1:]:
+            pd.testing.assert_frame_equal(df, frames[0])
+
+    def test_concurrent_get_data_propagates_errors(self):
+        """
+        Scenariusz: pobieranie danych kończy się błędem.
+        Oczekiwane: błąd zgłoszony każdemu wywołującemu, jedno wywołanie fetch.
+        """
+        loader = SlowLoader(error=ValueError("Brak danych"))
+
+        with patch("services.data_service.fetch_yahoo_data", side_effect=loader):
+            results = run_concurrently(lambda i: get_data("COALESCE_ERROR", start_date="2024-06-01"))
+
+        self.assertEqual(loader.calls, 1)
+        self.assertTrue(all(isinstance(error, ValueError) for _, error in results))
+
+    def test_different_intervals_are_separate_keys(self):
+        """
+        Scenariusz: równoległe żądania o dane dzienne i miesięczne tego samego tickera.
+        Oczekiwane: osobne klucze (różne wyniki), poprawne kształty danych.
+        """
+        loader = SlowLoader()
+
+        with patch("services.data_service.fetch_yahoo_data", side_effect=loader):
+            results = run_concurrently(
+                lambda i: get_data("COALESCE_INTERVAL", start_date="2024-06-01", interval="M" if i % 2 else None),
+                n=8,
+            )
+
+        self.assertEqual(loader.calls, 2)
+        lengths = sorted({len(df) for df, _ in results})
+        self.assertEqual(lengths, [12, len(create_daily_dataframe())])
+
+
+if __name__ == '__main__':
+    unittest.main()
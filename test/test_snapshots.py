@@ -0,0 +1,127 @@
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import data_service
+from services.snapshots import SnapshotStore, replay
+from services.storage import PRICE_COLUMNS, CsvYearStorage, get_storage
+from services.yahoo_client import fetch_yahoo_data
+from utils import clock
+from utils.clock import FixedClock, use_clock
+
+
+def create_daily_dataframe(start, end, base=100.0):
+    dates = pd.bdate_range(start, end, name="Date")
+    close = np.linspace(base, base * 1.3, len(dates))
+    return pd.DataFrame({column: close for column in PRICE_COLUMNS}, index=dates)
+
+
+def test_fixed_clock_and_restore():
+    with use_clock(FixedClock("2024-02-29T16:00:00")) as fixed:
+        assert clock.today() == pd.Timestamp("2024-02-29").date()
+        fixed.advance(days=1)
+        assert clock.now().isoformat() == "2024-03-01T16:00:00"
+
+    assert clock.get_clock().__class__.__name__ == "SystemClock"
+
+
+def test_snapshots_share_unchanged_files(tmp_path):
+    raw = tmp_path / "raw"
+    cache = CsvYearStorage(raw)
+    store = SnapshotStore(tmp_path / "snapshots", source=raw)
+
+    cache.upsert("SPY", create_daily_dataframe("2022-01-03", "2023-06-30"))
+    with use_clock(FixedClock("2023-06-30T22:00:00")):
+        first = store.create("czerwiec")
+
+    # Rewizja Adj Close w bieżącym roku + nowe notowania; rocznik 2022 bez zmian
+    revised = create_daily_dataframe("2023-01-02", "2023-07-31", base=95.0)
+    cache.upsert("SPY", revised)
+    with use_clock(FixedClock("2023-07-31T22:00:00")):
+        second = store.create("lipiec")
+
+    files_first = store.manifest(first)["files"]
+    files_second = store.manifest(second)["files"]
+    assert files_first["SPY_2022.csv"] == files_second["SPY_2022.csv"]
+    assert files_first["SPY_2023.csv"] != files_second["SPY_2023.csv"]
+
+    usage = store.disk_usage()
+    assert usage["objects"] == 3
+    assert usage["stored_bytes"] < usage["logical_bytes"]
+
+    assert store.latest(as_of="2023-07-15")["id"] == first
+    assert store.latest()["id"] == second
+
+
+def test_replay_reconstructs_past_inputs_offline(tmp_path):
+    raw = tmp_path / "raw"
+    cache = CsvYearStorage(raw)
+    store = SnapshotStore(tmp_path / "snapshots", source=raw)
+
+    original = create_daily_dataframe("2023-01-02", "2023-06-30")
+    cache.upsert("SPY", original)
+    with use_clock(FixedClock("2023-06-30T22:00:00")):
+        snapshot_id = store.create()
+
+    # Cache później nadpisany (rewizja historii)
+    cache.upsert("SPY", original * 0.9)
+
+    with patch("services.yahoo_client.yf.download") as mock_download:
+        with replay(snapshot_id, store=store):
+            replayed = fetch_yahoo_data("SPY", "2023-01-01")
+            assert clock.today() == pd.Timestamp("2023-06-30").date()
+
+    mock_download.assert_not_called()
+    pd.testing.assert_frame_equal(replayed, original, check_freq=False)
+
+
+def test_restore_links_objects_and_gc_removes_unreferenced(tmp_path):
+    raw = tmp_path / "raw"
+    cache = CsvYearStorage(raw)
+    store = SnapshotStore(tmp_path / "snapshots", source=raw)
+
+    cache.upsert("SPY", create_daily_dataframe("2023-01-02", "2023-03-31"))
+    first = store.create()
+    cache.upsert("SPY", create_daily_dataframe("2023-01-02", "2023-04-28"))
+    second = store.create()
+
+    restored = store.restore(second, tmp_path / "restored")
+    object_path = store._object_path(store.manifest(second)["files"]["SPY_2023.csv"])
+    assert os.path.samefile(restored / "SPY_2023.csv", object_path)
+
+    store.delete(first)
+    assert store.gc() == 1
+    with pytest.raises(ValueError):
+        store.manifest(first)
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "memmap"])
+def test_replay_uses_snapshot_of_configured_backend(tmp_path, backend):
+    source = tmp_path / ("prices.sqlite" if backend == "sqlite" else "memmap")
+    live = get_storage(backend, source)
+    store = SnapshotStore(tmp_path / "snapshots", source=source, backend=backend)
+
+    original = create_daily_dataframe("2023-01-02", "2023-06-30")
+    live.upsert("SPY", original)
+    live.set_covered_from("SPY", "2023-01-01")
+    with use_clock(FixedClock("2023-06-30T22:00:00")):
+        snapshot_id = store.create()
+    assert store.manifest(snapshot_id)["backend"] == backend
+
+    # Bieżący backend później zrewidowany – replay musi czytać stan ze snapshotu
+    live.upsert("SPY", original * 0.9)
+
+    # Świece w pamięci procesu nie przechodzą do replay
+    data_service._bar_cache.get(("SPY",), original, bar_type="monthly")
+
+    with patch("services.yahoo_client.yf.download") as mock_download:
+        with replay(snapshot_id, store=store):
+            assert not data_service._bar_cache._entries
+            replayed = fetch_yahoo_data("SPY", "2023-01-01")
+
+    mock_download.assert_not_called()
+    pd.testing.assert_frame_equal(replayed, original, check_freq=False)
+    pd.testing.assert_frame_equal(live.read("SPY"), original * 0.9, check_freq=False)
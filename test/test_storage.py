@@ -0,0 +1,257 @@
+import os
+import sqlite3
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from services.storage import PRICE_COLUMNS, CsvYearStorage, MemmapPriceStorage, SQLitePriceStorage, get_storage
+from services.yahoo_client import fetch_yahoo_data
+from utils.clock import FixedClock, use_clock
+
+
+def create_daily_dataframe(start="2023-01-02", end="2023-03-31", freq="B"):
+    dates = pd.date_range(start, end, freq=freq, name="Date")
+    close = np.linspace(100, 120, len(dates))
+    return pd.DataFrame({column: close for column in PRICE_COLUMNS}, index=dates)
+
+
+def yahoo_frame(df):
+    # Ramka w formacie yf.download (bez kolumny Price)
+    return df.drop(columns="Price")
+
+
+def test_sqlite_upsert_and_range_query(tmp_path):
+    storage = SQLitePriceStorage(tmp_path / "prices.sqlite")
+    df = create_daily_dataframe()
+
+    storage.upsert("SPY", df)
+    storage.upsert("SPY", df.iloc[-5:] * 2)  # korekta ostatnich dni
+
+    result = storage.read("SPY", "2023-02-01", "2023-03-31")
+
+    assert result.index.min() >= pd.Timestamp("2023-02-01")
+    assert list(result.columns) == PRICE_COLUMNS
+    assert result["Close"].iloc[-1] == df["Close"].iloc[-1] * 2
+    assert storage.date_range("SPY") == (df.index[0], df.index[-1])
+
+
+def test_sqlite_multi_ticker_read_and_wal(tmp_path):
+    storage = SQLitePriceStorage(tmp_path / "prices.sqlite")
+    storage.upsert("SPY", create_daily_dataframe())
+    storage.upsert("VEU", create_daily_dataframe("2023-02-01"))
+
+    result = storage.read_many(["SPY", "VEU", "MISSING"], start="2023-03-01")
+
+    assert set(result) == {"SPY", "VEU"}
+    assert storage.tickers() == ["SPY", "VEU"]
+
+    mode = sqlite3.connect(tmp_path / "prices.sqlite").execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_csv_storage_matches_sqlite(tmp_path):
+    df = create_daily_dataframe("2022-11-01", "2023-02-28")
+    csv = CsvYearStorage(tmp_path / "raw")
+    sqlite = get_storage("sqlite", tmp_path / "prices.sqlite")
+
+    for storage in (csv, sqlite):
+        storage.upsert("SPY", df)
+
+    pd.testing.assert_frame_equal(
+        csv.read("SPY", "2022-12-15"), sqlite.read("SPY", "2022-12-15"), check_freq=False
+    )
+    assert csv.tickers() == ["SPY"]
+    assert csv.covered_from("SPY") == pd.Timestamp("2022-01-01")
+
+
+def test_csv_storage_lists_directory_once_per_change(tmp_path):
+    csv = CsvYearStorage(tmp_path)
+    csv.upsert("SPY", create_daily_dataframe("2022-11-01", "2023-02-28"))
+
+    with patch("services.storage.os.listdir", wraps=os.listdir) as listdir:
+        for _ in range(3):
+            csv.read_many(["SPY", "VEU"], "2022-12-01")
+            csv.covered_from("SPY")
+            csv.tickers()
+        assert listdir.call_count == 1
+
+        csv.upsert("VEU", create_daily_dataframe())
+        assert csv.tickers() == ["SPY", "VEU"]
+        assert listdir.call_count == 2
+
+
+def test_fetch_with_sqlite_storage_downloads_only_missing_data(tmp_path):
+    storage = SQLitePriceStorage(tmp_path / "prices.sqlite")
+    today = pd.Timestamp("2024-12-31")
+    # Notowania codzienne aż do "dziś" (zegar zatrzymany), więc wynik nie zależy od daty uruchomienia
+    history = create_daily_dataframe("2023-01-02", today, freq="D")
+
+    def fake_download(ticker, start=None, end=None, **kwargs):
+        df = history.loc[pd.Timestamp(start):]
+        if end is not None:
+            df = df.loc[:pd.Timestamp(end) - pd.Timedelta(days=1)]
+        return yahoo_frame(df)
+
+    with patch("services.yahoo_client.yf.download", side_effect=fake_download) as mock_download, \
+            use_clock(FixedClock(today)):
+        first = fetch_yahoo_data("SPY", "2024-01-01", storage=storage)
+        calls_after_first = mock_download.call_count
+
+        second = fetch_yahoo_data("SPY", "2024-06-01", storage=storage)
+        assert mock_download.call_count == calls_after_first
+
+        earlier = fetch_yahoo_data("SPY", "2023-06-01", storage=storage)
+
+    assert first.index.min() >= pd.Timestamp("2024-01-01")
+    assert second.index.min() >= pd.Timestamp("2024-06-01")
+    assert earlier.index.min() == pd.Timestamp("2023-06-01")
+    assert len(earlier) == len(history.loc["2023-06-01":])
+
+
+def test_empty_download_does_not_mark_range_as_covered(tmp_path):
+    today = pd.Timestamp("2024-12-31")
+    history = create_daily_dataframe("2024-01-01", today, freq="D")
+    # Pierwsze pobranie puste (chwilowa awaria Yahoo), kolejne zwracają dane
+    responses = [pd.DataFrame(), yahoo_frame(history)]
+
+    for storage in (SQLitePriceStorage(tmp_path / "prices.sqlite"), MemmapPriceStorage(tmp_path / "memmap")):
+        with patch("services.yahoo_client.yf.download", side_effect=list(responses)) as mock_download, \
+                use_clock(FixedClock(today)):
+            assert fetch_yahoo_data("SPY", "2024-01-01", storage=storage).empty
+            assert storage.covered_from("SPY") is None
+
+            retried = fetch_yahoo_data("SPY", "2024-01-01", storage=storage)
+
+        assert mock_download.call_count == 2
+        assert len(retried) == len(history)
+        assert storage.covered_from("SPY") == pd.Timestamp("2024-01-01")
+
+def test_empty_download_before_listing_is_retried_after_ttl(tmp_path):
+    today = pd.Timestamp("2024-12-31")
+    history = create_daily_dataframe("2024-01-01", today, freq="D")
+    clock = FixedClock(today)
+
+    for storage in (
+        CsvYearStorage(tmp_path / "raw"),
+        SQLitePriceStorage(tmp_path / "prices.sqlite"),
+        MemmapPriceStorage(tmp_path / "memmap"),
+    ):
+        responses = [yahoo_frame(history), pd.DataFrame(), pd.DataFrame()]
+        with patch("services.yahoo_client.yf.download", side_effect=responses) as mock_download, \
+                use_clock(clock):
+            fetch_yahoo_data("SPY", "2024-01-01", storage=storage)
+
+            # Zakres sprzed pierwszej notowanej sesji: jedna próba, potem odczyt z cache
+            for _ in range(3):
+                earlier = fetch_yahoo_data("SPY", "2023-06-01", storage=storage)
+                assert len(earlier) == len(history)
+            assert mock_download.call_count == 2
+            assert storage.empty_download("SPY") == (pd.Timestamp("2023-06-01"), today)
+
+            # Wcześniejszy początek niż zapisana próba → nowe pobranie
+            fetch_yahoo_data("SPY", "2023-01-01", storage=storage)
+            assert mock_download.call_count == 3
+
+            # Po EMPTY_DOWNLOAD_RETRY próba jest powtarzana
+            clock.advance(hours=7)
+            with patch("services.yahoo_client.yf.download", return_value=pd.DataFrame()) as retry:
+                fetch_yahoo_data("SPY", "2023-06-01", storage=storage)
+            retry.assert_called_once()
+        clock = FixedClock(today)
+
+
+def test_read_projects_requested_columns(tmp_path):
+    csv = CsvYearStorage(tmp_path / "raw")
+    sqlite = SQLitePriceStorage(tmp_path / "prices.sqlite")
+    memmap = MemmapPriceStorage(tmp_path / "memmap")
+
+    for storage in (csv, sqlite, memmap):
+        storage.upsert("SPY", create_daily_dataframe())
+        result = storage.read("SPY", columns=["Adj Close"])
+        assert list(result.columns) == ["Adj Close"]
+        assert list(storage.read("MISSING", columns=["Adj Close"]).columns) == ["Adj Close"]
+        # Precyzja nadawana przy odczycie (także dla pustego wyniku)
+        assert storage.read("SPY", columns=["Adj Close"], dtype="float32")["Adj Close"].dtype == np.float32
+        assert storage.read("MISSING", dtype="float32")["Close"].dtype == np.float32
+
+
+def test_fetch_projects_columns_and_downcasts(tmp_path):
+    today = pd.Timestamp("2024-12-31")
+    history = create_daily_dataframe("2023-01-02", today, freq="D")
+
+    for storage in (
+        CsvYearStorage(tmp_path / "raw"),
+        SQLitePriceStorage(tmp_path / "prices.sqlite"),
+        MemmapPriceStorage(tmp_path / "memmap"),
+    ):
+        storage.upsert("SPY", history)
+        storage.set_covered_from("SPY", history.index[0])
+
+        with patch("services.yahoo_client.yf.download") as mock_download, use_clock(FixedClock(today)):
+            full = fetch_yahoo_data("SPY", "2024-01-01", storage=storage)
+            projected = fetch_yahoo_data(
+                "SPY", "2024-01-01", resample_interval="M", storage=storage,
+                columns=["Adj Close"], dtype="float32",
+            )
+
+        mock_download.assert_not_called()
+        assert list(projected.columns) == ["Adj Close"]
+        assert projected["Adj Close"].dtype == np.float32
+        np.testing.assert_allclose(
+            projected["Adj Close"].to_numpy(),
+            full["Adj Close"].resample("M").last().to_numpy(),
+            rtol=1e-6,
+        )
+
+
+def test_memmap_view_is_zero_copy_slice(tmp_path):
+    df = create_daily_dataframe("2022-11-01", "2023-02-28")
+    storage = get_storage("memmap", tmp_path / "memmap")
+    storage.upsert("SPY", df)
+
+    dates, values = storage.view("SPY", "2022-12-15", "2023-01-31", columns=["Adj Close"])
+
+    expected = df.loc["2022-12-15":"2023-01-31"]
+    assert dates.dtype == np.int32
+    assert list(values) == ["Adj Close"]
+    np.testing.assert_array_equal(values["Adj Close"], expected["Adj Close"].to_numpy())
+    # Widok na zmapowany plik – bez kopii i tylko do odczytu
+    full_dates, full_values = storage.view("SPY")
+    assert np.shares_memory(values["Adj Close"], full_values["Adj Close"])
+    assert isinstance(values["Adj Close"], np.memmap)
+    assert not values["Adj Close"].flags.writeable
+
+    csv = CsvYearStorage(tmp_path / "raw")
+    csv.upsert("SPY", df)
+    pd.testing.assert_frame_equal(storage.read("SPY", "2022-12-15"), csv.read("SPY", "2022-12-15"), check_freq=False)
+    assert storage.date_range("SPY") == (df.index[0], df.index[-1])
+    assert storage.tickers() == ["SPY"]
+
+
+def test_memmap_appends_new_bars_and_rewrites_corrections(tmp_path):
+    df = create_daily_dataframe("2023-01-02", "2023-03-31")
+    storage = MemmapPriceStorage(tmp_path / "memmap")
+    storage.upsert("SPY", df.loc[:"2023-02-28"])
+    dates_before, _ = storage.view("SPY")
+
+    # Dopisanie nowych notowań na końcu plików
+    storage.upsert("SPY", df.loc["2023-03-01":])
+    assert os.path.getsize(tmp_path / "memmap" / "SPY" / "date.i4") == 4 * len(df)
+    pd.testing.assert_frame_equal(storage.read("SPY"), df, check_freq=False)
+    # Wcześniej pobrany widok nadal poprawny (starsza, krótsza seria)
+    assert len(dates_before) == len(df.loc[:"2023-02-28"])
+
+    # Inny czytelnik (np. inny proces) widzi dopisane dane
+    assert MemmapPriceStorage(tmp_path / "memmap").date_range("SPY")[1] == df.index[-1]
+
+    # Korekta wcześniejszych dni → przepisanie kolumn
+    storage.upsert("SPY", df.loc["2023-01-10":"2023-01-12"] * 2)
+    result = storage.read("SPY")
+    assert len(result) == len(df)
+    assert result.loc["2023-01-11", "Close"] == df.loc["2023-01-11", "Close"] * 2
+
+    storage.set_covered_from("SPY", "2023-01-01")
+    storage.set_covered_from("SPY", "2023-02-01")
+    assert storage.covered_from("SPY") == pd.Timestamp("2023-01-01")
+    assert storage.read("MISSING").empty
@@ -0,0 +1,79 @@
+from functools import partial
+
+import pytest
+
+from strategy.backtest import backtest_gem
+from strategy.gem import gem_decision
+from visualisation.tables import DecisionTable, StatisticsTable, top_configurations
+
+START_DATE = "2016-01-01"
+
+
+@pytest.fixture
+def create_assets(create_assets):
+    return partial(create_assets, seed=13, drift=0.004, volatility=0.05, tickers=("SPY", "VEU", "BND"))
+
+
+def test_decision_page_matches_gem_decision(create_assets):
+    assets = create_assets()
+    table = DecisionTable(assets, START_DATE, page_size=9)
+
+    page = table.page(2, formatted=False)
+
+    assert len(page) == 9
+    for _, row in page.iterrows():
+        current = {role: df.loc[:row["Date"]] for role, df in assets.items()}
+        expected_role = gem_decision(current)["decisions"][row["Horizon"]]
+        assert row["Role"] == expected_role
+        assert row["Ticker"] == assets[expected_role].attrs["ticker"]
+
+
+def test_decision_table_filter_and_sort(create_assets):
+    table = DecisionTable(create_assets(), START_DATE, page_size=10)
+
+    page = table.page(0, sort_by="Momentum US", ascending=False, horizon="12M", formatted=False)
+
+    assert (page["Horizon"] == "12M").all()
+    assert page["Momentum US"].is_monotonic_decreasing
+
+    defensive = table.page(0, role="defensive", formatted=False)
+    assert (defensive["Signal"] == "risk_off").all()
+
+
+def test_decision_table_formats_only_page(create_assets):
+    table = DecisionTable(create_assets(), START_DATE, page_size=5)
+
+    page = table.page(0)
+
+    assert len(page) == 5
+    assert page["Date"].iloc[0] == "2016-01-31"
+    with pytest.raises(IndexError):
+        table.page(table.n_pages)
+
+
+def sweep_results(create_assets, n):
+    # Generator: wyniki backtestu dla kolejnych konfiguracji (tu: różne dane)
+    for seed in range(n):
+        yield f"config_{seed}", backtest_gem(create_assets(seed=seed), START_DATE)
+
+
+def test_statistics_table_top_and_page(create_assets):
+    table = StatisticsTable.from_results(sweep_results(create_assets, 6), page_size=4)
+
+    assert len(table) == 18
+
+    top = table.top(3, by="CAGR", horizon="12M", formatted=False)
+    all_12m = table.page(0, sort_by="CAGR", horizon="12M", formatted=False)
+    assert top["Config"].tolist() == all_12m["Config"].iloc[:3].tolist()
+    assert top["CAGR"].is_monotonic_decreasing
+
+    filtered = table.page(0, min_values={"Sharpe": 0.0}, formatted=False)
+    assert (filtered["Sharpe"] >= 0).all()
+
+
+def test_streaming_top_configurations(create_assets):
+    expected = StatisticsTable.from_results(sweep_results(create_assets, 6)).top(2, by="Sharpe", horizon="6M")
+
+    result = top_configurations(sweep_results(create_assets, 6), n=2, by="Sharpe", horizon="6M")
+
+    assert result["Config"].tolist() == expected["Config"].tolist()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy.backtest import backtest_gem
+from strategy.triplets import candidate_triplets, screen_triplets
+from utils.metrics import STATISTICS
+
+START_DATE = "2016-01-01"
+TICKERS = ["SPY", "VEU", "BND", "EEM", "QQQ", "TLT"]
+
+
+def create_universe(periods=60):
+    dates = pd.date_range(start="2014-06-30", periods=periods, freq="M")
+    rng = np.random.default_rng(3)
+
+    frames = {}
+    for ticker in TICKERS:
+        returns = rng.normal(0.004, 0.04, len(dates))
+        frames[ticker] = pd.DataFrame({"Close": 100 * np.cumprod(1 + returns)}, index=dates)
+    # Remis momentum między dwoma aktywami: wygrywa equity_us (>=)
+    frames["QQQ"] = frames["SPY"].copy()
+
+    return frames
+
+
+def reference_statistics(frames, us, exus, defensive):
+    assets = {"equity_us": frames[us], "equity_exus": frames[exus], "defensive": frames[defensive]}
+    return backtest_gem(assets, START_DATE)["statistics"]
+
+
+def test_candidate_triplets_are_distinct_assets():
+    triplets = candidate_triplets(TICKERS)
+
+    assert len(triplets) == 6 * 5 * 4
+    assert (triplets[:, 0] != triplets[:, 1]).all()
+    assert (triplets[:, 2] != triplets[:, 0]).all() and (triplets[:, 2] != triplets[:, 1]).all()
+
+    restricted = candidate_triplets(TICKERS, equity_us=["SPY"], defensive=["BND", "TLT"])
+    # exUS spoza BND/TLT: 3 × 2 defensywne; exUS = BND lub TLT: 2 × 1
+    assert len(restricted) == 3 * 2 + 2 * 1
+
+
+def test_screen_matches_reference_backtest():
+    frames = create_universe()
+
+    table = screen_triplets(frames, START_DATE)
+
+    assert len(table) == 6 * 5 * 4 * 3
+    for us, exus, defensive in [("SPY", "VEU", "BND"), ("QQQ", "SPY", "TLT"), ("EEM", "TLT", "VEU")]:
+        expected = reference_statistics(frames, us, exus, defensive)
+        rows = table[(table["US"] == us) & (table["exUS"] == exus) & (table["Defensive"] == defensive)]
+        for _, row in rows.iterrows():
+            for name in STATISTICS:
+                assert row[name] == pytest.approx(expected[row["Horizon"]][name], rel=1e-9)
+
+
+def test_screen_ranking_and_filters():
+    frames = create_universe()
+
+    table = screen_triplets(frames, START_DATE, by="CAGR", horizon="12M", top=10)
+
+    assert len(table) == 10
+    assert (table["Horizon"] == "12M").all()
+    assert table["CAGR"].is_monotonic_decreasing
+
+
+def test_screen_parallel_matches_serial():
+    frames = create_universe()
+
+    serial = screen_triplets(frames, START_DATE, chunk_size=17)
+    parallel = screen_triplets(frames, START_DATE, workers=2, chunk_size=17)
+
+    pd.testing.assert_frame_equal(serial, parallel)
@@ -0,0 +1,81 @@
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+
+class SystemClock:
+    """
+    Zegar systemowy (domyślny).
+    """
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def today(self) -> date:
+        return self.now().date()
+
+    def __repr__(self):
+        return "SystemClock()"
+
+
+class FixedClock(SystemClock):
+    """
+    Zegar zatrzymany w podanej chwili – powtarzalne uruchomienia "na dzień" (as-of).
+    advance() przesuwa czas, np. w testach kolejnych dni.
+    """
+
+    def __init__(self, moment):
+        if isinstance(moment, str):
+            moment = datetime.fromisoformat(moment)
+        elif isinstance(moment, date) and not isinstance(moment, datetime):
+            moment = datetime(moment.year, moment.month, moment.day)
+        elif hasattr(moment, "to_pydatetime"):
+            moment = moment.to_pydatetime()
+        self._moment = moment
+
+    def now(self) -> datetime:
+        return self._moment
+
+    def advance(self, **kwargs) -> None:
+        self._moment += timedelta(**kwargs)
+
+    def __repr__(self):
+        return f"FixedClock({self._moment.isoformat()})"
+
+
+_lock = threading.Lock()
+_clock = SystemClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(clock) -> object:
+    """
+    Ustawia zegar używany przez aplikację; zwraca poprzedni.
+    """
+    global _clock
+    with _lock:
+        previous, _clock = _clock, clock
+    return previous
+
+
+@contextmanager
+def use_clock(clock):
+    """
+    Tymczasowa podmiana zegara (np. FixedClock na czas odtwarzania snapshotu).
+    """
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
+
+
+def now() -> datetime:
+    return _clock.now()
+
+
+def today() -> date:
+    return _clock.today()
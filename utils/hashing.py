@@ -0,0 +1,69 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.panel import PricePanel
+
+# Katalog główny projektu (moduły strategii wersjonowane są względem niego)
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Skrót zawartości DataFrame: indeks, kolumny, typy, wartości i attrs["ticker"].
+    Dwa DataFrame o tych samych danych dają ten sam skrót niezależnie od procesu.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(str(df.attrs.get("ticker", "")).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def panel_fingerprint(panel: PricePanel) -> str:
+    """
+    Skrót zawartości PricePanel (daty, wartości, kolumny, tickery).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((panel.columns, panel.column, sorted(panel.tickers.items()))).encode())
+    h.update(np.ascontiguousarray(panel.dates).tobytes())
+    h.update(np.ascontiguousarray(panel.values).tobytes())
+    return h.hexdigest()
+
+
+def data_fingerprint(data) -> str:
+    """
+    Skrót danych wejściowych: DataFrame, PricePanel albo dict {nazwa: DataFrame}.
+    """
+    if isinstance(data, PricePanel):
+        return panel_fingerprint(data)
+    if isinstance(data, pd.DataFrame):
+        return frame_fingerprint(data)
+    if isinstance(data, dict):
+        return fingerprint({name: data_fingerprint(df) for name, df in data.items()})
+    raise TypeError(f"Nieobsługiwany typ danych: {type(data).__name__}")
+
+
+def fingerprint(*parts) -> str:
+    """
+    Stabilny skrót parametrów (JSON z posortowanymi kluczami, str() dla innych typów).
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_version(*modules: str) -> str:
+    """
+    Skrót kodu źródłowego podanych modułów (ścieżki względem katalogu projektu).
+    Zmiana logiki strategii unieważnia wyniki zapisane w cache.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for module in modules:
+        h.update(module.encode())
+        h.update((_ROOT / module).read_bytes())
+    return h.hexdigest()
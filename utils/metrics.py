@@ -0,0 +1,58 @@
+import numpy as np
+
+# Statystyki portfela w kolejności używanej w tabelach wyników
+STATISTICS = ("CAGR", "Max Drawdown", "Volatility", "Sharpe")
+
+# Miesięczne świece → 12 okresów w roku
+PERIODS_PER_YEAR = 12
+
+
+def equity_curve(returns: np.ndarray, axis: int = 0) -> np.ndarray:
+    """
+    Wartość portfela (start od 1 jednostki) dla zwrotów okresowych wzdłuż osi axis.
+    """
+    return np.cumprod(1 + np.asarray(returns, dtype=np.float64), axis=axis)
+
+
+def performance_statistics(returns: np.ndarray, axis: int = 0) -> dict:
+    """
+    Statystyki portfela liczone wektorowo dla wielu serii zwrotów naraz.
+
+    Definicje jak w strategy.backtest.backtest_gem:
+    - CAGR = equity[-1] ** (12 / liczba miesięcy) - 1
+    - Max Drawdown = min(equity / max dotychczasowe - 1)
+    - Volatility = odchylenie standardowe (ddof=1) * sqrt(12)
+    - Sharpe = CAGR / Volatility (NaN, gdy zmienność = 0)
+
+    Args:
+        returns: tablica zwrotów miesięcznych, czas wzdłuż osi axis
+        axis: oś czasu
+
+    Returns:
+        dict {statystyka: np.ndarray} – kształt returns bez osi czasu
+    """
+    returns = np.moveaxis(np.asarray(returns, dtype=np.float64), axis, 0)
+    n_periods = returns.shape[0]
+    shape = returns.shape[1:]
+
+    if n_periods == 0:
+        return {name: np.full(shape, np.nan) for name in STATISTICS}
+
+    equity = np.cumprod(1 + returns, axis=0)
+    cagr = equity[-1] ** (PERIODS_PER_YEAR / n_periods) - 1
+    max_drawdown = (equity / np.maximum.accumulate(equity, axis=0) - 1).min(axis=0)
+
+    if n_periods > 1:
+        volatility = returns.std(axis=0, ddof=1) * np.sqrt(PERIODS_PER_YEAR)
+    else:
+        volatility = np.full(shape, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(volatility != 0, cagr / volatility, np.nan)
+
+    return {
+        "CAGR": cagr,
+        "Max Drawdown": max_drawdown,
+        "Volatility": volatility,
+        "Sharpe": sharpe,
+    }
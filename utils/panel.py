@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+
+class PricePanel:
+    """
+    Wyrównany panel cen: wspólna oś dat × kolumny (role lub tickery).
+
+    - dates: np.ndarray datetime64[ns], kształt (T,)
+    - values: np.ndarray float64, kształt (T, N); kolumna j odpowiada columns[j]
+    - column: nazwa kolumny cenowej, z której zbudowano panel (np. "Close")
+    - tickers: mapowanie kolumna -> ticker (jak attrs["ticker"] w backteście)
+
+    Panel nie kopiuje przekazanych tablic, dzięki czemu może opakowywać
+    widoki na pamięć współdzieloną (utils.shared_panel).
+    """
+
+    def __init__(self, dates, values, columns, column: str = "Close", tickers: dict = None):
+        values = np.asarray(values)
+        columns = tuple(columns)
+
+        if values.ndim != 2 or values.shape != (len(dates), len(columns)):
+            raise ValueError(
+                f"Niezgodny kształt panelu: values {values.shape}, "
+                f"dates {len(dates)}, columns {len(columns)}"
+            )
+
+        self.dates = np.asarray(dates, dtype="datetime64[ns]")
+        self.values = values
+        self.columns = columns
+        self.column = column
+        self.tickers = dict(tickers) if tickers else {name: name for name in columns}
+
+    @classmethod
+    def from_frames(cls, frames: dict, column: str = "Close") -> "PricePanel":
+        """
+        Buduje panel z dict {nazwa: pd.DataFrame}, wyrównując daty (część wspólna).
+
+        DataFrame może mieć DatetimeIndex albo kolumnę 'Date' (format z data_service).
+        Ticker brany jest z df.attrs["ticker"], jeśli został ustawiony.
+        """
+        series = {}
+        tickers = {}
+
+        for name, df in frames.items():
+            if "Date" in df.columns:
+                df = df.set_index("Date")
+            series[name] = df[column]
+            tickers[name] = df.attrs.get("ticker", name)
+
+        aligned = pd.concat(series, axis=1, join="inner").sort_index()
+
+        return cls(
+            dates=aligned.index.to_numpy(dtype="datetime64[ns]"),
+            values=aligned.to_numpy(dtype=np.float64),
+            columns=aligned.columns,
+            column=column,
+            tickers=tickers,
+        )
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.dates, name="Date")
+
+    def column_index(self, name: str) -> int:
+        try:
+            return self.columns.index(name)
+        except ValueError:
+            raise KeyError(f"Brak kolumny '{name}' w panelu: {self.columns}") from None
+
+    def series(self, name: str) -> pd.Series:
+        """
+        Zwraca kolumnę panelu jako pd.Series (widok, bez kopiowania danych).
+        """
+        values = self.values[:, self.column_index(name)]
+        return pd.Series(values, index=self.index, name=self.column, copy=False)
+
+    def to_frames(self) -> dict:
+        """
+        Zwraca dict {nazwa: pd.DataFrame} z jedną kolumną cenową (self.column),
+        w formacie oczekiwanym przez backtest_gem (DatetimeIndex, attrs["ticker"]).
+        """
+        frames = {}
+
+        for name in self.columns:
+            df = self.series(name).to_frame()
+            df.attrs["ticker"] = self.tickers.get(name, name)
+            frames[name] = df
+
+        return frames
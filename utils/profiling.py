@@ -0,0 +1,358 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+import pandas as pd
+
+from config import PROFILE_PATH
+
+# Etapy potoku mierzone w trybie profilowania (kolejność w raporcie)
+STAGES = ("fetch_yahoo_data", "get_data", "get_momentum", "GEM.evaluate", "backtest_gem")
+
+# Zmienna środowiskowa włączająca profilowanie testów (test/conftest.py): "1" albo katalog wyników
+PROFILE_ENV = "GEM_PROFILE"
+
+REPORT_COLUMNS = ["Stage", "Calls", "Wall [s]", "Self CPU [s]", "Peak Memory [MB]", "Samples"]
+HOT_SPOT_COLUMNS = ["Function", "Calls", "Self [s]", "Cumulative [s]"]
+
+# Aktywny profiler (None → dekoratory tylko wywołują funkcję) i profilery przykryte przez enable()
+_profiler = None
+_previous = []
+
+
+class _Frame:
+    # Jedno trwające wywołanie etapu w danym wątku
+    __slots__ = ("name", "start", "base_memory", "peak_memory", "profile", "boundary")
+
+    def __init__(self, name, profile, boundary, base_memory):
+        self.name = name
+        self.start = time.perf_counter()
+        self.base_memory = base_memory
+        self.peak_memory = base_memory
+        self.profile = profile
+        self.boundary = boundary
+
+
+class Profiler:
+    """
+    Profilowanie etapów potoku (STAGES, dekorator profiled / kontekst stage).
+
+    - cProfile per etap: czas własny etapu – na czas etapu zagnieżdżonego
+      (np. fetch_yahoo_data wewnątrz get_data) profil zewnętrzny jest wstrzymany,
+    - tracemalloc: szczyt pamięci ponad poziom z wejścia do etapu (łącznie z etapami
+      zagnieżdżonymi; przy równoległych etapach w wielu wątkach – szczyt procesu),
+    - wątek próbkujący co `interval` s stosy wątków będących w etapie → format
+      "collapsed" (flamegraph.pl, speedscope, inferno).
+    """
+
+    def __init__(self, interval: float = 0.005, memory: bool = True):
+        self.interval = interval
+        self.memory = memory
+        self.calls = Counter()
+        self.wall = Counter()
+        self.peak_memory = Counter()
+        self.profiles = {}  # (etap, id wątku) → cProfile.Profile (profil nie jest współdzielony między wątkami)
+        self.samples = Counter()
+
+        self._lock = threading.Lock()
+        self._stacks = {}  # id wątku → lista _Frame
+        self._stop = threading.Event()
+        self._sampler = None
+        self._owns_tracemalloc = False
+
+    # --------------------------------------------------
+    # START / STOP
+    # --------------------------------------------------
+    def start(self) -> "Profiler":
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiling-sampler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self) -> "Profiler":
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+        return self
+
+    # --------------------------------------------------
+    # ETAPY
+    # --------------------------------------------------
+    def enter(self, name: str, boundary=None) -> None:
+        """
+        Początek etapu w bieżącym wątku; boundary – ramka, na której kończy się
+        próbkowany stos (wywołujący etap).
+        """
+        with self._lock:
+            stack = self._stacks.setdefault(threading.get_ident(), [])
+            profile = self.profiles.setdefault((name, threading.get_ident()), cProfile.Profile())
+            base_memory = self._fold_peak()
+
+        if stack and stack[-1].profile is not None:
+            stack[-1].profile.disable()
+
+        frame = _Frame(name, profile, boundary, base_memory)
+        try:
+            profile.enable()
+        except ValueError:
+            # Inne narzędzie profilujące jest aktywne – etap bez statystyk cProfile
+            frame.profile = None
+        with self._lock:
+            stack.append(frame)
+
+    def exit(self) -> None:
+        with self._lock:
+            stack = self._stacks[threading.get_ident()]
+            frame = stack[-1]
+
+        if frame.profile is not None:
+            frame.profile.disable()
+        elapsed = time.perf_counter() - frame.start
+
+        with self._lock:
+            self._fold_peak()
+            stack.pop()
+            self.calls[frame.name] += 1
+            self.wall[frame.name] += elapsed
+            self.peak_memory[frame.name] = max(self.peak_memory[frame.name], frame.peak_memory - frame.base_memory)
+            if not stack:
+                del self._stacks[threading.get_ident()]
+
+        if stack and stack[-1].profile is not None:
+            stack[-1].profile.enable()
+
+    def _fold_peak(self) -> int:
+        # Szczyt tracemalloc jest globalny: przed wyzerowaniem trafia do wszystkich trwających etapów
+        if not self.memory or not tracemalloc.is_tracing():
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        for stack in self._stacks.values():
+            for frame in stack:
+                frame.peak_memory = max(frame.peak_memory, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    # --------------------------------------------------
+    # PRÓBKOWANIE STOSÓW
+    # --------------------------------------------------
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        """
+        Jedna próbka stosów wszystkich wątków będących w etapie.
+        """
+        with self._lock:
+            active = {tid: (stack[0].name, stack[0].boundary) for tid, stack in self._stacks.items() if stack}
+        if not active:
+            return
+
+        frames = sys._current_frames()
+        for tid, (name, boundary) in active.items():
+            frame = frames.get(tid)
+            names = []
+            while frame is not None and frame is not boundary:
+                code = frame.f_code
+                names.append(f"{getattr(code, 'co_qualname', code.co_name)} "
+                             f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join([name, *reversed(names)])] += 1
+
+    # --------------------------------------------------
+    # RAPORTY
+    # --------------------------------------------------
+    def _stats(self, names=None):
+        stats = None
+        for (name, _), profile in self.profiles.items():
+            if names is not None and name not in names:
+                continue
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+        return stats
+
+    def report(self) -> pd.DataFrame:
+        """
+        Podsumowanie etapów (REPORT_COLUMNS): wywołania, czas ścienny (łącznie z etapami
+        zagnieżdżonymi), czas własny CPU z cProfile, szczyt pamięci, liczba próbek.
+        """
+        names = [s for s in STAGES if self.calls[s]] + sorted(s for s in self.calls if s not in STAGES)
+        stage_samples = Counter()
+        for stack, count in self.samples.items():
+            stage_samples[stack.split(";", 1)[0]] += count
+
+        rows = []
+        for name in names:
+            stats = self._stats([name])
+            rows.append([
+                name,
+                self.calls[name],
+                round(self.wall[name], 4),
+                round(stats.total_tt, 4) if stats is not None else None,
+                round(self.peak_memory[name] / 2 ** 20, 3),
+                stage_samples[name],
+            ])
+        return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+    def hot_spots(self, top: int = 10) -> pd.DataFrame:
+        """
+        Funkcje o największym czasie własnym (ze wszystkich etapów).
+        """
+        stats = self._stats()
+        if stats is None:
+            return pd.DataFrame(columns=HOT_SPOT_COLUMNS)
+
+        rows = [
+            [_label(*func), calls, round(tottime, 4), round(cumtime, 4)]
+            for func, (_, calls, tottime, cumtime, _) in stats.stats.items()
+        ]
+        hot = pd.DataFrame(rows, columns=HOT_SPOT_COLUMNS)
+        return hot.sort_values("Self [s]", ascending=False, kind="stable").head(top).reset_index(drop=True)
+
+    def collapsed(self) -> str:
+        """
+        Próbki stosów w formacie "collapsed": "ramka;ramka;... liczba" w każdej linii.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
+
+    def summary(self, top: int = 10) -> str:
+        with pd.option_context("display.width", 200, "display.max_colwidth", 100):
+            return (
+                "Etapy:\n" + self.report().to_string(index=False)
+                + f"\n\nNajwiększy czas własny (top {top}):\n" + self.hot_spots(top).to_string(index=False)
+            )
+
+    def write(self, path=None, top: int = 10) -> dict:
+        """
+        Zapisuje wyniki w katalogu path (domyślnie PROFILE_PATH):
+        {etap}.prof (pstats, np. snakeviz), stacks.folded (flame graph) i summary.txt.
+
+        Returns:
+            dict {nazwa: ścieżka} zapisanych plików
+        """
+        path = Path(path or PROFILE_PATH)
+        path.mkdir(parents=True, exist_ok=True)
+        files = {}
+
+        for name in self.calls:
+            stats = self._stats([name])
+            if stats is not None:
+                files[name] = path / f"{name}.prof"
+                stats.dump_stats(files[name])
+
+        files["stacks"] = path / "stacks.folded"
+        files["stacks"].write_text(self.collapsed(), encoding="utf-8")
+        files["summary"] = path / "summary.txt"
+        files["summary"].write_text(self.summary(top) + "\n", encoding="utf-8")
+        return files
+
+
+def _label(file_name: str, line: int, name: str) -> str:
+    # Funkcje wbudowane mają w pstats plik "~" i linię 0
+    return name if file_name == "~" else f"{os.path.basename(file_name)}:{line}({name})"
+
+
+def enable(interval: float = 0.005, memory: bool = True) -> Profiler:
+    """
+    Włącza profilowanie etapów (poprzedni aktywny profiler wraca po disable()).
+    """
+    global _profiler
+    _previous.append(_profiler)
+    _profiler = Profiler(interval, memory).start()
+    return _profiler
+
+
+def disable() -> Profiler:
+    """
+    Wyłącza aktywny profiler i go zwraca (None, gdy profilowanie nie było włączone).
+    """
+    global _profiler
+    profiler = _profiler
+    _profiler = _previous.pop() if _previous else None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def is_enabled() -> bool:
+    return _profiler is not None
+
+
+def env_path():
+    """
+    Katalog wyników z PROFILE_ENV: None – wyłączone, "1"/"true" – PROFILE_PATH.
+    """
+    value = os.environ.get(PROFILE_ENV, "").strip()
+    if value.lower() in ("", "0", "false", "no"):
+        return None
+    return PROFILE_PATH if value.lower() in ("1", "true", "yes") else Path(value)
+
+
+@contextmanager
+def profiling(path=None, interval: float = 0.005, memory: bool = True, top: int = 10):
+    """
+    Profilowanie bloku kodu; po wyjściu wyniki trafiają do path (Profiler.write).
+    """
+    profiler = enable(interval, memory)
+    try:
+        yield profiler
+    finally:
+        disable()
+        profiler.write(path, top)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Blok kodu mierzony jako etap (bez kosztu, gdy profilowanie jest wyłączone).
+    """
+    profiler = _profiler
+    if profiler is None:
+        yield
+        return
+    # Ramka wywołującego (with) należy do etapu – stos kończy się na jego rodzicu
+    profiler.enter(name, sys._getframe(2).f_back)
+    try:
+        yield
+    finally:
+        profiler.exit()
+
+
+def profiled(name: str):
+    """
+    Dekorator etapu potoku; przy wyłączonym profilowaniu – tylko sprawdzenie jednej zmiennej.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return fn(*args, **kwargs)
+            profiler.enter(name, sys._getframe())
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.exit()
+        return wrapper
+    return decorator
@@ -0,0 +1,202 @@
+# shared_panel.py
+# Publikacja panelu cen w pamięci współdzielonej (multiprocessing.shared_memory).
+# Odpowiada za:
+# - jednorazowe skopiowanie panelu do segmentu pamięci współdzielonej
+# - przekazywanie workerom lekkiego deskryptora zamiast całych DataFrame
+# - podpinanie widoków NumPy (zero-copy) po stronie workera
+# - sprzątanie segmentów przy zamykaniu puli procesów
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.panel import PricePanel
+
+# Segment: [daty int64 (T)] + [wartości float64 (T × N)], oba bloki wyrównane do 8 bajtów
+_DATE_DTYPE = np.dtype("int64")
+_VALUE_DTYPE = np.dtype("float64")
+
+# Segmenty podpięte w bieżącym procesie: nazwa -> (SharedMemory, PricePanel)
+_ATTACHED = {}
+
+
+class SharedPanelDescriptor:
+    """
+    Picklowalny opis panelu w pamięci współdzielonej.
+
+    Zawiera tylko nazwę segmentu i metadane (kształt, nazwy kolumn, tickery),
+    więc jego przesłanie do workera kosztuje tyle samo niezależnie od rozmiaru danych.
+    """
+
+    __slots__ = ("name", "n_dates", "columns", "column", "tickers")
+
+    def __init__(self, name: str, n_dates: int, columns: tuple, column: str, tickers: dict):
+        self.name = name
+        self.n_dates = n_dates
+        self.columns = tuple(columns)
+        self.column = column
+        self.tickers = dict(tickers)
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    @property
+    def nbytes(self) -> int:
+        return self.n_dates * (_DATE_DTYPE.itemsize + len(self.columns) * _VALUE_DTYPE.itemsize)
+
+    def __repr__(self):
+        return f"SharedPanelDescriptor(name={self.name!r}, n_dates={self.n_dates}, columns={self.columns})"
+
+
+def _panel_view(buf, descriptor: SharedPanelDescriptor) -> PricePanel:
+    """
+    Tworzy PricePanel z widokami NumPy na bufor segmentu (bez kopiowania).
+    """
+    n_dates, n_cols = descriptor.n_dates, len(descriptor.columns)
+
+    dates = np.ndarray((n_dates,), dtype=_DATE_DTYPE, buffer=buf, offset=0)
+    values = np.ndarray(
+        (n_dates, n_cols),
+        dtype=_VALUE_DTYPE,
+        buffer=buf,
+        offset=n_dates * _DATE_DTYPE.itemsize,
+    )
+
+    return PricePanel(
+        dates=dates.view("datetime64[ns]"),
+        values=values,
+        columns=descriptor.columns,
+        column=descriptor.column,
+        tickers=descriptor.tickers,
+    )
+
+
+class SharedPanelHandle:
+    """
+    Właściciel segmentu pamięci współdzielonej z opublikowanym panelem.
+
+    close() zamyka i usuwa (unlink) segment; workery, które już go podpięły,
+    zachowują swoje mapowanie do zakończenia procesu.
+    """
+
+    def __init__(self, panel: PricePanel):
+        descriptor = SharedPanelDescriptor(
+            name="",
+            n_dates=len(panel.dates),
+            columns=panel.columns,
+            column=panel.column,
+            tickers=panel.tickers,
+        )
+
+        # SharedMemory nie przyjmuje rozmiaru 0
+        self._shm = shared_memory.SharedMemory(create=True, size=max(descriptor.nbytes, 1))
+        descriptor.name = self._shm.name
+        self.descriptor = descriptor
+
+        view = _panel_view(self._shm.buf, descriptor)
+        view.dates[:] = panel.dates
+        view.values[:] = panel.values
+        # Widoki muszą zniknąć przed close(), inaczej bufor ma aktywne eksporty
+        del view
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def publish_panel(panel: PricePanel) -> SharedPanelHandle:
+    """
+    Kopiuje panel do nowego segmentu pamięci współdzielonej.
+    Deskryptor do przekazania workerom: handle.descriptor.
+    """
+    return SharedPanelHandle(panel)
+
+
+def attach_panel(descriptor: SharedPanelDescriptor) -> PricePanel:
+    """
+    Podpina panel opisany deskryptorem i zwraca widoki tylko do odczytu.
+    Segment jest podpinany raz na proces (kolejne wywołania używają cache).
+    """
+    attached = _ATTACHED.get(descriptor.name)
+    if attached is not None:
+        return attached[1]
+
+    try:
+        # Python 3.13+: podpinający proces nie rejestruje segmentu w resource_tracker
+        shm = shared_memory.SharedMemory(name=descriptor.name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=descriptor.name)
+
+    panel = _panel_view(shm.buf, descriptor)
+    panel.dates.flags.writeable = False
+    panel.values.flags.writeable = False
+
+    _ATTACHED[descriptor.name] = (shm, panel)
+    return panel
+
+
+def _call_with_panel(fn, descriptor, args, kwargs):
+    # Wykonywane w workerze: podpięcie panelu i wywołanie funkcji użytkownika
+    return fn(attach_panel(descriptor), *args, **kwargs)
+
+
+class SharedPanelPool:
+    """
+    ProcessPoolExecutor, który przekazuje workerom panele przez pamięć współdzieloną.
+
+    Przykład:
+        with SharedPanelPool(max_workers=4) as pool:
+            descriptor = pool.publish(panel)
+            futures = [pool.submit(backtest_gem, descriptor, start) for start in starts]
+
+    Funkcja przekazana do submit()/map() dostaje PricePanel jako pierwszy argument.
+    Segmenty są usuwane przy zamknięciu puli (shutdown() lub wyjście z bloku with).
+    """
+
+    def __init__(self, max_workers: int = None, mp_context=None):
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context)
+        self._handles = []
+
+    def publish(self, panel: PricePanel) -> SharedPanelDescriptor:
+        handle = publish_panel(panel)
+        self._handles.append(handle)
+        return handle.descriptor
+
+    def submit(self, fn, descriptor: SharedPanelDescriptor, *args, **kwargs):
+        return self._executor.submit(_call_with_panel, fn, descriptor, args, kwargs)
+
+    def map(self, fn, descriptor: SharedPanelDescriptor, *iterables):
+        futures = [self.submit(fn, descriptor, *args) for args in zip(*iterables)]
+        return (future.result() for future in futures)
+
+    def shutdown(self, wait: bool = True) -> None:
+        try:
+            self._executor.shutdown(wait=wait)
+        finally:
+            for handle in self._handles:
+                handle.close()
+            self._handles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=True)
@@ -0,0 +1,66 @@
+import threading
+
+
+class _Call:
+    # Jedno trwające wywołanie: wynik/wyjątek + zdarzenie zakończenia
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Łączenie równoległych wywołań dla tego samego klucza (wzorzec "single flight").
+
+    Pierwszy wątek z danym kluczem wykonuje funkcję; wątki, które przyjdą w trakcie,
+    czekają na jej zakończenie i dostają ten sam wynik albo ten sam wyjątek.
+    Po zakończeniu klucz jest zwalniany – kolejne wywołanie liczy wynik od nowa
+    (to nie jest cache).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs) -> tuple:
+        """
+        Wykonuje fn(*args, **kwargs) raz dla wszystkich równoległych wywołań z kluczem key.
+
+        Zwraca (wynik, shared) – shared=True, gdy wynik pochodzi z wywołania innego wątku
+        lub był współdzielony z innymi wątkami.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, call.waiters > 0
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,208 @@
+# charts.py
+# Wykresy wyników GEM (krzywe kapitału, obsunięcia, momentum) w Plotly.
+# Odpowiada za:
+# - downsampling zachowujący kształt serii (LTTB lub min/max) dopasowany do szerokości wykresu
+# - użycie Scattergl (WebGL) dla dużych wykresów
+# - leniwe budowanie figur (Plotly importowany i wywoływany dopiero przy build())
+
+import numpy as np
+import pandas as pd
+
+# Liczba punktów na piksel szerokości – więcej i tak nie będzie widoczne
+POINTS_PER_PIXEL = 1
+DEFAULT_WIDTH = 1200
+
+# Powyżej tej łącznej liczby punktów w figurze używamy WebGL (Scattergl)
+WEBGL_MIN_POINTS = 5_000
+
+DOWNSAMPLING_METHODS = ("lttb", "minmax", "none")
+
+
+# ==========================
+# DOWNSAMPLING
+# ==========================
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indeksy n_out punktów najlepiej oddających kształt serii.
+    Pierwszy i ostatni punkt są zawsze zachowane.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Granice kubełków dla punktów wewnętrznych (1 .. n-2)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Średnie kubełków liczone raz; kubełek "za ostatnim" to ostatni punkt serii
+    counts = np.diff(edges)
+    avg_x = np.r_[np.add.reduceat(x[1:n - 1], starts - 1) / counts, x[-1]]
+    avg_y = np.r_[np.add.reduceat(y[1:n - 1], starts - 1) / counts, y[-1]]
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    selected = 0
+
+    for i in range(n_out - 2):
+        start, end = starts[i], ends[i]
+        bx, by = x[start:end], y[start:end]
+
+        # Pole trójkąta (wybrany punkt, kandydat, średnia kolejnego kubełka)
+        area = np.abs(
+            (x[selected] - avg_x[i + 1]) * (by - y[selected])
+            - (x[selected] - bx) * (avg_y[i + 1] - y[selected])
+        )
+        selected = start + int(area.argmax())
+        indices[i + 1] = selected
+
+    return indices
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Min/max w kubełkach: z każdego kubełka zachowujemy minimum i maksimum,
+    więc szczyty i dołki (np. obsunięcia) nie znikają.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = n_out // 2
+    buckets = np.arange(n) * n_buckets // n
+
+    # Sortowanie po (kubełek, wartość): pierwszy element grupy = min, ostatni = max
+    order = np.lexsort((y, buckets))
+    starts = np.flatnonzero(np.r_[True, np.diff(buckets[order]) != 0])
+    ends = np.r_[starts[1:], n] - 1
+
+    indices = np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+    return indices
+
+
+def target_points(width: int = None) -> int:
+    """
+    Liczba punktów na serię dla wykresu o danej szerokości (w pikselach).
+    """
+    return int((width or DEFAULT_WIDTH) * POINTS_PER_PIXEL)
+
+
+def downsample(series: pd.Series, n_out: int, method: str = "lttb") -> pd.Series:
+    """
+    Zmniejsza liczbę punktów serii czasowej do n_out, zachowując jej kształt.
+    Wartości NaN są pomijane.
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Nieznana metoda downsamplingu: {method}")
+
+    series = series.dropna()
+    if method == "none" or len(series) <= n_out:
+        return series
+
+    y = series.to_numpy(dtype=np.float64)
+
+    if method == "minmax":
+        indices = minmax_indices(y, n_out)
+    else:
+        x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(y))
+        indices = lttb_indices(x, y, n_out)
+
+    return series.iloc[indices]
+
+
+# ==========================
+# PRZEKSZTAŁCENIA SERII
+# ==========================
+
+def drawdown(equity: pd.Series) -> pd.Series:
+    """
+    Obsunięcie od szczytu (0 = nowy szczyt, -0.2 = 20% poniżej szczytu).
+    """
+    return equity / equity.cummax() - 1
+
+
+# ==========================
+# LENIWE FIGURY
+# ==========================
+
+class LazyFigure:
+    """
+    Opis wykresu budowany do go.Figure dopiero przy build() / show().
+
+    Serie są przechowywane w pełnej rozdzielczości; downsampling wykonywany jest
+    przy budowie, pod konkretną szerokość wykresu, więc ta sama figura może być
+    zbudowana np. dla miniatury i dla pełnego ekranu.
+    """
+
+    def __init__(self, series: dict, title: str, y_title: str, method: str = "lttb",
+                 log_y: bool = False, y_format: str = None):
+        self.series = series
+        self.title = title
+        self.y_title = y_title
+        self.method = method
+        self.log_y = log_y
+        self.y_format = y_format
+
+    def traces(self, width: int = None) -> dict:
+        """
+        Zwraca dict {nazwa: seria po downsamplingu} dla danej szerokości.
+        """
+        n_out = target_points(width)
+        return {name: downsample(s, n_out, self.method) for name, s in self.series.items()}
+
+    def build(self, width: int = None, height: int = 500):
+        import plotly.graph_objects as go
+
+        traces = self.traces(width)
+        total_points = sum(len(s) for s in traces.values())
+        scatter = go.Scattergl if total_points > WEBGL_MIN_POINTS else go.Scatter
+
+        fig = go.Figure()
+        for name, s in traces.items():
+            fig.add_trace(scatter(x=s.index, y=s.to_numpy(), mode="lines", name=str(name)))
+
+        fig.update_layout(
+            title=self.title,
+            xaxis_title="Date",
+            yaxis_title=self.y_title,
+            template="plotly_white",
+            width=width,
+            height=height,
+            hovermode="x unified",
+        )
+        if self.log_y:
+            fig.update_yaxes(type="log")
+        if self.y_format:
+            fig.update_yaxes(tickformat=self.y_format)
+
+        return fig
+
+    def show(self, width: int = None, height: int = 500) -> None:
+        self.build(width, height).show()
+
+
+def equity_curves_chart(curves: dict, title: str = "GEM Equity Curves", log_y: bool = False) -> LazyFigure:
+    """
+    Krzywe kapitału, np. backtest_gem(...)["equity_curves"] lub {strategia: pd.Series}.
+    """
+    return LazyFigure(curves, title, "Portfolio Value", method="lttb", log_y=log_y)
+
+
+def drawdown_chart(curves: dict, title: str = "GEM Drawdowns") -> LazyFigure:
+    """
+    Obsunięcia krzywych kapitału; min/max zachowuje głębokość każdego dołka.
+    """
+    drawdowns = {name: drawdown(curve) for name, curve in curves.items()}
+    return LazyFigure(drawdowns, title, "Drawdown", method="minmax", y_format=".0%")
+
+
+def momentum_chart(momentum: dict, title: str = "Momentum") -> LazyFigure:
+    """
+    Serie momentum, np. {"SPY 12m": pd.Series, "VEU 12m": pd.Series}.
+    """
+    return LazyFigure(momentum, title, "Momentum", method="lttb", y_format=".0%")
@@ -0,0 +1,259 @@
+# tables.py
+# Tabele wyników GEM: pełny miesięczny log decyzji oraz statystyki dużych przebiegów (sweep).
+# Odpowiada za:
+# - stronicowanie: liczony i formatowany jest tylko widoczny fragment tabeli
+# - sortowanie i filtrowanie na tablicach NumPy (bez budowania pełnych DataFrame)
+# - ograniczenie pamięci: ze sweepa zachowujemy tylko statystyki, nie krzywe kapitału
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from config import MOMENTUM_PERIODS
+from strategy.decision_log import DecisionLog, decode
+from strategy.vectorized import ROLES, gem_select, role_momentum
+from utils.metrics import STATISTICS
+
+DEFAULT_PAGE_SIZE = 50
+
+# Kolumny formatowane jako procenty
+_PERCENT_COLUMNS = {"CAGR", "Max Drawdown", "Volatility", "Momentum US", "Momentum exUS"}
+
+
+def _format_page(page: pd.DataFrame) -> pd.DataFrame:
+    """
+    Formatowanie wartości do wyświetlenia (tylko dla wierszy strony).
+    """
+    page = page.copy()
+    for column in page.columns:
+        if column in _PERCENT_COLUMNS:
+            page[column] = page[column].map(lambda v: "" if pd.isna(v) else f"{v:.2%}")
+        elif column == "Sharpe":
+            page[column] = page[column].map(lambda v: "" if pd.isna(v) else f"{v:.2f}")
+        elif column == "Date":
+            page[column] = pd.to_datetime(page[column]).dt.strftime("%Y-%m-%d")
+    return page
+
+
+def _page_slice(n_rows: int, page: int, page_size: int) -> slice:
+    if page < 0 or (page * page_size >= n_rows and n_rows > 0):
+        raise IndexError(f"Strona {page} poza zakresem (wierszy: {n_rows}, rozmiar strony: {page_size})")
+    return slice(page * page_size, min((page + 1) * page_size, n_rows))
+
+
+class DecisionTable:
+    """
+    Miesięczny log decyzji GEM (data × horyzont) dla danych wejściowych backtest_gem
+    albo gotowego logu decyzji (result["decision_log"] z backtestu).
+
+    Wiersze: Date, Horizon, Ticker, Role, Momentum US, Momentum exUS, Signal.
+    Dla danych wejściowych, bez sortowania i filtrowania, momentum liczone jest wyłącznie
+    dla dat z bieżącej strony; sortowanie/filtrowanie liczy potrzebne kolumny wektorowo
+    dla całej historii. Log decyzji jest tylko odczytywany – dekodowane są wiersze strony.
+    """
+
+    def __init__(self, source, start_date: str = None, page_size: int = DEFAULT_PAGE_SIZE):
+        self.page_size = page_size
+        self._columns = None
+
+        if isinstance(source, DecisionLog):
+            self.log = source
+            self.dates = source.index
+            self.horizons = list(source.horizons)
+            self.tickers = source.tickers
+            return
+
+        self.log = None
+        self.assets = source
+        self.dates = source["equity_us"].loc[start_date:].index
+        self.horizons = [period.upper() for period in MOMENTUM_PERIODS]
+        self.months = [MOMENTUM_PERIODS[period] for period in MOMENTUM_PERIODS]
+        self.tickers = {role: df.attrs.get("ticker", role) for role, df in source.items()}
+
+    def __len__(self) -> int:
+        return len(self.dates) * len(self.horizons)
+
+    @property
+    def n_pages(self) -> int:
+        return -(-len(self) // self.page_size)
+
+    def _compute(self, rows: np.ndarray) -> dict:
+        """
+        Wartości liczbowe dla podanych numerów wierszy (wiersz = data × horyzont).
+        """
+        if self.log is not None:
+            return self.log.rows(rows)
+
+        date_pos, horizon_pos = np.divmod(rows, len(self.horizons))
+        momentum_us = np.full(len(rows), np.nan)
+        momentum_exus = np.full(len(rows), np.nan)
+
+        for h, months in enumerate(self.months):
+            mask = horizon_pos == h
+            if mask.any():
+                momentum_us[mask], momentum_exus[mask] = role_momentum(
+                    self.assets, self.dates[date_pos[mask]], months
+                )
+
+        return {
+            "date_pos": date_pos,
+            "horizon_pos": horizon_pos,
+            "momentum_us": momentum_us,
+            "momentum_exus": momentum_exus,
+            "codes": gem_select(momentum_us, momentum_exus),
+        }
+
+    def _all_columns(self) -> dict:
+        # Pełne kolumny liczone raz, tylko gdy potrzebne do sortowania / filtrowania
+        if self._columns is None:
+            self._columns = self._compute(np.arange(len(self)))
+        return self._columns
+
+    def _to_frame(self, values: dict) -> pd.DataFrame:
+        return decode(self.dates, self.horizons, self.tickers, values)
+
+    def page(self, page: int = 0, sort_by: str = None, ascending: bool = True,
+             horizon: str = None, role: str = None, formatted: bool = True) -> pd.DataFrame:
+        """
+        Zwraca jedną stronę logu decyzji.
+
+        sort_by: None (chronologicznie), "Momentum US" lub "Momentum exUS"
+        horizon / role: filtry (np. "12M", "defensive")
+        """
+        if sort_by is None and role is None:
+            rows = np.arange(len(self))
+            if horizon is not None:
+                rows = rows[rows % len(self.horizons) == self.horizons.index(horizon)]
+            values = self._compute(rows[_page_slice(len(rows), page, self.page_size)])
+        else:
+            columns = self._all_columns()
+            mask = np.ones(len(self), dtype=bool)
+            if horizon is not None:
+                mask &= columns["horizon_pos"] == self.horizons.index(horizon)
+            if role is not None:
+                mask &= columns["codes"] == ROLES.index(role)
+            rows = np.flatnonzero(mask)
+
+            if sort_by is not None:
+                key = {"Momentum US": "momentum_us", "Momentum exUS": "momentum_exus"}[sort_by]
+                sort_values = columns[key][rows]
+                order = np.argsort(sort_values if ascending else -sort_values, kind="stable")
+                rows = rows[order]
+
+            rows = rows[_page_slice(len(rows), page, self.page_size)]
+            values = {name: column[rows] for name, column in columns.items()}
+
+        frame = self._to_frame(values)
+        return _format_page(frame) if formatted else frame
+
+
+class StatisticsTable:
+    """
+    Statystyki wielu konfiguracji (sweep) przechowywane jako tablice kolumnowe.
+
+    Wiersz = (konfiguracja, horyzont). Z wyników backtest_gem zachowywane są tylko
+    statystyki (4 liczby na wiersz), więc pamięć nie rośnie z długością krzywych.
+    """
+
+    def __init__(self, labels, horizons, values: np.ndarray, page_size: int = DEFAULT_PAGE_SIZE):
+        self.labels = np.asarray(labels, dtype=object)
+        self.horizons = np.asarray(horizons, dtype=object)
+        self.values = np.asarray(values, dtype=np.float64)  # kształt (wiersze, len(STATISTICS))
+        self.page_size = page_size
+
+    @classmethod
+    def from_results(cls, results, page_size: int = DEFAULT_PAGE_SIZE) -> "StatisticsTable":
+        """
+        Buduje tabelę z iterowalnej kolekcji (etykieta, wynik backtest_gem).
+        Można przekazać generator – każdy wynik jest zwalniany po odczycie statystyk.
+        """
+        labels, horizons, rows = [], [], []
+
+        for label, result in results:
+            for horizon, stats in result["statistics"].items():
+                labels.append(label)
+                horizons.append(horizon)
+                rows.append([stats[name] for name in STATISTICS])
+
+        values = np.array(rows, dtype=np.float64).reshape(-1, len(STATISTICS))
+        return cls(labels, horizons, values, page_size)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def _mask(self, horizon: str = None, min_values: dict = None) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        if horizon is not None:
+            mask &= self.horizons == horizon
+        for name, threshold in (min_values or {}).items():
+            mask &= self.values[:, STATISTICS.index(name)] >= threshold
+        return mask
+
+    def _to_frame(self, rows: np.ndarray) -> pd.DataFrame:
+        frame = pd.DataFrame(self.values[rows], columns=list(STATISTICS))
+        frame.insert(0, "Horizon", self.horizons[rows])
+        frame.insert(0, "Config", self.labels[rows])
+        return frame
+
+    def top(self, n: int = 10, by: str = "Sharpe", ascending: bool = False,
+            horizon: str = None, min_values: dict = None, formatted: bool = True) -> pd.DataFrame:
+        """
+        Najlepsze n wierszy wg kolumny (argpartition – bez sortowania całej tabeli).
+        """
+        rows = np.flatnonzero(self._mask(horizon, min_values))
+        column = self.values[rows, STATISTICS.index(by)]
+        key = column if ascending else -column
+        key = np.where(np.isnan(key), np.inf, key)  # NaN zawsze na końcu
+
+        if n < len(rows):
+            candidates = np.argpartition(key, n)[:n]
+        else:
+            candidates = np.arange(len(rows))
+        rows = rows[candidates[np.argsort(key[candidates], kind="stable")]]
+
+        frame = self._to_frame(rows)
+        return _format_page(frame) if formatted else frame
+
+    def page(self, page: int = 0, sort_by: str = None, ascending: bool = False,
+             horizon: str = None, min_values: dict = None, formatted: bool = True) -> pd.DataFrame:
+        """
+        Jedna strona tabeli; sortowanie i filtrowanie wykonywane na tablicach.
+        """
+        rows = np.flatnonzero(self._mask(horizon, min_values))
+
+        if sort_by is not None:
+            key = self.values[rows, STATISTICS.index(sort_by)]
+            key = key if ascending else -key
+            rows = rows[np.argsort(np.where(np.isnan(key), np.inf, key), kind="stable")]
+
+        frame = self._to_frame(rows[_page_slice(len(rows), page, self.page_size)])
+        return _format_page(frame) if formatted else frame
+
+
+def top_configurations(results, n: int = 10, by: str = "Sharpe", horizon: str = "12M") -> pd.DataFrame:
+    """
+    Strumieniowe top-N dla bardzo dużych sweepów: w pamięci jest najwyżej n wierszy.
+
+    results: iterowalna kolekcja (etykieta, wynik backtest_gem), np. generator.
+    """
+    heap = []
+
+    for counter, (label, result) in enumerate(results):
+        stats = result["statistics"][horizon]
+        value = stats[by]
+        if pd.isna(value):
+            continue
+        item = (value, counter, label, [stats[name] for name in STATISTICS])
+        if len(heap) < n:
+            heapq.heappush(heap, item)
+        else:
+            heapq.heappushpop(heap, item)
+
+    best = sorted(heap, reverse=True)
+    table = StatisticsTable(
+        [item[2] for item in best],
+        [horizon] * len(best),
+        np.array([item[3] for item in best], dtype=np.float64).reshape(-1, len(STATISTICS)),
+    )
+    return _format_page(table._to_frame(np.arange(len(table))))